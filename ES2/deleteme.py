@@ -12,10 +12,16 @@
 # remove the `raise` command.
 from __future__ import print_function
 import networkx as nx
-import matplotlib.pyplot as plt
 import numpy as np
 import random
 
+
+def _pyplot():
+    # matplotlib is only imported when a figure is drawn, so that the
+    # computations also run quickly on machines without a display
+    import matplotlib.pyplot as plt
+    return plt
+
 # ====================== FUNCTIONS USED BY THE MAIN CODE ===================
 #
 # ====================== FOR THE MAIN CODE SCROLL TO THE BOTTOM ============
@@ -99,6 +105,7 @@ def ws(n, m, p):
 # =========================== MAIN CODE BELOW ==============================
 
 if __name__ == "__main__":
+    plt = _pyplot()
     np.random.seed(42)
     #visualizing the rings for p = 0 ...
     graph1 = ring(15, 2)
@@ -11,10 +11,22 @@
 # write your own code. When you successfully modified the code in that part,
 # remove the `raise` command.
 from __future__ import print_function
+import os
+import sys
 import networkx as nx
-import matplotlib.pyplot as plt
 import numpy as np
-import random
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import coupled_ws_sweep
+from complexnet.generators import ring_edges, rewire_edges
+
+
+def _pyplot():
+    # matplotlib is only imported when a figure is drawn, so that the
+    # computations also run quickly on machines without a display
+    import matplotlib.pyplot as plt
+    return plt
 
 # ====================== FUNCTIONS USED BY THE MAIN CODE ===================
 #
@@ -30,7 +42,8 @@ def ring(n, m):
     n : int
       Number of nodes
     m : int
-      Number of neighbors to connect left and right
+      Number of ring neighbors of every node, m // 2 on the left and
+      m // 2 on the right
 
     Returns
     -------
@@ -40,25 +53,16 @@ def ring(n, m):
     network = nx.Graph()
     # YOUR CODE HERE
 
-    for u in range(n):
-        network.add_node(u)
-
-    m2 = int(m/2)
-    if m2 != 0:
-        for u in range(n):
-            for i in range(-m2,m2+1):
-                v = u+i
-                if v<0:
-                    v = n-v
-                elif v >= n:
-                    v = v-n
-                network.add_edge(u,v)
+    network.add_nodes_from(range(n))
+    # the ring is built as arrays, see complexnet.generators.ring_edges
+    src, dst = ring_edges(n, m)
+    network.add_edges_from(zip(src.tolist(), dst.tolist()))
 
     return network
 
-def ws(n, m, p):
+def ws(n, m, p, rng=None, verbose=True):
     """
-    This function call the ring() function to make a basic ring and then
+    This function makes the basic ring of ring() and then
     rewires each link with  probability p and also prints the total number of
     links and the number of rewired links.
     Note self-loops are not allowed when rewiring (check that you do not rewire
@@ -69,9 +73,15 @@ def ws(n, m, p):
     n : int
       Number of nodes
     m : int
-      Number of neighbors to connect left and right
+      Number of ring neighbors of every node, m // 2 on the left and
+      m // 2 on the right
     p : float
         Rewiring probability
+    rng : np.random.Generator or None
+        random number generator; if None, one is seeded from the global
+        numpy state
+    verbose : bool
+        if True, the numbers of links are printed
 
     Returns
     -------
@@ -79,37 +89,58 @@ def ws(n, m, p):
         The Watts-Strogatz small-world network
 
     """
-    network = ring(n, m)
-    edges = network.edges()
-    rewired_num = 0 # tracks the number of rewired links
-    total_num = len(list(network.edges())) # tracks the total number of links in the network
     # YOUR CODE HERE
     # You should rewire each edge if: numpy.random.rand() < p
     # Also, avoid duplicate links (rewiring to a neighbor of the other node)
     # as well as self-links (rewiring one endpoint to the other)
-    # You might find these useful: random.choice and nx.non_neighbors
-    # The latter yields an iterator: NN=nx.non_neighbors(G,i) lists all nodes
-    # that are not connected to i (and are not i)
-
-    for e in edges:
-        if np.random.rand() < p:
-            u,v = e
-            network.remove_edge(u,v)
-            w = random.choice(list(nx.non_neighbors(network,u)))
-            network.add_edge(u,w)
-            rewired_num += 1
+    #
+    # The links are kept in arrays: all the links to rewire draw their new
+    # end at once, and draws that would give a self-link or a duplicate are
+    # drawn again (complexnet.generators.rewire_edges), so no list of
+    # non-neighbors is ever built.
+    if rng is None:
+        # follow the global numpy state, so that np.random.seed() still
+        # makes the results reproducible
+        rng = np.random.default_rng(np.random.randint(2**31))
+    src, dst = ring_edges(n, m)
+    src, dst, rewired = rewire_edges(src, dst, n, p, rng)
+    total_num = src.size # tracks the total number of links in the network
+    rewired_num = int(rewired.sum()) # tracks the number of rewired links
 
+    network = nx.Graph()
+    network.add_nodes_from(range(n))
+    network.add_edges_from(zip(src.tolist(), dst.tolist()))
 
     #print total number of links in the graph and number of rewired links:
-    print("total number of links:")
-    print(total_num)
-    print("number of rewired links:")
-    print(rewired_num)
+    if verbose:
+        print("total number of links:")
+        print(total_num)
+        print("number of rewired links:")
+        print(rewired_num)
     return network
 
+
+def WS_realization(rng, n, m, p):
+    """
+    Builds one Watts-Strogatz network and measures it; one realization of
+    the ensemble run by complexnet.sweep.
+
+    Returns
+    -------
+    metrics : dict
+        'c' average clustering and 'l' average shortest path length of the
+        largest component
+    """
+    smallworld = ws(n, m, p, rng, verbose=False)
+    largest_component = smallworld.subgraph(
+        max(nx.connected_components(smallworld), key=len))
+    return {'c': nx.average_clustering(smallworld),
+            'l': nx.average_shortest_path_length(largest_component)}
+
 # =========================== MAIN CODE BELOW ==============================
 
 if __name__ == "__main__":
+    plt = _pyplot()
     np.random.seed(42)
     #visualizing the rings for p = 0 ...
     graph1 = ws(15, 2, .1)
@@ -138,29 +169,21 @@ if __name__ == "__main__":
     fig2.savefig(figure_filename)
     # or just use plt.show() and save manually
 
-    # Produce the basic ring network and calculate the average clustering
-    # coefficient and average shortest path of the network
-    basic_ring = ring(1000, 5)
-    # YOUR CODE HERE
-    c_basic = nx.average_clustering(basic_ring)
-    l_basic = nx.average_shortest_path_length(basic_ring)
-
     probability = [0.001*(2**n) for n in range(11)] #[0.001, 0.002, 0.004, ...]
     relative_c = []
     relative_l = []
 
-    for p in probability:
-        smallworld = ws(1000, 5, p)
-
-        # gets all connected components; mostly there is just one:
-        components = nx.connected_component_subgraphs(smallworld)
-
-        # finds the largest to be used for the average path length:
-        largest_component = max(components, key=len)
+    # the whole curve from one coupled realization: every link is rewired
+    # once p exceeds its own random threshold, so the graph of each p grows
+    # out of the previous one (independent realizations per p are available
+    # through WS_realization and complexnet.sweep). The average path length
+    # is computed for the largest component, from 100 sampled sources, and
+    # the values of the basic ring (p = 0) come from the same estimators.
+    curve = coupled_ws_sweep(1000, 5, probability, rng=42)
+    c_basic, l_basic = curve['c0'], curve['l0']
 
+    for c_rewired, l_rewired in zip(curve['c'], curve['l']):
         # YOUR CODE HERE
-        c_rewired = nx.average_clustering(smallworld)
-        l_rewired = nx.average_shortest_path_length(largest_component)
         # Update relative_c and relative_l
         relative_c.append(c_rewired/c_basic)
         relative_l.append(l_rewired/l_basic)
@@ -10,28 +10,80 @@
 # The raise command is used to help you out in finding where you still need to
 # write your own code. When you successfully modified the code in that part,
 # remove the `raise` command.
+import os
 import sys
 import numpy as np
 import networkx as nx
-import matplotlib.pyplot as plt
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import gnp_random_graph, run_ensemble, sweep, ExactEnsemble
+from complexnet.exact import MAX_NODES
+
+
+def _pyplot():
+    # matplotlib is only imported when a figure is drawn, so that the
+    # computations also run quickly on machines without a display
+    import matplotlib.pyplot as plt
+    return plt
 
 # ====================== FUNCTIONS USED BY THE MAIN CODE ===================
 #
 # ====================== FOR THE MAIN CODE SCROLL TO THE BOTTOM ============
 
-def ER_properties(n, p):
+def ER_realization(rng, n, p):
+    '''
+    Builds one ER network and measures it; this is one realization of the
+    ensemble run by ER_properties.
+
+    Parameters
+    ----------
+    rng : np.random.Generator
+    n : int
+      Number of nodes
+    p : float
+      the probability that a pair of nodes are linked is p.
+
+    Returns
+    -------
+    metrics : dict
+      'c' average clustering, 'k' average degree and 'd' diameter of the
+      giant component
+    '''
+    # the realization is drawn as arrays and converted for the measures
+    G = gnp_random_graph(n, p, rng).to_networkx()
+
+    k = sum(nx.average_neighbor_degree(G).values())/n
+
+    c = nx.average_clustering(G)
+
+    d = nx.diameter(G.subgraph(max(nx.connected_components(G), key=len)))
+
+    return {'c': c, 'k': k, 'd': d}
+
+
+def ER_properties(n, p, seed=None, workers=None, n_realizations=100):
     '''
     This function builds 100 ER networks with the given parameters and averages
     over them to estimate the expected values of average clustering coefficient,
     average degree and diameter of an ER network with the given parameters. The
     diameter is always computed for the largest ("giant") connected component.
 
+    The realizations run in parallel (see complexnet.ensemble); with the same
+    seed the result is the same for any number of workers.
+
     Parameters
     ----------
     n : int
       Number of nodes
     p : float
       the probability that a pair of nodes are linked is p.
+    seed : int or None
+      seed of the ensemble
+    workers : int or None
+      number of worker processes, None for all cores
+    n_realizations : int
+      number of networks to average over
 
     Returns
     -------
@@ -58,44 +110,36 @@ def ER_properties(n, p):
         For computing averages over realizations, you can e.G. collect your
         values to three lists, c,k,d, and use np.mean to get the average.
     '''
+    result = run_ensemble(ER_realization, n_realizations, args=(n, p),
+                          seed=seed, workers=workers)
 
-    # YOUR CODE HERE
-
-    k_list = [] # list for degrees
-    c_list = [] # list for clustering coeff values
-    d_list = [] # list for diameter values
-
-    for _ in range(100):
-        G = nx.fast_gnp_random_graph(n,p)
-
-        k = sum(nx.average_neighbor_degree(G).values())/n
-        k_list.append(k)
-
-        c = nx.average_clustering(G)
-        c_list.append(c)
-
-        d = nx.diameter(max(nx.connected_component_subgraphs(G), key=len))
-        d_list.append(d)
+    expected_c = result.mean('c')
+    expected_k = result.mean('k')
+    expected_d = result.mean('d')
 
+    return expected_c, expected_k, expected_d
 
-    expected_c = np.mean(c_list)
-    expected_k = np.mean(k_list)
-    expected_d = np.mean(d_list)
+_exact_ensembles = {}
 
-    return expected_c, expected_k, expected_d
 
-def ER_properties_theoretical(p):
+def ER_properties_theoretical(p, n=3):
     '''
     This function calculates the theoretical values for clustering coefficients,
-    average degree, and diameter for ER networks of size 3 and link probability p.
+    average degree, and diameter for ER networks of size n and link probability p.
     The theoretical values can be viewed as expectations, or ensemble averages.
     Therefore, e.G., the expected diameter doesn't have to be integer, although it of
     course always is for a single ER network.
 
+    The expectations are exact polynomials in p, summed over the graphs of n
+    nodes grouped by isomorphism class (complexnet.ExactEnsemble); for n = 3
+    they are c = p**3, k = 2p and d = 3p - 2p**3.
+
     Parameters
     ----------
-    p : float
+    p : float or array of floats
       the probability that a pair of nodes are linked is p.
+    n : int
+      Number of nodes, at most complexnet.exact.MAX_NODES
 
     Returns
     -------
@@ -106,20 +150,23 @@ def ER_properties_theoretical(p):
     d_theory: float
                 Theoretical value of diameter
     '''
+    if n not in _exact_ensembles:
+        _exact_ensembles[n] = ExactEnsemble(n)
+    ensemble = _exact_ensembles[n]
 
-    # Calculate the theoretical values for and ER network with parameters n, p
-    # YOUR CODE HERE
-    c_theory = p**3
-    k_theory = 2*p
-    d_theory = 3*p - 2*p**3
+    c_theory = ensemble.expectation('c', p)
+    k_theory = ensemble.expectation('k', p)
+    d_theory = ensemble.expectation('d', p)
     return c_theory, k_theory, d_theory
 
 
-def plot_er_values(n, p_list):
+def plot_er_values(n, p_list, seed=None, workers=None):
     '''
     This function calculates the theoretical clustering coefficient, average
     degree and diameter for ER network with parameters n and p and plots them
-    against the expected values from an ensemble of 100 realizations.
+    against the expected values from an ensemble of 100 realizations. The
+    theoretical values are exact for n up to complexnet.exact.MAX_NODES and
+    left out for larger networks.
 
     Parameters
     ----------
@@ -127,6 +174,10 @@ def plot_er_values(n, p_list):
       Number of nodes
     p_list : list of floats
       where each member is the probability that a pair of nodes are linked.
+    seed : int or None
+      seed of the ensembles
+    workers : int or None
+      number of worker processes, None for all cores
 
     Returns
     -------
@@ -141,19 +192,23 @@ def plot_er_values(n, p_list):
     k_list_theory = []
     d_list_theory = []
 
-    for p in p_list:
-        print("calculating for n=%d p=%f" % (n, p), file=sys.stderr)
-        average_c, average_k, average_d = ER_properties(n, p)
-        k_list.append(average_k)
-        c_list.append(average_c)
-        d_list.append(average_d)
+    # all the values of p share one process pool
+    print("calculating for n=%d" % n, file=sys.stderr)
+    results = sweep(ER_realization, [(n, p) for p in p_list], 100,
+                    seed=seed, workers=workers)
+
+    for p, result in zip(p_list, results):
+        k_list.append(result.mean('k'))
+        c_list.append(result.mean('c'))
+        d_list.append(result.mean('d'))
 
-        if n is 3:
-            c_theory, k_theory, d_theory = ER_properties_theoretical(p)
+        if n <= MAX_NODES:
+            c_theory, k_theory, d_theory = ER_properties_theoretical(p, n)
             c_list_theory.append(c_theory)
             k_list_theory.append(k_theory)
             d_list_theory.append(d_theory)
 
+    plt = _pyplot()
     fig = plt.figure(figsize=(8,5))
     ax = fig.add_subplot(1, 3, 1) # Three subplots for <K>, <C> and <d*> [(1,3,1) means 1 row, three columns, first subplot)
 
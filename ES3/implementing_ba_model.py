@@ -11,11 +11,22 @@
 # write your own code. When you successfully modified the code in that part,
 # remove the `raise` command.
 from __future__ import print_function
+import os
+import sys
 import networkx as nx
 import numpy as np
-import matplotlib.pyplot as plt
 
-from scipy.stats import binned_statistic
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import barabasi_albert_graph
+from complexnet.generators import barabasi_albert_edges, growth_degrees
+
+
+def _pyplot():
+    # matplotlib is only imported when a figure is drawn, so that the
+    # computations also run quickly on machines without a display
+    import matplotlib.pyplot as plt
+    return plt
 
 # ====================== FUNCTIONS USED BY THE MAIN CODE ===================
 #
@@ -32,25 +43,126 @@ def log_bins(max_degree):
 
     return bins
 
-def ba_network(N, m, seedsize=3):
-    # Generate initial small seed network (clique of seedsize nodes)
-    net = nx.complete_graph(seedsize)
 
-    # YOUR CODE HERE
-    # TODO: Grow the network here
-    nodes = list(net.nodes)*(seedsize-1)
-    for u in range(seedsize, N):
-        edges = np.random.choice(nodes,m,replace=False)
-        net.add_edges_from(zip([u]*m, edges))
+def degree_distribution(degrees):
+    """
+    Log-binned degree distribution.
+
+    Returns
+    -------
+    bins : np.array
+        bin edges (see log_bins)
+    bincenters : np.array
+        average degree of the nodes in every bin
+    pk : np.array
+        probability density of every bin
+    """
+    bins = log_bins(np.max(degrees))
+    pk, _ = np.histogram(degrees, bins=bins, density=True)
+    # the mean degree in every bin (nan for empty bins), as
+    # scipy.stats.binned_statistic(degrees, degrees, 'mean', bins) gives
+    counts, _ = np.histogram(degrees, bins=bins)
+    sums, _ = np.histogram(degrees, bins=bins, weights=degrees)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bincenters = sums / counts
+    return bins, bincenters, pk
+
+
+def _grow(N, m, seedsize, rng):
+    if rng is None:
+        rng = np.random.randint(2**31)
+    return barabasi_albert_edges(N, m, rng=rng,
+                                 seed_graph=nx.complete_graph(seedsize))
+
+
+def _checkpoint_series(src, dst, n_seed, m, checkpoints):
+    series = []
+    for size, degrees in growth_degrees(src, dst, n_seed, m, checkpoints):
+        bins, bincenters, pk = degree_distribution(degrees)
+        series.append({'N': size, 'bins': bins, 'bincenters': bincenters,
+                       'pk': pk, 'max_degree': int(degrees.max()),
+                       'n_edges': int(degrees.sum()) // 2})
+    return series
+
+
+def ba_graph(N, m, seedsize=3, rng=None):
+    """
+    Grows a BA network from a clique of seedsize nodes as a CSRGraph, in
+    time linear in the number of links (complexnet.barabasi_albert_graph).
+
+    rng: np.random.Generator, or None to draw the seed from the global numpy
+    state
+    """
+    if rng is None:
+        rng = np.random.randint(2**31)
+    return barabasi_albert_graph(N, m, rng=rng,
+                                 seed_graph=nx.complete_graph(seedsize))
+
+
+def ba_degree_series(checkpoints, m, seedsize=3, rng=None):
+    """
+    Grows one BA network to the largest checkpoint size and records its
+    degree distribution every time it reaches one of the checkpoint sizes,
+    from the degree array of the growing network.
+
+    Returns
+    -------
+    series : list of dicts
+        for every checkpoint (in increasing order) 'N', the log-binned
+        'bins', 'bincenters' and 'pk' (see degree_distribution),
+        'max_degree' and 'n_edges'
+    """
+    src, dst, n_seed = _grow(max(checkpoints), m, seedsize, rng)
+    return _checkpoint_series(src, dst, n_seed, m, checkpoints)
+
+
+def ba_network(N, m, seedsize=3, rng=None):
+    # rng: np.random.Generator, or None for the global numpy state
+
+    # Generate initial small seed network (clique of seedsize nodes) and
+    # grow the network, every new node linking to m distinct nodes chosen
+    # proportionally to their degree
+    return ba_graph(N, m, seedsize, rng).to_networkx()
+
+
+def plot_ba_degree_series(series, m):
+    """
+    Plots the degree distribution of every checkpoint against the
+    theoretical 2m(m+1)/(k(k+1)(k+2)).
+    """
+    plt = _pyplot()
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    for point in series:
+        ax.loglog(point['bincenters'], point['pk'], 'o',
+                  label='N = %d' % point['N'])
+    bins = series[-1]['bins']
+    ax.loglog(bins, 2 * m * (m + 1) / (bins * (bins + 1) * (bins + 2)),
+              'k-', label='Theoretical')
+    ax.set_xlabel('Degree k')
+    ax.set_ylabel('P(k)')
+    ax.legend()
+    return fig
 
-        nodes.extend(edges)
-        nodes.extend([u]*m)
 
-    return net
+def BA_realization(rng, N, m):
+    """
+    Grows one BA network; one realization of the ensembles run by
+    complexnet.sweep (e.g. python -m complexnet run es3.ba).
+
+    Returns
+    -------
+    metrics : dict
+        'max_degree' and 'n_edges'
+    """
+    graph = ba_graph(N, m, rng=rng)
+    return {'max_degree': int(graph.degree().max()),
+            'n_edges': graph.number_of_edges()}
 
 # =========================== MAIN CODE BELOW ==============================
 
 if __name__ == "__main__":
+    plt = _pyplot()
     np.random.seed(42)
 
     # part a
@@ -91,11 +203,7 @@ if __name__ == "__main__":
     ax = fig.add_subplot(111)
 
     # so use np.histogram to get histogram and bin edges
-    bins = log_bins(max(degrees))
-    pk, bin_edges = np.histogram(degrees, bins=bins, density=True)
-
-    bincenters, _, _ = binned_statistic(
-        degrees, degrees, statistic='mean', bins=bins)
+    bins, bincenters, pk = degree_distribution(degrees)
     ax.set_xlabel('Degree k')
     ax.set_ylabel('P(k)')
 
@@ -11,11 +11,24 @@
 # write your own code. When you successfully modified the code in that part,
 # remove the `raise` command.
 from __future__ import print_function
-import matplotlib.pyplot as plt
+import os
+import sys
 import numpy as np
 import networkx as nx
 import random as rnd
 
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import CSRGraph, Components, edge_removal, node_attack, read_edg
+from complexnet.percolation import removal_sweep
+
+
+def _pyplot():
+    # matplotlib is only imported when a figure is drawn, so that the
+    # computations also run quickly on machines without a display
+    import matplotlib.pyplot as plt
+    return plt
+
 # ====================== FUNCTIONS USED BY THE MAIN CODE ===================
 #
 # ====================== FOR THE MAIN CODE SCROLL TO THE BOTTOM ============
@@ -27,7 +40,7 @@ def get_giant_size(net):
 
     Parameters
     ----------
-    net: networkx.Graph() object
+    net: networkx.Graph() object or CSRGraph
 
     Returns
     -------
@@ -35,6 +48,9 @@ def get_giant_size(net):
         size of the giant component
 
     """
+    if isinstance(net, CSRGraph):
+        # one labeling of the arrays instead of a set per component
+        return Components(net).giant_size
     # YOUR CODE HERE
     return max(map(len, nx.connected_components(net))) # Replace!
     #TODO: use nx.connected_components(net); len(c) yields size of component c
@@ -43,91 +59,206 @@ def simulate_edge_removal(orignet, order):
     """
     Performs an edge removal simulation
 
+    The removals are done backwards: starting from the network without the
+    edges of order, the edges are added back from the last one removed to
+    the first one and the components are merged as they go (see
+    complexnet.percolation), so the giant sizes of all the steps cost about
+    as much as one connected components search.
+
     Parameters
     ----------
     orignet: networkx.Graph() object
-        Network in which the edge removal is simulated. A copy of orignet is
-        created for the simulations, and the original network is not changed.
+        Network in which the edge removal is simulated. The original
+        network is not changed.
     order: list of tuples
         network edges sorted in the order in which they will be removed
 
     Returns
     -------
-    giant_sizes: np.array of ints
+    giant_sizes: list of ints
         sizes of the giant component at different edge densities
     """
-    giant_sizes = []
-    net = orignet.copy() # Creating a copy of the original network
-    n = len(orignet.edges())
-    # YOUR CODE HERE
-    #TODO: Loop over edges and remove them in given order.
-    for e in order:
-        net.remove_edge(*e)
-        giant_sizes.append(get_giant_size(net))
-
-    return giant_sizes
+    index = {node: i for i, node in enumerate(orignet.nodes())}
+    removed = set()
+    src, dst = [], []
+    for u, v in order:
+        src.append(index[u])
+        dst.append(index[v])
+        removed.add((u, v))
+        removed.add((v, u))
+    kept = ([index[u] for u, v in orignet.edges() if (u, v) not in removed],
+            [index[v] for u, v in orignet.edges() if (u, v) not in removed])
+    giants, _ = removal_sweep(len(index), src, dst, kept)
+    return giants[1:].tolist()
 
-def run_link_removal(path, net_name):
+def link_removal_data(path, n_random=1, rng=None):
     """
-    Sets up framework and runs the edge removal simulation.
+    Computes the giant component sizes as the edges of a network are
+    removed by increasing weight, by decreasing weight and in random orders.
 
     Parameters
     ----------
     path: string
         path to the network to be analyzed
-    net_name: string
-        name of the network (for labeling)
+    n_random: int
+        number of random orders, averaged over
+    rng : np.random.Generator or None
+        If None, a generator seeded from the random module is used.
 
     Returns
     -------
-    No direct output, saves figure of the giant component size as a function
-    of network density.
+    data : dict
+        'N', 'fraction_removed' and 'giant_size', a dict of lists for the
+        orders 'w_big_first', 'w_small_first' and 'random' (the mean over the
+        random orders), and 'giant_size_std' of the random orders (None
+        without random orders)
     """
-    # setting up:
-    # YOUR CODE HERE
-    net = nx.read_weighted_edgelist(path) # Read the network from path
-    N = len(net.nodes()) # Replace with the number of nodes
-    edges = list(net.edges()) # Replace with the network edges
+    net = read_edg(path)
+    N = net.number_of_nodes()
+    weights = net.edge_weights()
 
-    fig = plt.figure(figsize=(16, 16 * 3 / 4.))
-    ax = fig.add_subplot(111)
-    fig.suptitle(net_name)
+    # edges sorted by increasing weight, ties in the order they were read
+    ascending_weight_edge_order = np.argsort(weights, kind='stable')
+    descending_weight_edge_order = ascending_weight_edge_order[::-1]
+    if rng is None:
+        rng = np.random.default_rng(rnd.getrandbits(64))
 
-    # defining orders in which to remove the edges
+    curves = edge_removal(net, {'w_big_first': descending_weight_edge_order,
+                                'w_small_first': ascending_weight_edge_order},
+                          n_random, rng)
+    giant_sizes = {name: giants.tolist()
+                   for name, giants in curves['giant'].items()}
+    giant_size_std = None
+    if n_random > 0:
+        giant_sizes['random'] = curves['random']['giant'].tolist()
+        giant_size_std = curves['random']['giant_std'].tolist()
+    n_removed = curves['n_removed']
+    return {'N': N,
+            'fraction_removed': (n_removed / float(max(n_removed[-1], 1))).tolist(),
+            'giant_size': giant_sizes,
+            'giant_size_std': giant_size_std,
+            'n_random': n_random}
 
-    # YOUR CODE HERE
-    ascending_weight_edge_order = sorted(edges, key=lambda edge: net.get_edge_data(*edge)['weight'])  # Replace with edges sorted by increasing weight, see exercise sheet for hints
-    descending_weight_edge_order = ascending_weight_edge_order[::-1] # Replace with edges sorted by decreasing weight, see exercise sheet for hints
-    random_edge_order = edges.copy()
-    rnd.shuffle(random_edge_order) # Replace with edges sorted in random order
+def plot_link_removal(data, net_name):
+    """
+    Plots the results of link_removal_data.
 
-    print('ended')
+    Returns
+    -------
+    fig : figure handle
+    """
+    plt = _pyplot()
+    N = data['N']
+    fracs = np.array(data['fraction_removed'])
 
-    # edge removal:
+    fig = plt.figure(figsize=(16, 16 * 3 / 4.))
+    ax = fig.add_subplot(111)
+    fig.suptitle(net_name)
 
-    for order, order_name, color, ls, lw in zip(
-        [descending_weight_edge_order, ascending_weight_edge_order,
-         random_edge_order],
+    for order_name, color, ls, lw in zip(
         ["w_big_first",
          "w_small_first", 'random'],
         ["r", "y", "b"],
         ["-", "-", "-"],
         [2, 3, 4, 5]):
 
-        print(order_name)
+        if order_name not in data['giant_size']:
+            continue
+        giant_sizes = np.array(data['giant_size'][order_name]) / float(N)
+        ax.plot(fracs, giant_sizes, "-", color=color, ls=ls,
+                label="g " + order_name, lw=lw)
 
-        giant_sizes = simulate_edge_removal(net, order)
-        fracs = np.linspace(0, 1, len(giant_sizes))
+    if data['n_random'] > 1:
+        # spread of the random orders
+        mean = np.array(data['giant_size']['random']) / float(N)
+        std = np.array(data['giant_size_std']) / float(N)
+        ax.fill_between(fracs, mean - std, mean + std, color="b", alpha=0.2)
 
-        ax.plot(fracs, np.array(giant_sizes) / float(N), "-", color=color, ls=ls,
-                label="g " + order_name, lw=lw)
+    # YOUR CODE HERE
+    ax.set_ylabel('Largest component size') # Set label
+    ax.set_xlabel('Fraction of removed links') # Set label
 
-        # YOUR CODE HERE
-        ax.set_ylabel('Largest component size') # Set label
-        ax.set_xlabel('Fraction of removed links') # Set label
+    ax.legend(loc=2)
 
-        ax.legend(loc=2)
+    return fig
 
+def run_link_removal(path, net_name, n_random=1):
+    """
+    Sets up framework and runs the edge removal simulation.
+
+    Parameters
+    ----------
+    path: string
+        path to the network to be analyzed
+    net_name: string
+        name of the network (for labeling)
+    n_random: int
+        number of random orders, averaged over
+
+    Returns
+    -------
+    fig : figure handle
+        figure of the giant component size as a function of the fraction of
+        removed links
+    """
+    return plot_link_removal(link_removal_data(path, n_random), net_name)
+
+def node_attack_data(path, n_orders=1, rng=None,
+                     strategies=('random', 'static-degree', 'adaptive-degree',
+                                 'adaptive-strength')):
+    """
+    Computes the giant component sizes as the nodes of a network are
+    removed at random or by decreasing degree or strength, recomputed
+    after every removal for the adaptive attacks (see
+    complexnet.percolation.node_attack).
+
+    Parameters
+    ----------
+    path: string
+        path to the network to be analyzed
+    n_orders: int
+        number of orders averaged over for each strategy
+    rng : np.random.Generator or None
+        If None, a generator seeded from the random module is used.
+    strategies: sequence of strings
+
+    Returns
+    -------
+    data : dict
+        'N', 'fraction_removed' and 'giant_size', a dict of lists for
+        every strategy
+    """
+    net = read_edg(path)
+    N = net.number_of_nodes()
+    if rng is None:
+        rng = np.random.default_rng(rnd.getrandbits(64))
+    giant_sizes = {}
+    for strategy in strategies:
+        giant_sizes[strategy] = node_attack(net, strategy, n_orders,
+                                            rng)['giant'].tolist()
+    return {'N': N,
+            'fraction_removed': (np.arange(N + 1) / float(max(N, 1))).tolist(),
+            'giant_size': giant_sizes}
+
+def plot_node_attack(data, net_name):
+    """
+    Plots the results of node_attack_data.
+
+    Returns
+    -------
+    fig : figure handle
+    """
+    plt = _pyplot()
+    fig = plt.figure(figsize=(16, 16 * 3 / 4.))
+    ax = fig.add_subplot(111)
+    fig.suptitle(net_name)
+    fracs = np.array(data['fraction_removed'])
+    for strategy, giant_sizes in data['giant_size'].items():
+        ax.plot(fracs, np.array(giant_sizes) / float(data['N']), lw=2,
+                label="g " + strategy)
+    ax.set_ylabel('Largest component size')
+    ax.set_xlabel('Fraction of removed nodes')
+    ax.legend(loc=1)
     return fig
 
 # =========================== MAIN CODE BELOW ==============================
@@ -137,5 +268,9 @@ if __name__ == "__main__":
     network_path = './OClinks_w_undir.edg' # You may want to change the path to the edge list file
     network_name = 'fb-like-network'
 
-    fig = run_link_removal(network_path, network_name)
+    fig = run_link_removal(network_path, network_name, n_random=100)
     fig.savefig("./fb_like_error_and_attack_tolerance.pdf")
+
+    fig = plot_node_attack(node_attack_data(network_path, n_orders=10),
+                           network_name)
+    fig.savefig("./fb_like_node_attack.pdf")
@@ -10,16 +10,25 @@
 # The raise command is used to help you out in finding where you still need to
 # write your own code. When you successfully modified the code in that part,
 # remove the `raise` command.
+import os
+import sys
 import random
 import copy
+import warnings
 import networkx as nx
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.stats
 
-# Set the drawing parameters to fit the windows
-from matplotlib import rcParams
-rcParams.update({'figure.autolayout': True})
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import (CSRGraph, Components, er_percolation, gnp_random_graph,
+                        multi_source_bfs)
+
+
+def _pyplot():
+    # matplotlib is only imported when a figure is drawn, so that the
+    # computations also run quickly on machines without a display
+    import matplotlib.pyplot as plt
+    return plt
 
 # ====================== FUNCTIONS USED BY THE MAIN CODE ===================
 #
@@ -138,13 +147,16 @@ def get_component_size_dist(net):
 
     Parameters
     ----------
-    net : networkx.Graph object
+    net : networkx.Graph object or CSRGraph
 
     Returns
     -------
     Dictionary where keys are component sizes and values are the number of
     components of that size.
     """
+    if isinstance(net, CSRGraph):
+        # one labeling of the arrays instead of a set per component
+        return Components(net).size_distribution()
     dist = {}
     # YOUR CODE HERE
     # Hint: use the function nx.connected_components
@@ -158,7 +170,7 @@ def get_component_size_dist(net):
             dist[n] = 1
     return dist
 
-def create_er_network(net_size, avg_degree):
+def create_er_network(net_size, avg_degree, rng=None):
     """Creates a realisation of an Erdos-Renyi network.
 
     Parameters
@@ -168,22 +180,33 @@ def create_er_network(net_size, avg_degree):
     avg_degree : float
        The value of edge probability p is set such that this is the
        expected average degree in the network.
+    rng : np.random.Generator or None
+       If None, a generator seeded from the random module is used, so that
+       random.seed() makes the whole script reproducible.
 
     Returns
     -------
 
-    net: a network object
+    net: a CSRGraph
 
     """
     # YOUR CODE HERE
     p = avg_degree/net_size
-    net = nx.fast_gnp_random_graph(n=net_size, p=p)
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+    net = gnp_random_graph(net_size, p, rng)
     return net
 
-def ER_percolation(N, maxk, stepsize=0.1):
-    """Builds ER networks with average degrees from 0 to maxk and
-       plots the size of the largest connected component and susceptibility
-       as a function of the average degree.
+def ER_percolation_data(N, maxk, stepsize=0.1, verbose=True, n_orders=1):
+    """Computes the size of the largest connected component and the
+       susceptibility of ER networks with average degrees from 0 to maxk.
+
+       Instead of building a new network for every average degree, the links
+       of each realization are added one by one in random order and the
+       components are merged as they go (see complexnet.percolation), so one
+       pass gives all the average degrees. The network with average degree k
+       has the first round(k*N/2) links: a G(N, M) graph rather than G(N, p),
+       which is the same in the limit of large N.
 
     Parameters
     ----------
@@ -193,56 +216,90 @@ def ER_percolation(N, maxk, stepsize=0.1):
       The maximum average degree
     stepsize : float
       The size of the step after which the LCC and susceptibility is calculated.
-      I.e., they are plotted at 0, stepsize, 2*stepsize, ..., maxk
+      I.e., they are calculated at 0, stepsize, 2*stepsize, ..., maxk
+    verbose : bool
+      If True, the progress is printed
+    n_orders : int
+      Number of realizations averaged over
 
     Returns
     -------
-    fig : figure handle
+    data : dict
+      'avg_degree', 'giant_size' and 'susceptibility' lists
     """
 
     klist = np.arange(0.0, maxk, stepsize)
-    giantsize = []
-    smallsize = []
-
-    # Loop over the avg degree range
-    for k in klist:
-        print("Doing the calculations for avg degree:")
-        print(k)
+    n_links = np.rint(klist * N / 2).astype(np.int64)
+    max_links = min(int(n_links.max(initial=0)), N * (N - 1) // 2)
+    n_links = np.minimum(n_links, max_links)
 
-        # Generate an ER network with N nodes and avg degree k
-        net = create_er_network(N, k)
+    if verbose:
+        print("Adding up to %d links to %d nodes, %d realizations"
+              % (max_links, N, n_orders))
 
-        # Get the distribution of component sizes
-        component_size_dist = get_component_size_dist(net)
+    # the generator is seeded from the random module, so that random.seed()
+    # makes the whole script reproducible
+    rng = np.random.default_rng(random.getrandbits(64))
+    curve = er_percolation(N, max_links, n_orders, rng)
 
-        # Galculate the largest component size
-        giantsize.append(get_largest_component_size(component_size_dist))
+    return {'N': N,
+            'avg_degree': klist.tolist(),
+            'giant_size': curve['giant'][n_links].tolist(),
+            'susceptibility': curve['susceptibility'][n_links].tolist()}
 
-        # Calculate the avg component size for the other components
-        smallsize.append(get_susceptibility(component_size_dist))
 
+def plot_ER_percolation(data):
+    """Plots the results of ER_percolation_data.
 
+    Returns
+    -------
+    fig : figure handle
+    """
+    plt = _pyplot()
+    klist = data['avg_degree']
 
     # plot the numbers
-    fig = plt.figure()
+    fig = plt.figure(tight_layout=True)
     ax = fig.add_subplot(2, 1, 1)
 
-    ax.plot(klist, giantsize, 'r-')
+    ax.plot(klist, data['giant_size'], 'r-')
     # YOUR CODE HERE
     ax.set_xlabel('Average degree') # TODO: label the axis!
     ax.set_ylabel('Largest component size') # TODO: label the axis!
 
     ax2 = fig.add_subplot(2, 1, 2)
-    ax2.plot(klist, smallsize, 'k-')
+    ax2.plot(klist, data['susceptibility'], 'k-')
     # YOUR CODE HERE
     ax2.set_xlabel('Average degree')  # TODO: label the axis!
     ax2.set_ylabel('Suceptibility')  # TODO: label the axis!
 
-    fig.suptitle('Number of nodes = ' + str(N))
+    fig.suptitle('Number of nodes = ' + str(data['N']))
     # plt.show() # uncomment if you want to display the figure on the screen
 
     return fig
 
+
+def ER_percolation(N, maxk, stepsize=0.1):
+    """Builds ER networks with average degrees from 0 to maxk and
+       plots the size of the largest connected component and susceptibility
+       as a function of the average degree.
+
+    Parameters
+    ----------
+    N : int
+      Number of nodes in the ER network
+    maxk : float
+      The maximum average degree
+    stepsize : float
+      The size of the step after which the LCC and susceptibility is calculated.
+      I.e., they are plotted at 0, stepsize, 2*stepsize, ..., maxk
+
+    Returns
+    -------
+    fig : figure handle
+    """
+    return plot_ER_percolation(ER_percolation_data(N, maxk, stepsize))
+
 def expand_breadth_first_search(network, visited_nodes, boundary_nodes):
     """Performs one step in a breadth first search and updates the visited nodes
     and boundary nodes sets that are given as parameters accordingly. Here one
@@ -251,7 +308,7 @@ def expand_breadth_first_search(network, visited_nodes, boundary_nodes):
 
     Parameters
     ----------
-    network : networkx.Graph object
+    network : networkx.Graph object or CSRGraph
     visited_nodes : set object
       The set of nodes that are visited (including the boundary)
     boundary_nodes : set object
@@ -262,6 +319,16 @@ def expand_breadth_first_search(network, visited_nodes, boundary_nodes):
     Nothing, the visited nodes an boundary nodes are update in place.
 
     """
+    if isinstance(network, CSRGraph):
+        # gather all the neighbors of the boundary at once from the CSR arrays
+        boundary = np.fromiter(boundary_nodes, dtype=np.int64,
+                               count=len(boundary_nodes))
+        new_boundary = set(np.unique(network.neighbors_of(boundary)).tolist())
+        new_boundary -= visited_nodes
+        visited_nodes.update(new_boundary)
+        boundary_nodes.clear()
+        boundary_nodes.update(new_boundary)
+        return
 
     new_boundary = set() # Nodes in the new boundary are added here
 
@@ -282,9 +349,10 @@ def expand_breadth_first_search(network, visited_nodes, boundary_nodes):
     # We return nothing as the results were updated to visited_nodes and boundary_nodes
 
 
-def ER_breadth_first_search(avg_degree, net_size, number_of_samples,
-                            max_depth=15, show_netsize=False):
-    """Creates a figure of breadth first search in an ER network.
+def ER_breadth_first_search_data(avg_degree, net_size, number_of_samples,
+                                 max_depth=15):
+    """Runs breadth first searches in an ER network and averages the
+    boundary sizes and loop edge fractions over the starting nodes.
 
     Parameters
     ----------
@@ -296,51 +364,44 @@ def ER_breadth_first_search(avg_degree, net_size, number_of_samples,
        The number of randomly selected starting node for the BFS
     max_depth : int
        The maximum depth of the BFS
-    show_netsize : bool
-       If True, we will plot the size of the network in the first panel as a dotter horizontal line.
 
     Returns
     -------
-    fig : figure object
+    data : dict
+      'depth', 'avg_node_count', 'avg_node_count_theoretical' and
+      'avg_loop_edge_fraction' lists
     """
     net = create_er_network(net_size, avg_degree)
 
-    # We will count the number of nodes and the loop fraction for each depth and each
-    # starting node. That is, we need a 2-dimensional list to save these results.
-    # The element node_count[depth][sample_number] gives the number of nodes at the boundary
-    # of the BFS at the given depth for given sample number.
-    # The code below will create lists of length max_depth where each element is an empty list.
-    node_count = [[] for depth in range(max_depth+1)]
-    loop_edge_fraction = [[] for depth in range(max_depth+1)]
-
-    # Next we will run the BFS until max_depth for each randomly selected sample
-    for _sample_nr in range(number_of_samples):
-        # Choose random starting node:
-        start_node = random.randint(0, net_size-1)
-        # In the beginning we have only visited the start node:
-        visited_nodes = set([start_node])
-        # The start node is also the only boundary node, see expand_breadth_first_search:
-        boundary_nodes = set([start_node])
-
-        for depth in range(max_depth+1):
-            # YOUR CODE HERE
-            number_of_boundary_nodes = len(boundary_nodes)
-
-            fraction_of_loop_edges = calculate_loop_edge_fraction(net,
-                                                                  visited_nodes, boundary_nodes)
-
-            # Update the visited nodes and the boundary
-            expand_breadth_first_search(net, visited_nodes, boundary_nodes)
-
-            # Saving the results
-            node_count[depth].append(number_of_boundary_nodes)
-            loop_edge_fraction[depth].append(fraction_of_loop_edges)
+    # Random starting nodes, drawn with the random module as before
+    start_nodes = [random.randint(0, net_size-1)
+                   for _sample_nr in range(number_of_samples)]
+
+    # All the searches run together, one depth at a time, on the arrays of
+    # the network (complexnet.multi_source_bfs); the element
+    # node_count[sample_number, depth] is the number of nodes at the
+    # boundary of the BFS at the given depth for the given sample, exactly
+    # what expand_breadth_first_search would give.
+    node_count, edge_count, _ = multi_source_bfs(net, start_nodes, max_depth)
+    visited_count = np.cumsum(node_count, axis=1)
+
+    # The loop edge fraction of calculate_loop_edge_fraction for every
+    # search and depth: 0 while only the start node is visited, nan once
+    # all the reachable nodes have been visited, and 0 without edges
+    # back to the visited nodes.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        loop_edge_fraction = (edge_count - node_count) / edge_count
+    loop_edge_fraction[edge_count == 0] = 0
+    loop_edge_fraction[node_count == 0] = np.nan
+    loop_edge_fraction[visited_count == 1] = 0
 
     # Averaging over the different starting nodes.
     #when calculating average of loop_edge_fraction we use np.nanmean function because we have defined fraction_of_loop_edges to return nan if all the reachable nodes are already visited
-    #avg_node_count = list(map(np.mean, node_count))
-    avg_node_count = list(map(np.mean, node_count))
-    avg_loop_edge_fraction = list(map(np.nanmean, loop_edge_fraction))
+    avg_node_count = node_count.mean(axis=0).tolist()
+    with warnings.catch_warnings():
+        # depths that no search reaches have no defined fraction
+        warnings.simplefilter('ignore', RuntimeWarning)
+        avg_loop_edge_fraction = np.nanmean(loop_edge_fraction, axis=0).tolist()
 
 
 
@@ -353,15 +414,40 @@ def ER_breadth_first_search(avg_degree, net_size, number_of_samples,
         n = k**d
         avg_node_count_theoretical.append(n)
 
+    return {'avg_degree': avg_degree,
+            'net_size': net_size,
+            'depth': list(range(max_depth+1)),
+            'avg_node_count': avg_node_count,
+            'avg_node_count_theoretical': avg_node_count_theoretical,
+            'avg_loop_edge_fraction': avg_loop_edge_fraction}
+
+
+def plot_ER_breadth_first_search(data, show_netsize=False):
+    """Plots the results of ER_breadth_first_search_data.
+
+    Parameters
+    ----------
+    data : dict
+    show_netsize : bool
+       If True, we will plot the size of the network in the first panel as a dotter horizontal line.
+
+    Returns
+    -------
+    fig : figure object
+    """
+    plt = _pyplot()
+    depths = data['depth']
+    max_depth = depths[-1]
+
     #Plotting the results
-    fig = plt.figure(figsize=(4, 8))
+    fig = plt.figure(figsize=(4, 8), tight_layout=True)
     ax1 = fig.add_subplot(211)
 
-    ax1.semilogy(list(range(max_depth+1)), avg_node_count, "x", label="Simulation")
-    ax1.semilogy(list(range(max_depth+1)), avg_node_count_theoretical, label="Theoretical")
+    ax1.semilogy(depths, data['avg_node_count'], "x", label="Simulation")
+    ax1.semilogy(depths, data['avg_node_count_theoretical'], label="Theoretical")
 
     if show_netsize:
-        ax1.semilogy([0, max_depth], 2*[net_size], "k--")
+        ax1.semilogy([0, max_depth], 2*[data['net_size']], "k--")
 
     # YOUR CODE HERE
     ax1.set_xlabel("Depth") # Set proper axis labels!
@@ -371,7 +457,7 @@ def ER_breadth_first_search(avg_degree, net_size, number_of_samples,
 
 
     ax2 = fig.add_subplot(212)
-    ax2.plot(list(range(max_depth+1)), avg_loop_edge_fraction, "x", label="Simulation")
+    ax2.plot(depths, data['avg_loop_edge_fraction'], "x", label="Simulation")
     # YOUR CODE HERE
     ax2.set_xlabel("Depth") # Set proper axis labels!
     ax2.set_ylabel("Average loop edge fraction") # Set proper axis labels!
@@ -383,6 +469,32 @@ def ER_breadth_first_search(avg_degree, net_size, number_of_samples,
     return fig
 
 
+def ER_breadth_first_search(avg_degree, net_size, number_of_samples,
+                            max_depth=15, show_netsize=False):
+    """Creates a figure of breadth first search in an ER network.
+
+    Parameters
+    ----------
+    avg_degree : float
+      The expected degree of the nodes in the ER network
+    net_size : int
+      The number of nodes in the ER network
+    number_of_samples : int
+       The number of randomly selected starting node for the BFS
+    max_depth : int
+       The maximum depth of the BFS
+    show_netsize : bool
+       If True, we will plot the size of the network in the first panel as a dotter horizontal line.
+
+    Returns
+    -------
+    fig : figure object
+    """
+    data = ER_breadth_first_search_data(avg_degree, net_size,
+                                        number_of_samples, max_depth)
+    return plot_ER_breadth_first_search(data, show_netsize)
+
+
 
 # =========================== MAIN CODE BELOW ==============================
 
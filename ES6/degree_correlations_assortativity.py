@@ -10,11 +10,21 @@
 # The raise command is used to help you out in finding where you still need to
 # write your own code. When you successfully modified the code in that part,
 # remove the `raise` command.
+import os
+import sys
 import networkx as nx
-import matplotlib.pyplot as plt
 import numpy as np
-from scipy.stats import binned_statistic_2d
-import matplotlib as mpl
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import read_edg, assortativity_null, degree_assortativity
+
+
+def _pyplot():
+    # matplotlib is only imported when a figure is drawn, so that the
+    # computations also run quickly on machines without a display
+    import matplotlib.pyplot as plt
+    return plt
 
 # ====================== FUNCTIONS USED BY THE MAIN CODE ===================
 #
@@ -41,6 +51,7 @@ def create_scatter(x_degrees, y_degrees, network_title):
     -------
     fig: figure object
     """
+    plt = _pyplot()
 
     fig = plt.figure()
     ax = fig.add_subplot(111)
@@ -71,6 +82,10 @@ def create_heatmap(x_degrees, y_degrees, network_title):
     
     fig: figure object
     """
+    import matplotlib as mpl
+    from scipy.stats import binned_statistic_2d
+    plt = _pyplot()
+
     k_min = np.min((x_degrees, y_degrees))
     k_max = np.max((x_degrees, y_degrees))
 
@@ -218,6 +233,7 @@ def visualize_nearest_neighbor_degree(degrees, nearest_neighbor_degrees, unique_
     -------
     fig : figure object
     """
+    plt = _pyplot()
 
     fig = plt.figure()
     ax = fig.add_subplot(111)
@@ -231,11 +247,63 @@ def visualize_nearest_neighbor_degree(degrees, nearest_neighbor_degrees, unique_
     ax.legend(loc=0)
     return fig
 
+def visualize_assortativity_null(null_values, observed, network_title):
+    """
+    Visualizes the assortativities of degree-preserving randomizations as a
+    histogram, with the observed value as a vertical line.
+
+    Parameters
+    ----------
+    null_values: np.array
+        assortativity of every randomized network
+    observed: float
+        assortativity of the network itself
+    network_title: str
+        network-referring title (string) for figure
+
+    Returns
+    -------
+    fig : figure object
+    """
+    plt = _pyplot()
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    ax.hist(null_values, bins=30, color='gray', label='Degree-preserving null')
+    ax.axvline(observed, color='r', label='Observed')
+    ax.set_title(network_title)
+    ax.set_xlabel(r'Assortativity $r$')
+    ax.set_ylabel(r'Number of randomizations')
+    ax.legend(loc=0)
+    return fig
+
 ######################################################
 # Starting from here you might need to edit the code #
 ######################################################
 
 
+def get_assortativity_null(network, n_samples=1000, rng=None):
+    """
+    Samples the assortativity of degree-preserving randomizations of the
+    network, by edge swaps with the assortativity updated swap by swap
+    (complexnet.EdgeSwapper), one sample every m swap attempts.
+
+    Parameters
+    ----------
+    network: a NetworkX graph object or a CSRGraph
+    n_samples: int
+    rng: np.random.Generator, int or None
+
+    Returns
+    -------
+    observed: float
+        the assortativity of the network itself
+    null_values: np.array
+        the assortativity of every randomization
+    """
+    return (degree_assortativity(network),
+            assortativity_null(network, n_samples, rng=rng))
+
+
 # =========================== MAIN CODE BELOW ==============================
 
 if __name__ == '__main__':
@@ -252,7 +320,7 @@ if __name__ == '__main__':
     nearest_neighbor_figure_base = '' # replace, where to save nearest neighbor figure
     # Loop through all networks
     for network_path, network_name, network_title in zip(network_paths, network_names, network_titles):
-        network = nx.read_weighted_edgelist(network_path)
+        network = read_edg(network_path).to_networkx()
         x_degrees, y_degrees = get_x_and_y_degrees(network)
 
         fig = create_scatter(x_degrees, y_degrees, network_title)
@@ -270,6 +338,15 @@ if __name__ == '__main__':
         print("NetworkX assortativity for " + network_title + ": " +
               str(assortativity_nx))
 
+        # significance against degree-preserving randomizations
+        if network_name == 'facebook-wosn':
+            observed, null_values = get_assortativity_null(network, 1000,
+                                                           rng=42)
+            print("Null model assortativity for " + network_title + ": " +
+                  str(null_values.mean()) + " +- " + str(null_values.std()) +
+                  ", z = " + str((observed - null_values.mean()) /
+                                 null_values.std()))
+
         # nearest neighbor degrees
         if network_name == 'facebook-wosn':
             degrees, nearest_neighbor_degrees = get_nearest_neighbor_degree(network)
@@ -0,0 +1,28 @@
+"""
+Shared array-based network code for the Complex Networks exercises.
+
+The exercise scripts under ES1..ES6 import this package from the repository
+root, e.g.
+
+    from complexnet import CSRGraph
+    net = CSRGraph.from_networkx(nx.read_weighted_edgelist(path))
+"""
+from .graph import CSRGraph, as_csr
+from .algorithms import expand_frontier, multi_source_bfs, pagerank
+from .io import read_edg, read_edge_arrays
+from .ondisk import save_csr, open_csr, build_csr
+from .stream import EdgeStats, scan_edge_file
+from .compressed import CompressedGraph, compress
+from .reorder import reorder, restore_order
+from .shared import SharedGraph, attach
+from .cached import CachedGraph
+from .generators import (gnp_random_graph, gnm_random_graph,
+                         watts_strogatz_graph, barabasi_albert_graph,
+                         configuration_model, directed_configuration_model)
+from .ensemble import Ensemble, run_ensemble, sweep
+from .smallworld import coupled_ws_sweep
+from .nullmodel import EdgeSwapper, assortativity_null, degree_assortativity
+from .exact import ExactEnsemble, isomorphism_classes
+from .components import Components, connected_components, giant_component
+from .percolation import (bond_percolation, site_percolation, er_percolation,
+                          edge_removal, attack_order, node_attack)
@@ -0,0 +1,147 @@
+"""
+Array kernels that run directly on a CSRGraph.
+"""
+import numpy as np
+
+
+def expand_frontier(graph, visited, boundary):
+    """
+    Performs one breadth-first search step.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+    visited : np.array of bools
+        visited[i] is True for nodes already reached; updated in place
+    boundary : array of ints
+        the nodes reached in the previous step
+
+    Returns
+    -------
+    new_boundary : np.array of ints
+        the nodes that are one step further away, sorted
+    """
+    neighbors = graph.neighbors_of(boundary)
+    new_boundary = np.unique(neighbors[~visited[neighbors]])
+    visited[new_boundary] = True
+    return new_boundary
+
+
+# (source, node) cells of the visited map of one batch of multi_source_bfs
+_BFS_CELLS = 2**23
+
+
+def multi_source_bfs(graph, sources, max_depth, batch_size=None):
+    """
+    Runs breadth-first searches from many sources at once, one depth at a
+    time: the frontiers of all searches of a batch are kept as (search,
+    node) pairs in flat arrays, and a search-by-node visited map tells the
+    new nodes apart.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+    sources : array of ints
+        the starting node of every search; repeats are separate searches
+    max_depth : int
+    batch_size : int or None
+        searches run together; by default as many as fit in a visited map
+        of about 8 million cells
+
+    Returns
+    -------
+    boundary_sizes : np.array of ints, shape (len(sources), max_depth + 1)
+        number of nodes at each distance from the source
+    edge_counts : np.array of ints, same shape
+        number of links from the nodes at each distance to the nodes at
+        that distance or closer
+    loop_counts : np.array of ints, same shape
+        edge_counts minus the link of every boundary node to the node it
+        was reached from (none for the source): the links that close loops
+        (in undirected graphs; the link a node was reached through does
+        not lead back in directed ones)
+    """
+    n = graph.number_of_nodes()
+    sources = np.asarray(sources, dtype=np.int64)
+    max_depth = int(max_depth)
+    if batch_size is None:
+        batch_size = max(1, _BFS_CELLS // max(n, 1))
+    boundary_sizes = np.zeros((sources.size, max_depth + 1), dtype=np.int64)
+    edge_counts = np.zeros((sources.size, max_depth + 1), dtype=np.int64)
+    # the maps are allocated once and only the visited cells are cleared
+    # after every batch, as touching all of their pages is what costs most
+    cells = min(batch_size, sources.size) * n
+    visited = np.zeros(cells, dtype=bool)
+    # scratch space to keep one copy of every new (search, node) pair
+    stamp = np.zeros(cells, dtype=np.int64)
+    for first in range(0, sources.size, batch_size):
+        batch = sources[first:first + batch_size]
+        rows = slice(first, first + batch.size)
+        search = np.arange(batch.size, dtype=np.int64)
+        frontier = batch
+        reached = [search * n + frontier]
+        visited[reached[0]] = True
+        for depth in range(max_depth + 1):
+            if frontier.size == 0:
+                break
+            boundary_sizes[rows, depth] = np.bincount(search,
+                                                      minlength=batch.size)
+            counts = graph.indptr[frontier + 1] - graph.indptr[frontier]
+            keys = (np.repeat(search, counts) * n
+                    + np.asarray(graph.neighbors_of(frontier), dtype=np.int64))
+            seen = visited[keys]
+            edge_counts[rows, depth] = np.bincount(keys[seen] // n,
+                                                   minlength=batch.size)
+            if depth == max_depth:
+                break
+            keys = keys[~seen]
+            positions = np.arange(keys.size)
+            stamp[keys] = positions
+            keys = keys[stamp[keys] == positions]
+            visited[keys] = True
+            reached.append(keys)
+            search, frontier = np.divmod(keys, n)
+        for keys in reached:
+            visited[keys] = False
+    loop_counts = edge_counts - boundary_sizes
+    loop_counts[:, 0] = edge_counts[:, 0]
+    return boundary_sizes, edge_counts, loop_counts
+
+
+def pagerank(graph, d=0.85, iterations=10):
+    """
+    Power iteration PageRank on a (directed) CSRGraph.
+
+    Each iteration sets x_i = (1-d)/n + d * sum_j x_j / k_j^out over the nodes
+    j linking to i, exactly as pagerank_poweriter in ES5 does.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+    d : float
+        damping factor
+    iterations : int
+        number of iterations to perform
+
+    Returns
+    -------
+    x : np.array of floats
+        PageRank of each node, in node id order
+    """
+    n = graph.number_of_nodes()
+    out_degree = graph.out_degree().astype(np.float64)
+    has_out = out_degree > 0
+    inv_out = np.zeros(n)
+    inv_out[has_out] = 1.0 / out_degree[has_out]
+
+    x = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        share = x * inv_out
+        incoming = np.zeros(n)
+        # going through the edges block by block keeps the memory use
+        # bounded, so this also works on memory-mapped graphs
+        for first, last in graph.blocks():
+            src, dst, _ = graph.block_edges(first, last)
+            incoming += np.bincount(dst, weights=share[src], minlength=n)
+        x = (1 - d) / n + d * incoming
+    return x
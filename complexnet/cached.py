@@ -0,0 +1,325 @@
+"""
+Memoized derived properties of a networkx graph.
+
+The exercises compute the same node properties many times: get_link_overlap
+in ES7 rebuilds two neighbor sets and two degrees for every edge, the course
+project computes clustering, degree and betweenness once for the plots and
+again for get_immunized_nodes, and ES6 recomputes the degrees for the
+scatter, the heatmap and the assortativity.
+
+CachedGraph wraps a networkx graph and computes every property once, on
+first use. Per-node properties (degree, strength, neighbor set, triangles,
+clustering, component) are kept per node; when edges are added or removed
+through the wrapper, only the entries of the nodes that can change are
+updated or dropped:
+
+    degree, strength, neighbors   the two endpoints, updated in place
+    triangles                     the endpoints and their common neighbors,
+                                  updated in place
+    clustering                    the same nodes, dropped
+    components                    merged on addition; on removal only the
+                                  component of the edge is searched again
+
+Whole-graph properties registered with memo() (e.g. betweenness) depend on
+everything and are dropped on every change.
+
+    cached = CachedGraph(net)
+    cached.degree('12')
+    cached.memo('betweenness', nx.betweenness_centrality)
+    cached.remove_edge('12', '40')
+
+Mutating cached.net directly bypasses the bookkeeping; call invalidate()
+afterwards in that case.
+"""
+from collections import Counter
+
+
+class CachedGraph(object):
+    """
+    A networkx graph with lazily computed, memoized derived properties.
+
+    Parameters
+    ----------
+    net : networkx.Graph
+        undirected graph to wrap (not copied)
+    weight : str
+        edge attribute used for the strengths
+
+    Attributes
+    ----------
+    net : networkx.Graph
+    n_computed : collections.Counter
+        how many times each property was computed from scratch, for
+        checking that nothing is computed twice
+    """
+
+    def __init__(self, net, weight='weight'):
+        if net.is_directed():
+            raise ValueError('CachedGraph supports undirected graphs only')
+        self.net = net
+        self.weight = weight
+        self.n_computed = Counter()
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Drops everything that has been computed.
+        """
+        self._degree = {}
+        self._strength = {}
+        self._neighbors = {}
+        self._triangles = {}
+        self._clustering = {}
+        self._component_of = None
+        self._components = None
+        self._next_component = 0
+        self._memo = {}
+
+    # ------------------------------------------------------------------
+    # per-node properties
+    # ------------------------------------------------------------------
+
+    def neighbors(self, node):
+        """
+        Returns the neighbors of node as a frozenset.
+        """
+        if node not in self._neighbors:
+            self.n_computed['neighbors'] += 1
+            self._neighbors[node] = frozenset(self.net.adj[node]) - {node}
+        return self._neighbors[node]
+
+    def degree(self, node):
+        if node not in self._degree:
+            self.n_computed['degree'] += 1
+            self._degree[node] = self.net.degree(node)
+        return self._degree[node]
+
+    def strength(self, node):
+        if node not in self._strength:
+            self.n_computed['strength'] += 1
+            self._strength[node] = self.net.degree(node, weight=self.weight)
+        return self._strength[node]
+
+    def triangles(self, node):
+        """
+        Returns the number of triangles node belongs to.
+        """
+        if node not in self._triangles:
+            self.n_computed['triangles'] += 1
+            neighbors = self.neighbors(node)
+            links = sum(len(neighbors & self.neighbors(u)) for u in neighbors)
+            self._triangles[node] = links // 2
+        return self._triangles[node]
+
+    def clustering(self, node):
+        """
+        Returns the clustering coefficient of node, as nx.clustering does.
+        """
+        if node not in self._clustering:
+            self.n_computed['clustering'] += 1
+            k = len(self.neighbors(node))
+            if k < 2:
+                c = 0.0
+            else:
+                c = 2.0 * self.triangles(node) / (k * (k - 1))
+            self._clustering[node] = c
+        return self._clustering[node]
+
+    def common_neighbors(self, u, v):
+        return self.neighbors(u) & self.neighbors(v)
+
+    def link_overlap(self, u, v):
+        """
+        Returns the neighborhood overlap of the link (u, v):
+        O_uv = n_uv / ((k_u - 1) + (k_v - 1) - n_uv)
+        """
+        n_uv = len(self.common_neighbors(u, v))
+        if n_uv == 0:
+            return 0.0
+        return n_uv / float(self.degree(u) - 1 + self.degree(v) - 1 - n_uv)
+
+    def degrees(self):
+        """
+        Returns a dict of the degrees of all nodes.
+        """
+        return {node: self.degree(node) for node in self.net}
+
+    def strengths(self):
+        return {node: self.strength(node) for node in self.net}
+
+    def clusterings(self):
+        return {node: self.clustering(node) for node in self.net}
+
+    def link_overlaps(self):
+        """
+        Returns a list of the overlaps of all links, in net.edges() order.
+        """
+        return [self.link_overlap(u, v) for u, v in self.net.edges()]
+
+    # ------------------------------------------------------------------
+    # components
+    # ------------------------------------------------------------------
+
+    def _find_components(self):
+        if self._component_of is None:
+            import networkx as nx
+
+            self.n_computed['components'] += 1
+            self._component_of = {}
+            self._components = {}
+            for c, nodes in enumerate(nx.connected_components(self.net)):
+                self._components[c] = nodes
+                for node in nodes:
+                    self._component_of[node] = c
+            self._next_component = len(self._components)
+
+    def component_of(self, node):
+        """
+        Returns an id of the connected component of node.
+        """
+        self._find_components()
+        return self._component_of[node]
+
+    def components(self):
+        """
+        Returns the connected components as a list of node sets.
+        """
+        self._find_components()
+        return list(self._components.values())
+
+    def giant_size(self):
+        self._find_components()
+        return max(len(nodes) for nodes in self._components.values())
+
+    # ------------------------------------------------------------------
+    # whole-graph properties
+    # ------------------------------------------------------------------
+
+    def memo(self, name, function, *args, **kwargs):
+        """
+        Returns function(net, *args, **kwargs), computing it only once until
+        the graph changes. The name and the arguments together identify the
+        value.
+        """
+        key = (name, args, tuple(sorted(kwargs.items())))
+        if key not in self._memo:
+            self.n_computed[name] += 1
+            self._memo[key] = function(self.net, *args, **kwargs)
+        return self._memo[key]
+
+    # ------------------------------------------------------------------
+    # mutations
+    # ------------------------------------------------------------------
+
+    def _new_node(self, node):
+        if self._component_of is not None:
+            c = self._next_component
+            self._next_component += 1
+            self._components[c] = {node}
+            self._component_of[node] = c
+
+    def add_node(self, node, **attr):
+        if node in self.net:
+            self.net.add_node(node, **attr)
+            return
+        self.net.add_node(node, **attr)
+        self._memo.clear()
+        self._new_node(node)
+
+    def add_edge(self, u, v, **attr):
+        """
+        Adds the edge (u, v) and updates the affected cached entries.
+        """
+        for node in (u, v):
+            if node not in self.net:
+                self.add_node(node)
+        if self.net.has_edge(u, v):
+            # only the attributes change
+            self.net.add_edge(u, v, **attr)
+            self._strength.pop(u, None)
+            self._strength.pop(v, None)
+            self._memo.clear()
+            return
+        self._update_triangles(u, v, +1)
+        self.net.add_edge(u, v, **attr)
+        self._update_endpoints(u, v, +1)
+
+        if self._component_of is not None:
+            cu, cv = self._component_of[u], self._component_of[v]
+            if cu != cv:
+                # merge the smaller component into the larger one
+                if len(self._components[cu]) < len(self._components[cv]):
+                    cu, cv = cv, cu
+                for node in self._components[cv]:
+                    self._component_of[node] = cu
+                self._components[cu] |= self._components.pop(cv)
+
+    def add_edges_from(self, edges):
+        for edge in edges:
+            u, v = edge[:2]
+            attr = edge[2] if len(edge) > 2 else {}
+            self.add_edge(u, v, **attr)
+
+    def remove_edge(self, u, v):
+        """
+        Removes the edge (u, v) and updates the affected cached entries.
+        """
+        weight = self.net.edges[u, v].get(self.weight, 1)
+        self.net.remove_edge(u, v)
+        self._update_endpoints(u, v, -1, weight)
+        self._update_triangles(u, v, -1)
+
+        if self._component_of is not None and u != v:
+            import networkx as nx
+
+            # only the component that held the edge can split
+            reached = nx.node_connected_component(self.net, u)
+            if v not in reached:
+                c = self._component_of[u]
+                rest = self._components[c] - reached
+                self._components[c] = reached
+                new = self._next_component
+                self._next_component += 1
+                self._components[new] = rest
+                for node in rest:
+                    self._component_of[node] = new
+
+    def remove_edges_from(self, edges):
+        for edge in edges:
+            self.remove_edge(*edge[:2])
+
+    def _update_endpoints(self, u, v, sign, weight=None):
+        self._memo.clear()
+        if weight is None:
+            weight = self.net.edges[u, v].get(self.weight, 1)
+        loop = u == v
+        for node in ((u,) if loop else (u, v)):
+            if node in self._degree:
+                self._degree[node] += sign * (2 if loop else 1)
+            if node in self._strength:
+                self._strength[node] += sign * (2 if loop else 1) * weight
+            if node in self._neighbors and not loop:
+                other = v if node == u else u
+                if sign > 0:
+                    self._neighbors[node] = self._neighbors[node] | {other}
+                else:
+                    self._neighbors[node] = self._neighbors[node] - {other}
+            self._clustering.pop(node, None)
+
+    def _update_triangles(self, u, v, sign):
+        """
+        Adjusts the triangle counts for the edge (u, v) being added
+        (sign=+1, called before adding) or removed (sign=-1, called after
+        removing).
+        """
+        if u == v or not (self._triangles or self._clustering):
+            return
+        common = self.common_neighbors(u, v)
+        for node, change in ((u, len(common)), (v, len(common))):
+            if node in self._triangles:
+                self._triangles[node] += sign * change
+            self._clustering.pop(node, None)
+        for w in common:
+            if w in self._triangles:
+                self._triangles[w] += sign
+            self._clustering.pop(w, None)
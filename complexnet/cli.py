@@ -0,0 +1,460 @@
+"""
+Command line entry point for running the exercise computations headless.
+
+    python -m complexnet list
+    python -m complexnet run es4.percolation --n 1e5 --no-plots
+    python -m complexnet run es4.bfs --n 1e4 --avg-degree 2 --out bfs.json
+    python -m complexnet run es2.er --listen 0.0.0.0:5000   # then, per host:
+    COMPLEXNET_AUTHKEY=... python -m complexnet worker broker-host:5000
+
+The results of a task are written as JSON (the task name, its parameters,
+the run time and the computed data), to <task>.json by default or to the
+file given with --out ('-' for stdout). matplotlib is imported only when a
+figure is requested, and then with the non-interactive Agg backend, so the
+tasks also run on compute nodes without a display; with --no-plots nothing
+but numpy, networkx and the exercise module itself is imported.
+
+A task is registered with the task() decorator: a compute function that
+takes the parsed arguments and returns a JSON-ready dict, and optionally a
+plot function that turns that dict into a figure.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from .percolation import ATTACKS
+
+REPOSITORY = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+TASKS = {}
+
+
+class _Task(object):
+
+    def __init__(self, name, compute, arguments, help, plot=None):
+        self.name = name
+        self.compute = compute
+        self.arguments = arguments
+        self.help = help
+        self.plot = plot
+
+
+def task(name, arguments=(), help=None):
+    """
+    Registers the decorated function as the compute step of a task.
+
+    Parameters
+    ----------
+    name : str
+        task name on the command line, e.g. 'es4.percolation'
+    arguments : list of (flags, kwargs) pairs
+        arguments for argparse's add_argument
+    help : str
+
+    Returns
+    -------
+    decorator : function
+        the decorated function gets a .plot attribute to register the plot
+        step with
+    """
+    def register(compute):
+        entry = _Task(name, compute, list(arguments), help)
+        TASKS[name] = entry
+
+        def plot(function):
+            entry.plot = function
+            return function
+        compute.plot = plot
+        return compute
+    return register
+
+
+def count(text):
+    """
+    Parses an integer given in any float notation, e.g. '1e5'.
+    """
+    value = float(text)
+    if value != int(value):
+        raise argparse.ArgumentTypeError('%r is not an integer' % text)
+    return int(value)
+
+
+def load_exercise(relative_path):
+    """
+    Imports an exercise script (which are not packages) by its path relative
+    to the repository root. The module is imported only once.
+    """
+    name = '_exercise_' + os.path.splitext(relative_path)[0].replace(
+        '/', '_').replace(os.sep, '_').lower()
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            name, os.path.join(REPOSITORY, relative_path))
+        module = importlib.util.module_from_spec(spec)
+        # lets complexnet.workqueue send the module's functions by path
+        module.__exercise__ = relative_path
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except Exception:
+            del sys.modules[name]
+            raise
+    return sys.modules[name]
+
+
+# ----------------------------------------------------------------------
+# tasks
+# ----------------------------------------------------------------------
+
+@task('es4.percolation',
+      [(('--n',), dict(type=count, default=10**5,
+                       help='number of nodes (default 1e5)')),
+       (('--max-k',), dict(type=float, default=2.5,
+                           help='largest average degree (default 2.5)')),
+       (('--step',), dict(type=float, default=0.05,
+                          help='average degree step (default 0.05)')),
+       (('--orders',), dict(type=count, default=1,
+                            help='realizations averaged over (default 1)'))],
+      help='giant component size and susceptibility of ER networks')
+def _es4_percolation(args):
+    module = load_exercise('ES4/percolation_in_er_networks.py')
+    return module.ER_percolation_data(args.n, args.max_k, args.step,
+                                      verbose=False, n_orders=args.orders)
+
+
+@_es4_percolation.plot
+def _plot_es4_percolation(data, args):
+    return load_exercise('ES4/percolation_in_er_networks.py').plot_ER_percolation(data)
+
+
+@task('es4.bfs',
+      [(('--n',), dict(type=count, default=10**4,
+                       help='number of nodes (default 1e4)')),
+       (('--avg-degree',), dict(type=float, default=1.0,
+                                help='expected average degree (default 1)')),
+       (('--samples',), dict(type=count, default=10**4,
+                             help='number of starting nodes (default 1e4)')),
+       (('--max-depth',), dict(type=int, default=15,
+                               help='depth of the searches (default 15)'))],
+      help='breadth first search boundary sizes in an ER network')
+def _es4_bfs(args):
+    module = load_exercise('ES4/percolation_in_er_networks.py')
+    return module.ER_breadth_first_search_data(args.avg_degree, args.n,
+                                               args.samples, args.max_depth)
+
+
+@_es4_bfs.plot
+def _plot_es4_bfs(data, args):
+    module = load_exercise('ES4/percolation_in_er_networks.py')
+    return module.plot_ER_breadth_first_search(data, show_netsize=True)
+
+
+@task('es4.link-removal',
+      [(('--edg',), dict(default='ES4/OClinks_w_undir.edg',
+                         help='weighted edge list, relative to the repository '
+                              'root (default the fb-like network)')),
+       (('--random',), dict(type=count, default=100,
+                            help='random removal orders (default 100)'))],
+      help='giant component size as links are removed by weight and at random')
+def _es4_link_removal(args):
+    module = load_exercise('ES4/error_and_attack_tolerance.py')
+    return module.link_removal_data(os.path.join(REPOSITORY, args.edg),
+                                    args.random)
+
+
+@_es4_link_removal.plot
+def _plot_es4_link_removal(data, args):
+    module = load_exercise('ES4/error_and_attack_tolerance.py')
+    return module.plot_link_removal(data, os.path.basename(args.edg))
+
+
+@task('es4.node-attack',
+      [(('--edg',), dict(default='ES4/OClinks_w_undir.edg',
+                         help='weighted edge list, relative to the repository '
+                              'root (default the fb-like network)')),
+       (('--orders',), dict(type=count, default=10,
+                            help='orders per strategy (default 10)')),
+       (('--strategy',), dict(action='append', choices=ATTACKS,
+                              help='attack to simulate, can be repeated '
+                                   '(default all)'))],
+      help='giant component size as nodes are removed by random and '
+           'degree or strength attacks')
+def _es4_node_attack(args):
+    module = load_exercise('ES4/error_and_attack_tolerance.py')
+    return module.node_attack_data(os.path.join(REPOSITORY, args.edg),
+                                   args.orders,
+                                   strategies=args.strategy or ATTACKS)
+
+
+@_es4_node_attack.plot
+def _plot_es4_node_attack(data, args):
+    module = load_exercise('ES4/error_and_attack_tolerance.py')
+    return module.plot_node_attack(data, os.path.basename(args.edg))
+
+
+def _ensemble_arguments(realizations):
+    return [(('--realizations',), dict(type=count, default=realizations,
+                                       help='realizations per point '
+                                            '(default %d)' % realizations)),
+            (('--workers',), dict(type=int, default=None,
+                                  help='worker processes (default all '
+                                       'cores, 1 runs in this process); '
+                                       'with --listen, local workers to '
+                                       'start next to the remote ones')),
+            (('--listen',), dict(default=None, metavar='HOST:PORT',
+                                 help='hand the realizations out to '
+                                      "'python -m complexnet worker' "
+                                      'processes connecting to this '
+                                      'address (key in '
+                                      '$COMPLEXNET_AUTHKEY)'))]
+
+
+def _sweep_data(realize, arg_list, args):
+    from .ensemble import sweep
+    from .workqueue import Broker, parse_address
+
+    if args.listen is None:
+        results = sweep(realize, arg_list, args.realizations, seed=args.seed,
+                        workers=args.workers)
+    else:
+        with Broker(parse_address(args.listen),
+                    local_workers=args.workers or 0) as broker:
+            results = sweep(realize, arg_list, args.realizations,
+                            seed=args.seed, broker=broker)
+    return {'points': [{'args': list(result.args),
+                        'summary': result.summary(),
+                        'values': {name: values.tolist() for name, values
+                                   in result.values.items()}}
+                       for result in results]}
+
+
+@task('es2.er',
+      [(('--n',), dict(type=count, default=100,
+                       help='number of nodes (default 100)')),
+       (('--p',), dict(type=float, nargs='+',
+                       default=[0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+                       help='link probabilities'))]
+      + _ensemble_arguments(100),
+      help='clustering, degree and diameter of ER ensembles')
+def _es2_er(args):
+    module = load_exercise('ES2/properties_of_er_networks.py')
+    return _sweep_data(module.ER_realization,
+                       [(args.n, p) for p in args.p], args)
+
+
+@task('es2.ws',
+      [(('--n',), dict(type=count, default=1000,
+                       help='number of nodes (default 1000)')),
+       (('--m',), dict(type=int, default=5,
+                       help='ring neighbors (default 5)')),
+       (('--p',), dict(type=float, nargs='+',
+                       default=[0.001 * 2**i for i in range(11)],
+                       help='rewiring probabilities'))]
+      + _ensemble_arguments(10),
+      help='clustering and path length of WS ensembles')
+def _es2_ws(args):
+    module = load_exercise('ES2/implementing_ws_model.py')
+    return _sweep_data(module.WS_realization,
+                       [(args.n, args.m, p) for p in args.p], args)
+
+
+@task('es2.ws-coupled',
+      [(('--n',), dict(type=count, default=1000,
+                       help='number of nodes (default 1000)')),
+       (('--m',), dict(type=int, default=5,
+                       help='ring neighbors (default 5)')),
+       (('--p',), dict(type=float, nargs='+',
+                       default=[0.001 * 2**i for i in range(11)],
+                       help='rewiring probabilities')),
+       (('--sources',), dict(type=count, default=100,
+                             help='BFS sources per path length (default '
+                                  '100)'))],
+      help='WS C(p)/C(0) and L(p)/L(0) from one coupled realization')
+def _es2_ws_coupled(args):
+    from .smallworld import coupled_ws_sweep
+
+    curve = coupled_ws_sweep(args.n, args.m, args.p, rng=args.seed,
+                             n_sources=args.sources)
+    curve['relative_c'] = [c / curve['c0'] for c in curve['c']]
+    curve['relative_l'] = [l / curve['l0'] for l in curve['l']]
+    return curve
+
+
+@task('es3.ba',
+      [(('--n',), dict(type=count, nargs='+', default=[10**4],
+                       help='network sizes (default 1e4)')),
+       (('--m',), dict(type=int, default=2,
+                       help='links per new node (default 2)'))]
+      + _ensemble_arguments(10),
+      help='maximum degree of BA ensembles')
+def _es3_ba(args):
+    module = load_exercise('ES3/implementing_ba_model.py')
+    return _sweep_data(module.BA_realization,
+                       [(n, args.m) for n in args.n], args)
+
+
+@task('es3.ba-growth',
+      [(('--n',), dict(type=count, nargs='+',
+                       default=[10**3, 10**4, 10**5, 10**6],
+                       help='checkpoint sizes (default 1e3 1e4 1e5 1e6)')),
+       (('--m',), dict(type=int, default=2,
+                       help='links per new node (default 2)'))],
+      help='BA degree distributions at checkpoints of one growing network')
+def _es3_ba_growth(args):
+    module = load_exercise('ES3/implementing_ba_model.py')
+    series = module.ba_degree_series(args.n, args.m,
+                                     rng=np.random.default_rng(args.seed))
+    return {'m': args.m,
+            'checkpoints': [{key: value.tolist() if isinstance(
+                                 value, np.ndarray) else value
+                             for key, value in point.items()}
+                            for point in series]}
+
+
+@_es3_ba_growth.plot
+def _plot_es3_ba_growth(data, args):
+    module = load_exercise('ES3/implementing_ba_model.py')
+    series = [dict(point, **{key: np.array(point[key]) for key
+                             in ('bins', 'bincenters', 'pk')})
+              for point in data['checkpoints']]
+    return module.plot_ba_degree_series(series, data['m'])
+
+
+@task('es6.assortativity-null',
+      [(('--edg',), dict(default='ES6/facebook-wosn-links_subgraph.edg',
+                         help='edge list, relative to the repository root '
+                              '(default the facebook-wosn subgraph)')),
+       (('--samples',), dict(type=count, default=1000,
+                             help='number of randomizations (default 1000)')),
+       (('--thinning',), dict(type=count, default=None,
+                              help='swap attempts between samples (default '
+                                   'the number of links)'))],
+      help='assortativity against degree-preserving edge-swap randomizations')
+def _es6_assortativity_null(args):
+    from .io import read_edg
+    from .nullmodel import EdgeSwapper, degree_assortativity
+
+    graph = read_edg(os.path.join(REPOSITORY, args.edg))
+    swapper = EdgeSwapper(graph, rng=args.seed)
+    null = list(swapper.iter_assortativity(args.samples, args.thinning))
+    return {'observed': degree_assortativity(graph), 'null': null,
+            'mean': float(np.mean(null)), 'std': float(np.std(null)),
+            'acceptance': swapper.n_accepted / float(swapper.n_attempts)}
+
+
+@_es6_assortativity_null.plot
+def _plot_es6_assortativity_null(data, args):
+    module = load_exercise('ES6/degree_correlations_assortativity.py')
+    return module.visualize_assortativity_null(
+        np.array(data['null']), data['observed'],
+        os.path.basename(args.edg))
+
+
+# ----------------------------------------------------------------------
+# running
+# ----------------------------------------------------------------------
+
+def _write_json(document, path):
+    if path == '-':
+        json.dump(document, sys.stdout)
+        sys.stdout.write('\n')
+        return
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(document, f)
+    os.replace(tmp_path, path)
+
+
+def run(name, args):
+    """
+    Runs a task and writes its results (and figure).
+
+    Parameters
+    ----------
+    name : str
+    args : argparse.Namespace
+        the task's arguments and out, fig, no_plots and seed
+
+    Returns
+    -------
+    document : dict
+        what was written to the JSON file
+    """
+    entry = TASKS[name]
+    if args.seed is not None:
+        # the ensemble tasks derive their streams from the seed themselves
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+    started = time.time()
+    data = entry.compute(args)
+    elapsed = time.time() - started
+
+    parameters = {key: value for key, value in vars(args).items()
+                  if key not in ('command', 'task', 'out', 'fig', 'no_plots',
+                                 'listen')}
+    document = {'task': name, 'parameters': parameters,
+                'seconds': elapsed, 'data': data}
+    out = args.out or name + '.json'
+    _write_json(document, out)
+
+    if entry.plot is not None and not args.no_plots:
+        import matplotlib
+        matplotlib.use('Agg')
+        fig = entry.plot(data, args)
+        fig.savefig(args.fig or name + '.pdf')
+    return document
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m complexnet',
+        description='Run the exercise computations without a display.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    commands.add_parser('list', help='list the tasks')
+    worker_parser = commands.add_parser(
+        'worker', help='run tasks handed out by a broker (see --listen)')
+    worker_parser.add_argument('address', metavar='HOST:PORT',
+                               help='address of the broker; the key is '
+                                    'read from $COMPLEXNET_AUTHKEY')
+    run_parser = commands.add_parser('run', help='run a task')
+    tasks = run_parser.add_subparsers(dest='task', metavar='TASK')
+    tasks.required = True
+    for name in sorted(TASKS):
+        entry = TASKS[name]
+        task_parser = tasks.add_parser(name, help=entry.help,
+                                       description=entry.help)
+        for flags, kwargs in entry.arguments:
+            task_parser.add_argument(*flags, **kwargs)
+        task_parser.add_argument('--seed', type=int, default=None,
+                                 help='seed of the random number generators')
+        task_parser.add_argument('--out', default=None,
+                                 help="JSON output file (default <task>.json, "
+                                      "'-' for stdout)")
+        # accepted by every task, so that one command line fits all; they
+        # do nothing for the tasks that have no figure
+        task_parser.add_argument('--fig', default=None,
+                                 help='figure file (default <task>.pdf)')
+        task_parser.add_argument('--no-plots', action='store_true',
+                                 help='do not draw or import matplotlib')
+    return parser
+
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+    if args.command == 'list':
+        for name in sorted(TASKS):
+            print('%-20s %s' % (name, TASKS[name].help or ''))
+        return 0
+    if args.command == 'worker':
+        from .workqueue import parse_address, run_worker
+
+        run_worker(parse_address(args.address))
+        return 0
+    run(args.task, args)
+    return 0
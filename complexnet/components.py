@@ -0,0 +1,215 @@
+"""
+Connected components of array graphs, without a Python set per component.
+
+Weak components are found with array operations on the links: every node
+points to a parent with a smaller id, each round every link whose ends are
+in different trees hooks the root with the larger id under the smaller one
+(np.minimum.at), and pointer jumping flattens the trees into stars again.
+Links inside one tree are dropped as they appear, so the rounds get
+cheaper, and a few rounds are enough in practice. Every node ends up
+pointing to the smallest node of its component.
+
+Strong components of directed graphs use an iterative Tarjan search over
+the CSR arrays.
+
+    components = Components(graph)
+    components.labels, components.sizes, components.giant
+    components.size_distribution()  # {size: number of components}
+"""
+import numpy as np
+
+from .graph import as_csr
+
+CONNECTIONS = ('weak', 'strong')
+
+
+def _weak_labels(n, src, dst):
+    """
+    Returns the smallest node of the component of every node.
+    """
+    parent = np.arange(n, dtype=np.int64)
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    while src.size:
+        first, second = parent[src], parent[dst]
+        between = first != second
+        if not between.any():
+            break
+        src, dst = src[between], dst[between]
+        first, second = first[between], second[between]
+        # hook the larger root under the smallest root it is linked to
+        np.minimum.at(parent, np.maximum(first, second),
+                      np.minimum(first, second))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return parent
+
+
+def _strong_labels(indptr, indices):
+    """
+    Tarjan's algorithm with an explicit stack; returns the component of
+    every node, numbered in the order they are completed.
+    """
+    n = len(indptr) - 1
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    labels = [0] * n
+    stack = []
+    counter = 0
+    n_components = 0
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        # (node, position of the next link to look at)
+        work = [(root, indptr[root])]
+        while work:
+            v, i = work[-1]
+            end = indptr[v + 1]
+            while i < end:
+                w = indices[i]
+                i += 1
+                if index[w] == -1:
+                    work[-1] = (v, i)
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, indptr[w]))
+                    break
+                if on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                # all the links of v are done
+                work.pop()
+                if low[v] == index[v]:
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        labels[w] = n_components
+                        if w == v:
+                            break
+                    n_components += 1
+                if work:
+                    u = work[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+    return np.array(labels, dtype=np.int64)
+
+
+def _renumber(keys, n):
+    """
+    Numbers the distinct keys 0..c-1 in the order of the smallest node
+    that has each key.
+    """
+    first = np.full(n, n, dtype=np.int64)
+    np.minimum.at(first, keys, np.arange(n, dtype=np.int64))
+    used = first < n
+    order = np.argsort(first[used], kind='stable')
+    numbers = np.zeros(n, dtype=np.int64)
+    numbers[np.nonzero(used)[0][order]] = np.arange(order.size)
+    return numbers[keys]
+
+
+def connected_components(graph, connection='weak'):
+    """
+    Labels the connected components of a graph.
+
+    Parameters
+    ----------
+    graph : CSRGraph or networkx graph
+    connection : 'weak' or 'strong'
+        for directed graphs; undirected graphs only have one kind
+
+    Returns
+    -------
+    labels : np.array of ints
+        component of every node, numbered 0..c-1 in the order of their
+        smallest node
+    n_components : int
+    """
+    if connection not in CONNECTIONS:
+        raise ValueError('connection should be one of %s, not %r'
+                         % (', '.join(CONNECTIONS), connection))
+    graph = as_csr(graph)
+    n = graph.number_of_nodes()
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), 0
+    if graph.is_directed() and connection == 'strong':
+        labels = _renumber(_strong_labels(graph.indptr.tolist(),
+                                          graph.indices.tolist()), n)
+    else:
+        roots = _weak_labels(n, *graph.edges())
+        # the roots are the smallest nodes, so their order is already right
+        is_root = roots == np.arange(n)
+        labels = (np.cumsum(is_root) - 1)[roots]
+    return labels, int(labels.max()) + 1
+
+
+class Components(object):
+    """
+    The connected components of a graph, their sizes and the largest one,
+    from one labeling.
+
+    Parameters
+    ----------
+    graph : CSRGraph or networkx graph
+    connection : 'weak' or 'strong'
+
+    Attributes
+    ----------
+    labels : np.array of ints
+        component of every node (see connected_components)
+    n_components : int
+    sizes : np.array of ints
+        number of nodes of every component
+    histogram : np.array of ints
+        histogram[s] is the number of components of s nodes
+    giant : np.array of bools
+        mask of the nodes of the largest component (the first one when
+        several are the largest)
+    giant_size : int
+    """
+
+    def __init__(self, graph, connection='weak'):
+        self.labels, self.n_components = connected_components(graph,
+                                                              connection)
+        self.sizes = np.bincount(self.labels, minlength=self.n_components)
+        self.histogram = np.bincount(self.sizes)
+        if self.n_components:
+            largest = int(np.argmax(self.sizes))
+            self.giant_size = int(self.sizes[largest])
+            self.giant = self.labels == largest
+        else:
+            self.giant_size = 0
+            self.giant = np.zeros(0, dtype=bool)
+
+    def size_distribution(self):
+        """
+        Returns {component size: number of components of that size}.
+        """
+        sizes = np.nonzero(self.histogram)[0]
+        return dict(zip(sizes.tolist(), self.histogram[sizes].tolist()))
+
+    def __repr__(self):
+        return '<Components: %d, largest %d nodes>' % (self.n_components,
+                                                       self.giant_size)
+
+
+def giant_component(graph, connection='weak'):
+    """
+    Returns the nodes of the largest component of a graph, in increasing
+    order.
+
+    Returns
+    -------
+    nodes : np.array of ints
+    """
+    return np.nonzero(Components(graph, connection).giant)[0]
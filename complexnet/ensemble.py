@@ -0,0 +1,268 @@
+"""
+Running many independent realizations of a random network model in
+parallel, reproducibly.
+
+A realization is a module-level function
+
+    def realize(rng, *args):
+        net = ...  # draw the network with rng
+        return {'c': ..., 'k': ...}
+
+that draws everything random from the np.random.Generator it is given and
+returns a dict of scalar metrics. Realization i of an ensemble always gets
+the i-th child of np.random.SeedSequence(seed), so the results are
+bit-identical whatever the number of worker processes, and the ensemble
+can be extended or split without reusing random numbers.
+
+    result = run_ensemble(ER_realization, 100, args=(n, p), seed=42)
+    result.mean('c'), result.ci('c')
+
+    results = sweep(ER_realization, [(n, p) for p in ps], 100, seed=42)
+
+For many sweeps, one Ensemble keeps the same process pool:
+
+    with Ensemble(workers=8) as ensemble:
+        for metric_args in ...:
+            ensemble.run(realize, 100, args=metric_args, seed=seed)
+
+To spread the realizations over several machines, give a
+complexnet.workqueue.Broker instead of a pool size; the results are the
+same.
+"""
+import multiprocessing
+import os
+
+import numpy as np
+
+
+def _realize(task):
+    realize, args, index, seed = task
+    return index, realize(np.random.default_rng(seed), *args)
+
+
+def _seed_sequence(seed):
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def _children(sequence, n):
+    """
+    Returns the first n children of a SeedSequence, the same ones that
+    sequence.spawn(n) gives on a fresh sequence, without changing it.
+    """
+    return [np.random.SeedSequence(sequence.entropy,
+                                   spawn_key=sequence.spawn_key + (i,),
+                                   pool_size=sequence.pool_size)
+            for i in range(n)]
+
+
+class EnsembleResult(object):
+    """
+    Metrics of all realizations of an ensemble.
+
+    Attributes
+    ----------
+    args : tuple
+        the model parameters
+    entropy, spawn_key : int, tuple
+        the SeedSequence the realizations were spawned from, enough to
+        reproduce the ensemble
+    values : dict
+        metric name -> np.array of the value of every realization, in
+        realization order
+    """
+
+    def __init__(self, args, sequence, metrics):
+        self.args = args
+        self.entropy = sequence.entropy
+        self.spawn_key = sequence.spawn_key
+        names = sorted(set().union(*metrics)) if metrics else []
+        self.values = {name: np.array([m.get(name, np.nan) for m in metrics],
+                                      dtype=np.float64)
+                       for name in names}
+
+    def __len__(self):
+        return len(next(iter(self.values.values()), ()))
+
+    def metrics(self):
+        return list(self.values)
+
+    def mean(self, name):
+        """
+        Mean of a metric over the realizations; NaN values (e.g. a metric
+        that is undefined for some realizations) are left out.
+        """
+        return float(np.nanmean(self.values[name]))
+
+    def std(self, name):
+        values = self.values[name]
+        values = values[~np.isnan(values)]
+        if values.size < 2:
+            return np.nan
+        return float(values.std(ddof=1))
+
+    def ci(self, name, confidence=0.95):
+        """
+        Half width of the confidence interval of the mean (Student t).
+        """
+        import scipy.stats
+
+        values = self.values[name]
+        n = int((~np.isnan(values)).sum())
+        if n < 2:
+            return np.nan
+        t = scipy.stats.t.ppf(0.5 + confidence / 2, n - 1)
+        return float(t * self.std(name) / np.sqrt(n))
+
+    def summary(self, confidence=0.95):
+        """
+        Returns {metric: {'mean', 'std', 'ci', 'n'}}, ready for JSON.
+        """
+        return {name: {'mean': self.mean(name), 'std': self.std(name),
+                       'ci': self.ci(name, confidence),
+                       'n': int((~np.isnan(values)).sum())}
+                for name, values in self.values.items()}
+
+    def __repr__(self):
+        return '<EnsembleResult %r: %d realizations of %s>' % (
+            self.args, len(self), ', '.join(self.metrics()))
+
+
+class Ensemble(object):
+    """
+    Runs realizations on a process pool.
+
+    Parameters
+    ----------
+    workers : int or None
+        number of processes; None uses all cores, and 0 or 1 runs the
+        realizations in this process
+    broker : complexnet.workqueue.Broker or None
+        runs the realizations on the broker's workers instead (workers is
+        then ignored); the broker is not closed with the ensemble
+    """
+
+    def __init__(self, workers=None, broker=None):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.broker = broker
+        self._pool = None
+
+    def _map(self, tasks):
+        if self.broker is not None:
+            return self.broker.imap_unordered(_realize, tasks)
+        if self.workers <= 1:
+            return map(_realize, tasks)
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers)
+        chunk_size = max(1, len(tasks) // (4 * self.workers))
+        return self._pool.imap_unordered(_realize, tasks, chunk_size)
+
+    def iter_realizations(self, realize, n_realizations, args=(), seed=None):
+        """
+        Yields (index, metrics) for every realization as soon as it is done,
+        in no particular order.
+        """
+        children = _children(_seed_sequence(seed), n_realizations)
+        tasks = [(realize, tuple(args), i, child)
+                 for i, child in enumerate(children)]
+        return self._map(tasks)
+
+    def run(self, realize, n_realizations, args=(), seed=None, callback=None):
+        """
+        Runs an ensemble.
+
+        Parameters
+        ----------
+        realize : function
+            realize(rng, *args) -> dict of metrics; must be picklable, i.e.
+            defined at the top level of a module
+        n_realizations : int
+        args : tuple
+            model parameters given to realize
+        seed : int, np.random.SeedSequence or None
+        callback : function or None
+            called as callback(index, metrics) whenever a realization is
+            done, e.g. to log progress or write the values out
+
+        Returns
+        -------
+        result : EnsembleResult
+        """
+        sequence = _seed_sequence(seed)
+        metrics = [None] * n_realizations
+        for index, values in self.iter_realizations(realize, n_realizations,
+                                                    args, sequence):
+            metrics[index] = values
+            if callback is not None:
+                callback(index, values)
+        return EnsembleResult(tuple(args), sequence, metrics)
+
+    def sweep(self, realize, arg_list, n_realizations, seed=None,
+              callback=None):
+        """
+        Runs one ensemble for every parameter tuple in arg_list. Point j
+        uses the j-th child of the root SeedSequence, so its results are
+        the same as those of run(realize, n_realizations, arg_list[j],
+        children[j]). The realizations of all points are spread over the
+        workers together.
+
+        Parameters
+        ----------
+        callback : function or None
+            called as callback(args, index, metrics)
+
+        Returns
+        -------
+        results : list of EnsembleResult
+        """
+        arg_list = [tuple(args) for args in arg_list]
+        points = _children(_seed_sequence(seed), len(arg_list))
+        tasks = []
+        for j, (args, point) in enumerate(zip(arg_list, points)):
+            tasks.extend((realize, args, (j, i), child) for i, child
+                         in enumerate(_children(point, n_realizations)))
+        metrics = [[None] * n_realizations for _ in arg_list]
+        for (j, i), values in self._map(tasks):
+            metrics[j][i] = values
+            if callback is not None:
+                callback(arg_list[j], i, values)
+        return [EnsembleResult(args, point, point_metrics)
+                for args, point, point_metrics
+                in zip(arg_list, points, metrics)]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def run_ensemble(realize, n_realizations, args=(), seed=None, workers=None,
+                 callback=None, broker=None):
+    """
+    Runs n_realizations of realize(rng, *args) on a process pool (or the
+    workers of a broker); see Ensemble.run.
+    """
+    with Ensemble(workers, broker) as ensemble:
+        return ensemble.run(realize, n_realizations, args, seed, callback)
+
+
+def sweep(realize, arg_list, n_realizations, seed=None, workers=None,
+          callback=None, broker=None):
+    """
+    Runs an ensemble for every parameter tuple in arg_list on one process
+    pool (or the workers of a broker); see Ensemble.sweep. The callback gets
+    (args, index, metrics).
+    """
+    with Ensemble(workers, broker) as ensemble:
+        return ensemble.sweep(realize, arg_list, n_realizations, seed,
+                              callback)
@@ -0,0 +1,310 @@
+"""
+Exact ensemble averages of small G(n, p) random graphs.
+
+A G(n, p) graph with m links has probability p**m (1-p)**(M-m), M = n(n-1)/2,
+so the expectation of any graph measure f is
+
+    E[f](p) = sum over m of a_m p**m (1-p)**(M-m),
+    a_m = sum of f over the labeled graphs with m links,
+
+a polynomial in p. Isomorphic graphs share f, so a_m only needs f once for
+every isomorphism class, weighted by the number of labeled graphs in the
+class. There are 2**28 labeled graphs on 8 nodes but only 12346
+classes.
+
+The classes of n nodes are made from those of n-1 nodes by adding a node
+linked to every subset of the others. Graphs are kept as adjacency
+bitmasks and recognized by a canonical code: color refinement splits the
+nodes into cells that any isomorphism preserves, and the largest adjacency
+code over the orders within the cells identifies the class. The classes
+are generated once per process and cached.
+
+    ensemble = ExactEnsemble(5)
+    ensemble.expectation('c', np.linspace(0, 1, 101))
+    ensemble.polynomial('k')  # 4p
+"""
+import math
+
+import numpy as np
+
+# largest number of nodes enumerated; 9 nodes has 274668 classes
+MAX_NODES = 8
+
+# node orders tried for a canonical form before falling back to the
+# networkx isomorphism test (only very symmetric graphs get there)
+_MAX_ORDERS = 720
+
+# n -> list of (adjacency bitmasks, number of labeled graphs)
+_CLASSES = {}
+_GRAPHS = {}
+
+
+def _popcount(bits):
+    # int.bit_count needs Python 3.10
+    return bin(bits).count('1')
+
+
+def _refine(adjacency):
+    """
+    Color refinement: returns the nodes grouped into cells of the coarsest
+    equitable partition, the cells in an order that does not depend on the
+    labeling.
+    """
+    n = len(adjacency)
+    cells = [(1 << n) - 1]
+    while True:
+        # a node's signature: its cell and its number of neighbors per cell
+        signatures = []
+        for v in range(n):
+            for color, cell in enumerate(cells):
+                if cell >> v & 1:
+                    break
+            signatures.append((color,) + tuple(_popcount(adjacency[v] & cell)
+                                               for cell in cells))
+        ranks = {signature: rank for rank, signature
+                 in enumerate(sorted(set(signatures)))}
+        if len(ranks) == len(cells):
+            break
+        cells = [0] * len(ranks)
+        for v, signature in enumerate(signatures):
+            cells[ranks[signature]] |= 1 << v
+    return [[v for v in range(n) if cell >> v & 1] for cell in cells]
+
+
+def _code(adjacency, order):
+    code = 0
+    for i, v in enumerate(order):
+        row = adjacency[v]
+        for u in order[i + 1:]:
+            code = 2 * code + (row >> u & 1)
+    return code
+
+
+def _canonical_code(adjacency):
+    """
+    Returns the largest adjacency code over the node orders that keep the
+    refined cells in place, the same for all isomorphic graphs, or None
+    if there are too many such orders.
+    """
+    import itertools
+
+    cells = _refine(adjacency)
+    n_orders = 1
+    for cell in cells:
+        n_orders *= math.factorial(len(cell))
+    if n_orders > _MAX_ORDERS:
+        return None
+    return max(_code(adjacency, sum(cell_orders, ()))
+               for cell_orders in itertools.product(
+                   *[itertools.permutations(cell) for cell in cells]))
+
+
+def _to_networkx(adjacency):
+    import networkx as nx
+
+    n = len(adjacency)
+    graph = nx.Graph()
+    graph.add_nodes_from(range(n))
+    graph.add_edges_from((u, v) for v in range(n) for u in range(v)
+                         if adjacency[v] >> u & 1)
+    return graph
+
+
+def _classes(n):
+    """
+    Returns [(adjacency, n_labeled)] for the classes of n nodes.
+
+    Every labeled graph of n nodes is a labeled graph of n-1 nodes plus the
+    neighbor set of node n-1, so the labeled graphs of a class are counted
+    by adding up the labeled graphs of the smaller classes it is made from.
+    """
+    import networkx as nx
+
+    if n in _CLASSES:
+        return _CLASSES[n]
+    if n == 0:
+        _CLASSES[0] = [((), 1)]
+        return _CLASSES[0]
+
+    # a class and its complement have the same number of labeled graphs,
+    # so only the graphs with at most half of the links are generated
+    n_pairs = n * (n - 1) // 2
+    counts = {}
+    representatives = {}
+    symmetric = []  # [adjacency, networkx graph, n_labeled] without a code
+    for smaller, n_labeled in _classes(n - 1):
+        n_links = sum(_popcount(bits) for bits in smaller) // 2
+        for subset in range(2**(n - 1)):
+            if 2 * (n_links + _popcount(subset)) > n_pairs:
+                continue
+            adjacency = tuple(bits | (subset >> v & 1) << (n - 1)
+                              for v, bits in enumerate(smaller)) + (subset,)
+            code = _canonical_code(adjacency)
+            if code is not None:
+                if code not in counts:
+                    counts[code] = 0
+                    representatives[code] = adjacency
+                counts[code] += n_labeled
+                continue
+            graph = _to_networkx(adjacency)
+            for entry in symmetric:
+                if nx.is_isomorphic(graph, entry[1]):
+                    entry[2] += n_labeled
+                    break
+            else:
+                symmetric.append([adjacency, graph, n_labeled])
+
+    classes = [(representatives[code], counts[code])
+               for code in sorted(counts)]
+    classes.extend((adjacency, n_labeled)
+                   for adjacency, _, n_labeled in symmetric)
+    full = (1 << n) - 1
+    for adjacency, n_labeled in list(classes):
+        # with fewer than half of the links, the complement is another class
+        if sum(_popcount(bits) for bits in adjacency) < n_pairs:
+            classes.append((tuple(~bits & full & ~(1 << v) for v, bits
+                                  in enumerate(adjacency)), n_labeled))
+    _CLASSES[n] = classes
+    return classes
+
+
+def isomorphism_classes(n):
+    """
+    Returns one graph of every isomorphism class of graphs with n nodes and
+    the number of labeled graphs in the class.
+
+    Parameters
+    ----------
+    n : int
+        at most MAX_NODES
+
+    Returns
+    -------
+    classes : list of (networkx.Graph, int) pairs
+        the graphs have nodes 0..n-1
+    """
+    n = int(n)
+    if not 0 <= n <= MAX_NODES:
+        raise ValueError('isomorphism classes are enumerated for 0 to %d '
+                         'nodes, not %d' % (MAX_NODES, n))
+    if n not in _GRAPHS:
+        _GRAPHS[n] = [(_to_networkx(adjacency), n_labeled)
+                      for adjacency, n_labeled in _classes(n)]
+    return _GRAPHS[n]
+
+
+def average_degree(graph):
+    n = graph.number_of_nodes()
+    return 2.0 * graph.number_of_edges() / n if n else 0.0
+
+
+def average_clustering(graph):
+    import networkx as nx
+
+    return nx.average_clustering(graph) if graph.number_of_nodes() else 0.0
+
+
+def giant_diameter(graph):
+    """
+    Diameter of the largest connected component. When several components
+    are the largest, their mean: a uniformly random labeling makes each of
+    them the first one found (the one taken by max(..., key=len)) equally
+    often.
+    """
+    import networkx as nx
+
+    components = list(nx.connected_components(graph))
+    if not components:
+        return 0.0
+    size = max(len(component) for component in components)
+    return float(np.mean([nx.diameter(graph.subgraph(component))
+                          for component in components
+                          if len(component) == size]))
+
+
+# the measures of ES2 ER_properties
+DEFAULT_METRICS = {'c': average_clustering,
+                   'k': average_degree,
+                   'd': giant_diameter}
+
+
+class ExactEnsemble(object):
+    """
+    Exact expectations of graph measures over G(n, p), as functions of p.
+
+    Parameters
+    ----------
+    n : int
+        number of nodes, at most MAX_NODES
+    metrics : dict or None
+        name -> function of a networkx graph returning a number;
+        DEFAULT_METRICS by default
+
+    Attributes
+    ----------
+    n_pairs : int
+        M, the number of node pairs
+    coefficients : dict
+        name -> np.array of a_0..a_M, the sums of the measure over the
+        labeled graphs with m links
+    n_classes : int
+    """
+
+    def __init__(self, n, metrics=None):
+        if metrics is None:
+            metrics = DEFAULT_METRICS
+        self.n = int(n)
+        self.n_pairs = self.n * (self.n - 1) // 2
+        classes = isomorphism_classes(self.n)
+        self.n_classes = len(classes)
+        self.coefficients = {}
+        for name, function in metrics.items():
+            coefficients = np.zeros(self.n_pairs + 1)
+            for graph, n_labeled in classes:
+                coefficients[graph.number_of_edges()] += (
+                    n_labeled * function(graph))
+            self.coefficients[name] = coefficients
+
+    def metrics(self):
+        return list(self.coefficients)
+
+    def expectation(self, name, p):
+        """
+        Returns the expectation of a measure at link probability p.
+
+        Parameters
+        ----------
+        name : str
+        p : float or array of floats
+
+        Returns
+        -------
+        value : float or np.array
+        """
+        p = np.asarray(p, dtype=np.float64)
+        m = np.arange(self.n_pairs + 1).reshape((-1,) + (1,) * p.ndim)
+        terms = (self.coefficients[name].reshape(m.shape)
+                 * p**m * (1 - p)**(self.n_pairs - m))
+        value = terms.sum(axis=0)
+        return float(value) if value.ndim == 0 else value
+
+    def polynomial(self, name):
+        """
+        Returns the expectation of a measure as a polynomial in p.
+
+        Returns
+        -------
+        polynomial : np.polynomial.Polynomial
+        """
+        Polynomial = np.polynomial.Polynomial
+        p = Polynomial([0, 1])
+        q = Polynomial([1, -1])
+        total = Polynomial([0])
+        for m, a in enumerate(self.coefficients[name]):
+            if a:
+                total = total + a * p**m * q**(self.n_pairs - m)
+        return total
+
+    def __repr__(self):
+        return '<ExactEnsemble n=%d: %d classes, %s>' % (
+            self.n, self.n_classes, ', '.join(self.metrics()))
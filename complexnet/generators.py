@@ -0,0 +1,695 @@
+"""
+Random graph generators that produce CSRGraphs directly.
+
+The networkx generators build a dict of dicts one edge at a time, which
+dominates the run time of the ensemble exercises. The generators here draw
+the edges in bulk with NumPy and fill the CSR arrays without ever creating
+Python objects per edge.
+
+The node pairs of a graph are numbered 0..M-1 (M = n(n-1)/2 undirected,
+n(n-1) directed), so that drawing a G(n, p) graph means drawing a random
+subset of those numbers: the gaps between consecutive chosen pair numbers
+are geometrically distributed with parameter p, so only about p*M numbers
+are drawn (geometric skipping, as in nx.fast_gnp_random_graph). G(n, m)
+draws m distinct pair numbers; random_pair_order shuffles them, giving the
+links of the Erdos-Renyi graph process in the order they appear.
+
+watts_strogatz_graph builds the ring lattice with array arithmetic and
+rewires all chosen links at once, redrawing only the ends that would give a
+self-loop or a duplicate link. barabasi_albert_graph grows a preferential
+attachment network in linear time from a preallocated endpoint array;
+growth_degrees replays its growth to give the degrees at intermediate sizes.
+
+configuration_model and directed_configuration_model pair up shuffled
+arrays of stubs, optionally erasing the self-loops and multi-edges.
+
+All generators take `rng`, anything np.random.default_rng accepts: a
+np.random.Generator, an int seed, or None for fresh entropy.
+"""
+import numpy as np
+
+from .graph import CSRGraph, _index_dtype
+
+# number of pair numbers drawn at once
+_BATCH = 2**22
+
+
+def _sorted_unique(values):
+    # np.unique can be much slower than an in-place sort on large arrays
+    values = np.sort(values)
+    keep = np.ones(values.size, dtype=bool)
+    keep[1:] = values[1:] != values[:-1]
+    return values[keep]
+
+
+def _number_of_pairs(n, directed):
+    if directed:
+        return n * (n - 1)
+    return n * (n - 1) // 2
+
+
+def _decode_pairs(numbers, n, directed):
+    """
+    Turns pair numbers into (row, col) arrays.
+
+    Undirected pairs are numbered row by row over the lower triangle,
+    (1, 0), (2, 0), (2, 1), (3, 0), ..., so row > col and increasing
+    numbers give pairs sorted by (row, col). Directed pairs are numbered row
+    by row over all ordered pairs without the diagonal.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    dtype = _index_dtype(n)
+    if directed:
+        row = numbers // (n - 1)
+        col = numbers - row * (n - 1)
+        col += col >= row
+        return row.astype(dtype), col.astype(dtype)
+    # row r starts at number r(r-1)/2; the float estimate can be off by one
+    row = ((1 + np.sqrt(1 + 8 * numbers.astype(np.float64))) // 2).astype(np.int64)
+    row -= row * (row - 1) // 2 > numbers
+    row += (row + 1) * row // 2 <= numbers
+    col = numbers - row * (row - 1) // 2
+    return row.astype(dtype), col.astype(dtype)
+
+
+def _geometric_numbers(n_pairs, p, rng):
+    """
+    Yields sorted arrays of pair numbers, each pair chosen with probability
+    p, in batches.
+    """
+    if p <= 0 or n_pairs == 0:
+        return
+    if p >= 1:
+        for first in range(0, n_pairs, _BATCH):
+            yield np.arange(first, min(n_pairs, first + _BATCH), dtype=np.int64)
+        return
+    # enough draws to cover all pairs at once for all but huge graphs
+    expected = p * n_pairs
+    batch = int(min(_BATCH, expected + 5 * np.sqrt(expected) + 16))
+    last = -1
+    while True:
+        gaps = rng.geometric(p, size=batch)
+        numbers = last + np.cumsum(gaps)
+        if numbers[-1] >= n_pairs:
+            yield numbers[:np.searchsorted(numbers, n_pairs)]
+            return
+        last = int(numbers[-1])
+        yield numbers
+
+
+def _csr_from_keys(n, keys):
+    """
+    Builds CSR arrays from the keys src*n+dst of all entries; the keys
+    array is sorted and reused in place.
+    """
+    # sorting plain integers is much faster than an argsort
+    keys.sort()
+    src = keys // n
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    src *= n
+    keys -= src
+    del src
+    return indptr, keys.astype(_index_dtype(n))
+
+
+def _undirected_csr(n, row, col):
+    """
+    Builds the CSR arrays of an undirected graph from its pairs, storing
+    both directions (self-loops once). Repeated pairs give repeated entries.
+    """
+    row = row.astype(np.int64)
+    col = col.astype(np.int64)
+    not_loop = row != col
+    keys = np.concatenate([row * n + col, (col * n + row)[not_loop]])
+    del row, col, not_loop
+    return _csr_from_keys(n, keys)
+
+
+def _graph_from_pairs(n, row, col, directed):
+    """
+    Builds a CSRGraph from distinct pairs. Directed pairs must be sorted by
+    (row, col), as they are when decoded from sorted pair numbers.
+    """
+    if directed:
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row, minlength=n), out=indptr[1:])
+        return CSRGraph(indptr, col, directed=True)
+    indptr, indices = _undirected_csr(n, row, col)
+    return CSRGraph(indptr, indices)
+
+
+def gnp_random_graph(n, p, rng=None, directed=False):
+    """
+    Returns a G(n, p) Erdos-Renyi random graph: every pair of nodes is
+    linked independently with probability p.
+
+    Parameters
+    ----------
+    n : int
+        number of nodes
+    p : float
+        link probability
+    rng : np.random.Generator, int or None
+    directed : bool
+        if True, every ordered pair (i, j) is linked independently
+
+    Returns
+    -------
+    graph : CSRGraph
+        nodes 0..n-1, no self-loops
+    """
+    n = int(n)
+    rng = np.random.default_rng(rng)
+    n_pairs = _number_of_pairs(n, directed)
+    chunks = [_decode_pairs(numbers, n, directed)
+              for numbers in _geometric_numbers(n_pairs, p, rng)]
+    dtype = _index_dtype(n)
+    row = np.concatenate([r for r, _ in chunks] + [np.zeros(0, dtype)])
+    col = np.concatenate([c for _, c in chunks] + [np.zeros(0, dtype)])
+    del chunks
+    return _graph_from_pairs(n, row, col, directed)
+
+
+def gnm_random_graph(n, m, rng=None, directed=False):
+    """
+    Returns a G(n, m) random graph: m distinct links chosen uniformly among
+    all pairs of nodes.
+
+    Parameters
+    ----------
+    n : int
+        number of nodes
+    m : int
+        number of links
+    rng : np.random.Generator, int or None
+    directed : bool
+
+    Returns
+    -------
+    graph : CSRGraph
+    """
+    n, m = int(n), int(m)
+    rng = np.random.default_rng(rng)
+    n_pairs = _number_of_pairs(n, directed)
+    if m > n_pairs:
+        raise ValueError('%d links do not fit in a graph of %d nodes'
+                         % (m, n))
+    if 2 * m > n_pairs:
+        # dense: choose the pairs that are left out instead
+        left_out = rng.choice(n_pairs, n_pairs - m, replace=False)
+        keep = np.ones(n_pairs, dtype=bool)
+        keep[left_out] = False
+        row, col = _decode_pairs(np.nonzero(keep)[0], n, directed)
+        return _graph_from_pairs(n, row, col, directed)
+
+    row, col = _decode_pairs(_distinct_numbers(n_pairs, m, rng), n, directed)
+    return _graph_from_pairs(n, row, col, directed)
+
+
+def _distinct_numbers(n_pairs, m, rng):
+    """
+    Returns m distinct random numbers below n_pairs, sorted; for m well
+    below n_pairs.
+    """
+    numbers = np.zeros(0, dtype=np.int64)
+    while numbers.size < m:
+        missing = m - numbers.size
+        # draw a few more than needed, as some will be duplicates
+        extra = rng.integers(0, n_pairs, size=missing + missing // 10 + 16)
+        numbers = _sorted_unique(np.concatenate([numbers, extra]))
+    if numbers.size > m:
+        # drop random surplus numbers, not the largest ones
+        surplus = rng.choice(numbers.size, numbers.size - m, replace=False)
+        numbers = np.delete(numbers, surplus)
+    return numbers
+
+
+def random_pair_order(n, m, rng=None):
+    """
+    Returns m distinct node pairs of an undirected graph of n nodes in a
+    uniformly random order, so that the first j of them are a G(n, j)
+    graph for every j: the links of the Erdos-Renyi graph process.
+
+    Returns
+    -------
+    src, dst : np.arrays of ints
+    """
+    n, m = int(n), int(m)
+    rng = np.random.default_rng(rng)
+    n_pairs = _number_of_pairs(n, False)
+    if m > n_pairs:
+        raise ValueError('%d links do not fit in a graph of %d nodes'
+                         % (m, n))
+    if 2 * m > n_pairs:
+        numbers = rng.permutation(n_pairs)[:m]
+    else:
+        numbers = _distinct_numbers(n_pairs, m, rng)
+        rng.shuffle(numbers)
+    return _decode_pairs(numbers, n, False)
+
+
+def ring_edges(n, k):
+    """
+    Returns the edges of a ring lattice in which every node is linked to
+    its k nearest neighbors, k // 2 on each side.
+
+    Returns
+    -------
+    src, dst : np.arrays of ints
+        edge i links src[i] to dst[i] = src[i] + j (mod n), j = 1..k//2
+    """
+    half = int(k) // 2
+    if n <= 2 * half:
+        raise ValueError('a ring of %d nodes cannot have %d neighbors per '
+                         'node' % (n, 2 * half))
+    src = np.repeat(np.arange(n, dtype=np.int64), half)
+    dst = (src + np.tile(np.arange(1, half + 1), n)) % n
+    return src, dst
+
+
+def _edge_keys(u, v, n):
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    return np.minimum(u, v) * n + np.maximum(u, v)
+
+
+def _contains(sorted_keys, keys):
+    """
+    Vectorized membership test of keys in a sorted array.
+    """
+    if sorted_keys.size == 0:
+        return np.zeros(keys.size, dtype=bool)
+    position = np.minimum(np.searchsorted(sorted_keys, keys),
+                          sorted_keys.size - 1)
+    return sorted_keys[position] == keys
+
+
+def rewire_edges(src, dst, n, p, rng=None, max_rounds=64):
+    """
+    Rewires the dst end of every edge with probability p to a node chosen
+    uniformly among those that are neither src itself nor already linked
+    to src, as in the Watts-Strogatz model.
+
+    All edges to rewire draw a new end at once; draws that would create a
+    self-loop or a duplicate link (with an existing edge or with another
+    draw of the same round) are rejected and drawn again in the next round.
+    An edge keeps its original link reserved until it is placed, so it is
+    never taken by another draw, and an edge whose src is already linked to
+    every other node stays where it is. Membership is tested against sorted
+    arrays of the edge keys, so no per-node neighbor scans are needed.
+
+    Parameters
+    ----------
+    src, dst : arrays of ints
+        edges of a simple graph
+    n : int
+        number of nodes
+    p : float
+        rewiring probability
+    rng : np.random.Generator, int or None
+    max_rounds : int
+        rounds of bulk redraws before the few remaining edges are placed one
+        at a time
+
+    Returns
+    -------
+    src, dst : np.arrays of ints
+        the edges after rewiring, in the same order
+    rewired : np.array of bools
+        which edges were rewired
+    """
+    rng = np.random.default_rng(rng)
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.array(dst, dtype=np.int64)
+    rewired = rng.random(src.size) < p
+    kept = np.sort(_edge_keys(src[~rewired], dst[~rewired], n))
+    added = np.zeros(0, dtype=np.int64)
+    pending = np.nonzero(rewired)[0]
+
+    for _ in range(max_rounds):
+        if pending.size == 0:
+            break
+        u = src[pending]
+        reserved = np.sort(_edge_keys(u, dst[pending], n))
+        w = rng.integers(0, n, size=pending.size)
+        keys = _edge_keys(u, w, n)
+        ok = ((w != u) & ~_contains(kept, keys) & ~_contains(added, keys)
+              & ~_contains(reserved, keys))
+        # of the draws that give the same link, only the first one counts
+        candidates = np.nonzero(ok)[0]
+        order = candidates[np.argsort(keys[candidates], kind='stable')]
+        first = np.ones(order.size, dtype=bool)
+        first[1:] = keys[order[1:]] != keys[order[:-1]]
+        ok[:] = False
+        ok[order[first]] = True
+
+        dst[pending[ok]] = w[ok]
+        added = np.sort(np.concatenate([added, keys[ok]]))
+        pending = pending[~ok]
+
+    if pending.size:
+        # only nearly complete graphs get here: place the rest exactly
+        existing = (set(kept.tolist()) | set(added.tolist())
+                    | set(_edge_keys(src[pending], dst[pending], n).tolist()))
+        for e in pending.tolist():
+            u, v = int(src[e]), int(dst[e])
+            free = [w for w in range(n)
+                    if w != u and min(u, w) * n + max(u, w) not in existing]
+            if not free:
+                # u is linked to everybody already: the edge stays
+                rewired[e] = False
+                continue
+            w = free[rng.integers(len(free))]
+            existing.add(min(u, w) * n + max(u, w))
+            existing.discard(min(u, v) * n + max(u, v))
+            dst[e] = w
+    return src, dst, rewired
+
+
+def watts_strogatz_graph(n, k, p, rng=None):
+    """
+    Returns a Watts-Strogatz small-world graph: a ring lattice of n nodes,
+    each linked to its k nearest neighbors, whose links are rewired with
+    probability p (see rewire_edges).
+
+    Parameters
+    ----------
+    n : int
+        number of nodes
+    k : int
+        number of nearest neighbors in the ring (k // 2 on each side)
+    p : float
+        rewiring probability
+    rng : np.random.Generator, int or None
+
+    Returns
+    -------
+    graph : CSRGraph
+    """
+    n = int(n)
+    src, dst = ring_edges(n, k)
+    src, dst, _ = rewire_edges(src, dst, n, p, rng)
+    indptr, indices = _undirected_csr(n, src, dst)
+    return CSRGraph(indptr, indices)
+
+
+# new nodes whose links are drawn one by one before the rest is drawn in
+# bulk: duplicate targets are frequent only while the graph is small
+_SEQUENTIAL_NODES = 1024
+
+
+def _resolve_targets(endpoints, draws, first_entry):
+    """
+    Looks up the endpoints drawn for the links whose targets are drawn in
+    bulk. A draw that hits the target slot of another bulk link takes that
+    link's target, which is found by pointer jumping.
+
+    Parameters
+    ----------
+    endpoints : np.array of ints
+        the endpoint array; the slots below first_entry and all source slots
+        are filled in
+    draws : np.array of ints
+        the drawn slot of every bulk link, in link order
+    first_entry : int
+        slot index of the first bulk link (even)
+
+    Returns
+    -------
+    targets : np.array of ints
+    """
+    first_link = first_entry // 2
+    unknown = (draws >= first_entry) & (draws % 2 == 1)
+    targets = np.where(unknown, -1, endpoints[np.where(unknown, 0, draws)])
+    pointer = np.where(unknown, (draws - 1) // 2 - first_link, -1)
+    pending = np.nonzero(unknown)[0]
+    while pending.size:
+        parent = pointer[pending]
+        grandparent = pointer[parent]
+        done = grandparent < 0
+        targets[pending[done]] = targets[parent[done]]
+        pointer[pending] = grandparent
+        pending = pending[~done]
+    return targets
+
+
+def barabasi_albert_edges(n, m, rng=None, seed_graph=None):
+    """
+    Grows a Barabasi-Albert network and returns its links in the order they
+    were added.
+
+    Every new node links to m distinct existing nodes chosen with
+    probability proportional to their degree. As in the algorithm of
+    Batagelj and Brandes, the two endpoints of every link are stored in one
+    preallocated array, so drawing a uniform slot of the filled part picks
+    a node proportionally to its degree. A draw that repeats a target of
+    the same node is redrawn.
+
+    The first new nodes are grown one at a time. For the rest all the draws
+    are made at once: a draw that hits the target of an earlier link of the
+    same batch takes that link's target (resolved by pointer jumping), and
+    duplicate targets are redrawn in rounds until there are none.
+
+    Parameters
+    ----------
+    n : int
+        final number of nodes
+    m : int
+        links of every new node
+    rng : np.random.Generator, int or None
+    seed_graph : CSRGraph, networkx graph or None
+        the initial network, whose nodes become 0..n0-1; by default a
+        complete graph of m + 1 nodes. At least m of its nodes need links.
+
+    Returns
+    -------
+    src, dst : np.arrays of ints
+        the seed links first, then the m links of every new node; the new
+        node is src
+    n_seed : int
+        number of nodes of the seed graph
+    """
+    from .graph import as_csr
+
+    n, m = int(n), int(m)
+    rng = np.random.default_rng(rng)
+    if m < 1:
+        raise ValueError('m must be at least 1')
+    if seed_graph is None:
+        n_seed = m + 1
+        seed_src, seed_dst = np.triu_indices(n_seed, 1)
+    else:
+        seed_graph = as_csr(seed_graph)
+        n_seed = seed_graph.number_of_nodes()
+        seed_src, seed_dst = seed_graph.edges()
+        if (seed_src == seed_dst).any():
+            raise ValueError('the seed graph should not have self-loops')
+    linked = np.union1d(seed_src, seed_dst).size
+    if linked < m:
+        raise ValueError('the seed graph has only %d linked nodes, at least '
+                         'm = %d are needed' % (linked, m))
+    if n < n_seed:
+        raise ValueError('n is smaller than the seed graph')
+
+    n_new = n - n_seed
+    n_seed_links = seed_src.size
+    n_links = n_seed_links + m * n_new
+    endpoints = np.empty(2 * n_links, dtype=np.int64)
+    endpoints[0:2 * n_seed_links:2] = seed_src
+    endpoints[1:2 * n_seed_links:2] = seed_dst
+    endpoints[2 * n_seed_links::2] = np.repeat(np.arange(n_seed, n), m)
+
+    # the first nodes one link at a time, rejecting repeated targets
+    n_sequential = min(n_new, _SEQUENTIAL_NODES)
+    for t in range(n_sequential):
+        first = 2 * (n_seed_links + m * t)
+        chosen = set()
+        draws = iter(())
+        while len(chosen) < m:
+            slot = next(draws, None)
+            if slot is None:
+                draws = iter(rng.integers(0, first, size=4 * m).tolist())
+                continue
+            target = int(endpoints[slot])
+            if target not in chosen:
+                endpoints[first + 2 * len(chosen) + 1] = target
+                chosen.add(target)
+
+    # the rest in bulk
+    n_bulk = n_new - n_sequential
+    if n_bulk:
+        first_entry = 2 * (n_seed_links + m * n_sequential)
+        node_rank = np.repeat(np.arange(n_sequential, n_new), m)
+        limits = 2 * (n_seed_links + m * node_rank)
+        del node_rank
+        draws = rng.integers(0, limits)
+        while True:
+            targets = _resolve_targets(endpoints, draws, first_entry)
+            # repeated targets of one node: keep the first, redraw the rest
+            per_node = targets.reshape(n_bulk, m)
+            order = np.argsort(per_node, axis=1, kind='stable')
+            ordered = np.take_along_axis(per_node, order, axis=1)
+            repeated = np.zeros(per_node.shape, dtype=bool)
+            repeated[:, 1:] = ordered[:, 1:] == ordered[:, :-1]
+            rows, columns = np.nonzero(repeated)
+            redraw = rows * m + order[rows, columns]
+            if redraw.size == 0:
+                break
+            draws[redraw] = rng.integers(0, limits[redraw])
+        endpoints[first_entry + 1::2] = targets
+
+    return endpoints[0::2].copy(), endpoints[1::2].copy(), n_seed
+
+
+def growth_degrees(src, dst, n_seed, m, sizes):
+    """
+    Replays the growth of a network returned by barabasi_albert_edges and
+    yields the degrees of its nodes when it reaches each of the given sizes.
+    One degree array is updated with the links added since the previous
+    size, so no intermediate graph is built.
+
+    Parameters
+    ----------
+    src, dst, n_seed :
+        as returned by barabasi_albert_edges
+    m : int
+        links of every new node
+    sizes : list of ints
+        numbers of nodes, between n_seed and the final size
+
+    Yields
+    ------
+    size : int
+    degrees : np.array of ints
+        degrees of nodes 0..size-1; the array is updated in place by the
+        next step, copy it to keep it
+    """
+    n_seed_links = int(np.count_nonzero(src < n_seed))
+    n = n_seed + (src.size - n_seed_links) // m
+    degrees = np.zeros(n, dtype=np.int64)
+    added = 0
+    for size in sorted(int(size) for size in sizes):
+        if not n_seed <= size <= n:
+            raise ValueError('size %d is not between %d and %d'
+                             % (size, n_seed, n))
+        links = n_seed_links + m * (size - n_seed)
+        degrees[:size] += np.bincount(src[added:links], minlength=size)
+        degrees[:size] += np.bincount(dst[added:links], minlength=size)
+        added = links
+        yield size, degrees[:size]
+
+
+def barabasi_albert_graph(n, m, rng=None, seed_graph=None):
+    """
+    Returns a Barabasi-Albert network grown to n nodes, m links per new
+    node (see barabasi_albert_edges).
+
+    Returns
+    -------
+    graph : CSRGraph
+    """
+    src, dst, _ = barabasi_albert_edges(n, m, rng, seed_graph)
+    indptr, indices = _undirected_csr(int(n), src, dst)
+    return CSRGraph(indptr, indices)
+
+
+def _pair_stubs(n, src, dst, directed, self_loops, multi_edges):
+    """
+    Turns paired stubs into CSR arrays, erasing self-loops and merging
+    multi-edges unless they are kept.
+    """
+    if not self_loops:
+        not_loop = src != dst
+        src, dst = src[not_loop], dst[not_loop]
+    if multi_edges:
+        if directed:
+            return _csr_from_keys(n, src.astype(np.int64) * n + dst)
+        return _undirected_csr(n, src, dst)
+    if directed:
+        return _csr_from_keys(
+            n, _sorted_unique(src.astype(np.int64) * n + dst))
+    keys = _sorted_unique(_edge_keys(src, dst, n))
+    return _undirected_csr(n, keys // n, keys % n)
+
+
+def _degree_array(degrees, name):
+    degrees = np.asarray(degrees, dtype=np.int64)
+    if degrees.ndim != 1 or (degrees < 0).any():
+        raise ValueError('%s should be a sequence of non-negative integers'
+                         % name)
+    return degrees
+
+
+def configuration_model(degrees, rng=None, self_loops=False,
+                        multi_edges=False):
+    """
+    Returns a random undirected graph with the given degree sequence: every
+    node gets degrees[i] stubs, and the shuffled stubs are paired up.
+
+    Parameters
+    ----------
+    degrees : sequence of ints
+        degree of every node; the sum must be even
+    rng : np.random.Generator, int or None
+    self_loops : bool
+        keep the self-loops (otherwise they are removed)
+    multi_edges : bool
+        keep the multi-edges as repeated neighbor entries (otherwise they
+        are merged into one link)
+
+    Returns
+    -------
+    graph : CSRGraph
+        the degree sequence is exact only when both self-loops and
+        multi-edges are kept
+    """
+    degrees = _degree_array(degrees, 'degrees')
+    if degrees.sum() % 2:
+        raise ValueError('the sum of the degrees should be even')
+    rng = np.random.default_rng(rng)
+    n = degrees.size
+    stubs = np.repeat(np.arange(n, dtype=_index_dtype(n)), degrees)
+    rng.shuffle(stubs)
+    indptr, indices = _pair_stubs(n, stubs[0::2], stubs[1::2], False,
+                                  self_loops, multi_edges)
+    return CSRGraph(indptr, indices)
+
+
+def directed_configuration_model(in_degrees, out_degrees, rng=None,
+                                 self_loops=False, multi_edges=False):
+    """
+    Returns a random directed graph with the given in- and out-degree
+    sequences: the in-stubs are shuffled and paired with the out-stubs.
+
+    Parameters
+    ----------
+    in_degrees, out_degrees : sequences of ints
+        of the same length and with the same sum
+    rng : np.random.Generator, int or None
+    self_loops : bool
+        keep the self-loops (otherwise they are removed)
+    multi_edges : bool
+        keep the multi-edges as repeated neighbor entries (otherwise they
+        are merged into one link)
+
+    Returns
+    -------
+    graph : CSRGraph
+    """
+    in_degrees = _degree_array(in_degrees, 'in_degrees')
+    out_degrees = _degree_array(out_degrees, 'out_degrees')
+    if in_degrees.size != out_degrees.size:
+        raise ValueError('in_degrees and out_degrees should have the same '
+                         'length')
+    if in_degrees.sum() != out_degrees.sum():
+        raise ValueError('the in- and out-degrees should have the same sum')
+    rng = np.random.default_rng(rng)
+    n = in_degrees.size
+    nodes = np.arange(n, dtype=_index_dtype(n))
+    src = np.repeat(nodes, out_degrees)
+    dst = np.repeat(nodes, in_degrees)
+    del nodes
+    rng.shuffle(dst)
+    indptr, indices = _pair_stubs(n, src, dst, True, self_loops, multi_edges)
+    return CSRGraph(indptr, indices, directed=True)
@@ -0,0 +1,445 @@
+"""
+Compact array-backed graph used by the exercise scripts.
+
+A CSRGraph keeps the adjacency of a network in three NumPy arrays (the
+compressed sparse row layout):
+
+    indptr  : int64 array of length n+1, the neighbors of node i are
+              indices[indptr[i]:indptr[i+1]]
+    indices : int32 (or int64 for huge graphs) array of neighbor ids
+    weights : float64 array parallel to indices, or None if unweighted
+
+Nodes are the contiguous integers 0..n-1; the original node labels (e.g. the
+strings produced by nx.read_weighted_edgelist) are kept in `labels` so that
+results can always be mapped back. Undirected graphs store every edge in both
+directions (a self-loop only once, as networkx does), directed graphs store
+the out-adjacency.
+"""
+import numpy as np
+
+
+def _index_dtype(n_nodes):
+    # 32 bit neighbor ids halve the memory as long as the ids fit
+    if n_nodes < 2**31:
+        return np.int32
+    return np.int64
+
+
+def _last_occurrences(key):
+    """
+    Returns the positions of the last occurrence of every distinct key,
+    in increasing key order.
+    """
+    order = np.argsort(key, kind='stable')
+    key = key[order]
+    keep = np.ones(key.size, dtype=bool)
+    keep[:-1] = key[1:] != key[:-1]
+    return order[keep]
+
+
+class CSRGraph(object):
+    """
+    Graph with contiguous integer node ids stored as CSR arrays.
+
+    Parameters
+    ----------
+    indptr : array of ints, length n+1
+    indices : array of ints
+        neighbor ids, sorted within each node
+    weights : array of floats or None
+        edge weights parallel to indices
+    directed : bool
+    labels : list-like or None
+        original node labels, labels[i] is the label of node i. If None, the
+        labels are the ids themselves.
+    """
+
+    def __init__(self, indptr, indices, weights=None, directed=False,
+                 labels=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.directed = directed
+        self.labels = labels
+        self._label_index = None
+        self._transpose = None
+
+    # ------------------------------------------------------------------
+    # construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_edges(cls, src, dst, n_nodes=None, weights=None, directed=False,
+                   labels=None):
+        """
+        Builds the graph from two arrays of edge endpoints.
+
+        Duplicate edges are merged, keeping the weight that comes last (same
+        as adding the edges one by one into a networkx graph).
+
+        Parameters
+        ----------
+        src, dst : arrays of ints
+            endpoint ids of each edge, between 0 and n_nodes-1
+        n_nodes : int
+            number of nodes; defaults to max id + 1
+        weights : array of floats or None
+        directed : bool
+        labels : list-like or None
+
+        Returns
+        -------
+        graph : CSRGraph
+        """
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        assert src.shape == dst.shape, "src and dst should have the same length"
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            assert weights.shape == src.shape, "one weight per edge is needed"
+        if n_nodes is None:
+            if labels is not None:
+                n_nodes = len(labels)
+            elif src.size:
+                n_nodes = int(max(src.max(), dst.max())) + 1
+            else:
+                n_nodes = 0
+
+        if not directed:
+            # merge (u, v) and (v, u) on the unordered pair first, so that
+            # both directions get the weight of the last of them
+            low, high = np.minimum(src, dst), np.maximum(src, dst)
+            last = _last_occurrences(low * n_nodes + high)
+            src, dst = low[last], high[last]
+            if weights is not None:
+                weights = weights[last]
+            # store both directions, self-loops only once
+            not_loop = src != dst
+            src, dst = (np.concatenate([src, dst[not_loop]]),
+                        np.concatenate([dst, src[not_loop]]))
+            if weights is not None:
+                weights = np.concatenate([weights, weights[not_loop]])
+
+        # sort by (src, dst) and keep the last occurrence of each pair
+        order = _last_occurrences(src * n_nodes + dst)
+
+        src = src[order]
+        indices = dst[order].astype(_index_dtype(n_nodes))
+        if weights is not None:
+            weights = weights[order]
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n_nodes), out=indptr[1:])
+
+        return cls(indptr, indices, weights, directed, labels)
+
+    @classmethod
+    def from_networkx(cls, network, weight='weight'):
+        """
+        Converts a networkx Graph or DiGraph into a CSRGraph.
+
+        Node ids follow the order of network.nodes(), and the labels are kept
+        so that to_networkx() gives back an equal graph.
+
+        Parameters
+        ----------
+        network : networkx.Graph or networkx.DiGraph
+        weight : str or None
+            edge attribute stored in weights. If None, or if no edge has the
+            attribute, the graph is unweighted.
+
+        Returns
+        -------
+        graph : CSRGraph
+        """
+        labels = list(network.nodes())
+        index = {label: i for i, label in enumerate(labels)}
+        n_edges = network.number_of_edges()
+        src = np.empty(n_edges, dtype=np.int64)
+        dst = np.empty(n_edges, dtype=np.int64)
+        w = np.ones(n_edges, dtype=np.float64)
+        weighted = False
+        for e, (u, v, data) in enumerate(network.edges(data=True)):
+            src[e] = index[u]
+            dst[e] = index[v]
+            if weight is not None and weight in data:
+                w[e] = data[weight]
+                weighted = True
+        return cls.from_edges(src, dst, n_nodes=len(labels),
+                              weights=w if weighted else None,
+                              directed=network.is_directed(), labels=labels)
+
+    def to_networkx(self, weight='weight'):
+        """
+        Converts the graph back into a networkx Graph or DiGraph with the
+        original node labels.
+
+        Parameters
+        ----------
+        weight : str
+            name of the edge attribute used for the weights
+
+        Returns
+        -------
+        network : networkx.Graph or networkx.DiGraph
+        """
+        import networkx as nx
+
+        network = nx.DiGraph() if self.directed else nx.Graph()
+        labels = self.node_labels()
+        network.add_nodes_from(labels)
+        src, dst = self.edges()
+        src_labels = [labels[i] for i in src]
+        dst_labels = [labels[i] for i in dst]
+        if self.weights is None:
+            network.add_edges_from(zip(src_labels, dst_labels))
+        else:
+            w = self.edge_weights()
+            network.add_weighted_edges_from(
+                zip(src_labels, dst_labels, w.tolist()), weight=weight)
+        return network
+
+    def to_scipy(self):
+        """
+        Returns the adjacency matrix as a scipy.sparse.csr_matrix that shares
+        the index arrays with the graph.
+        """
+        import scipy.sparse
+
+        n = self.number_of_nodes()
+        data = self.weights
+        if data is None:
+            data = np.ones(self.indices.size, dtype=np.float64)
+        return scipy.sparse.csr_matrix((data, self.indices, self.indptr),
+                                       shape=(n, n))
+
+    # ------------------------------------------------------------------
+    # basic properties
+    # ------------------------------------------------------------------
+
+    def number_of_nodes(self):
+        return self.indptr.size - 1
+
+    def __len__(self):
+        return self.number_of_nodes()
+
+    def is_directed(self):
+        return self.directed
+
+    def blocks(self, max_entries=2**22):
+        """
+        Splits the nodes into consecutive ranges whose neighbor lists hold at
+        most max_entries entries together (a single node with a longer list
+        gets a range of its own). Working block by block keeps the temporary
+        arrays small even when the graph itself does not fit in memory.
+
+        Yields
+        ------
+        first, last : int
+            the node range first..last-1
+        """
+        n = self.number_of_nodes()
+        first = 0
+        while first < n:
+            last = int(np.searchsorted(self.indptr,
+                                       self.indptr[first] + max_entries,
+                                       side='right')) - 1
+            last = min(max(last, first + 1), n)
+            yield first, last
+            first = last
+
+    def block_edges(self, first, last):
+        """
+        Returns the (src, dst) arrays of the neighbor list entries of the
+        nodes first..last-1, and the slice of indices they come from.
+        """
+        lo, hi = int(self.indptr[first]), int(self.indptr[last])
+        src = np.repeat(np.arange(first, last),
+                        np.diff(self.indptr[first:last + 1]))
+        return src, np.asarray(self.indices[lo:hi]), slice(lo, hi)
+
+    def self_loops(self):
+        """
+        Returns the ids of the nodes that have a self-loop.
+        """
+        loops = [np.zeros(0, dtype=np.int64)]
+        for first, last in self.blocks():
+            src, dst, _ = self.block_edges(first, last)
+            loops.append(src[src == dst])
+        return np.concatenate(loops)
+
+    def number_of_edges(self):
+        """
+        Number of edges, each undirected edge counted once.
+        """
+        n_entries = int(self.indptr[-1])
+        if self.directed:
+            return n_entries
+        n_loops = self.self_loops().size
+        return (n_entries - n_loops) // 2 + n_loops
+
+    def degree(self):
+        """
+        Returns the degree of every node as an int array. For directed graphs
+        this is the out-degree. Self-loops count twice in undirected graphs,
+        as in networkx.
+        """
+        degrees = np.diff(self.indptr)
+        if not self.directed:
+            loops = self.self_loops()
+            if loops.size:
+                degrees = degrees + np.bincount(
+                    loops, minlength=self.number_of_nodes())
+        return degrees
+
+    def out_degree(self):
+        return np.diff(self.indptr)
+
+    def in_degree(self):
+        if not self.directed:
+            return self.degree()
+        n = self.number_of_nodes()
+        degrees = np.zeros(n, dtype=np.int64)
+        for first, last in self.blocks():
+            _, dst, _ = self.block_edges(first, last)
+            degrees += np.bincount(dst, minlength=n)
+        return degrees
+
+    def strength(self):
+        """
+        Returns the weighted degree (sum of edge weights) of every node. For
+        unweighted graphs this equals the degree.
+        """
+        if self.weights is None:
+            return self.degree().astype(np.float64)
+        strengths = np.zeros(self.number_of_nodes())
+        for first, last in self.blocks():
+            src, dst, entries = self.block_edges(first, last)
+            w = np.asarray(self.weights[entries])
+            if not self.directed:
+                # self-loops count twice, as in networkx
+                w = np.where(src == dst, 2 * w, w)
+            strengths[first:last] = np.bincount(src - first, weights=w,
+                                                minlength=last - first)
+        return strengths
+
+    def neighbors(self, node):
+        """
+        Returns the neighbor ids of node (successors for directed graphs).
+        """
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def __getitem__(self, node):
+        return self.neighbors(node)
+
+    def neighbors_of(self, nodes):
+        """
+        Returns the concatenated neighbor ids of all given nodes.
+
+        Parameters
+        ----------
+        nodes : array of ints
+
+        Returns
+        -------
+        neighbors : array of ints
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        starts = self.indptr[nodes]
+        counts = self.indptr[nodes + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return self.indices[:0]
+        # positions starts[j], starts[j]+1, ... for each node j
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return self.indices[offsets + np.arange(total)]
+
+    def edges(self):
+        """
+        Returns the edges as two arrays (src, dst). Undirected edges are
+        listed once, with src <= dst.
+        """
+        srcs = [np.zeros(0, dtype=np.int64)]
+        dsts = [np.zeros(0, dtype=np.int64)]
+        for first, last in self.blocks():
+            src, dst, _ = self.block_edges(first, last)
+            if not self.directed:
+                keep = src <= dst
+                src, dst = src[keep], dst[keep]
+            srcs.append(src)
+            dsts.append(dst.astype(np.int64))
+        return np.concatenate(srcs), np.concatenate(dsts)
+
+    def edge_weights(self):
+        """
+        Returns the weights in the same order as edges(), or None.
+        """
+        if self.weights is None:
+            return None
+        if self.directed:
+            return np.asarray(self.weights)
+        weights = [np.zeros(0)]
+        for first, last in self.blocks():
+            src, dst, entries = self.block_edges(first, last)
+            weights.append(np.asarray(self.weights[entries])[src <= dst])
+        return np.concatenate(weights)
+
+    def transpose(self):
+        """
+        Returns the graph with all edges reversed (the in-adjacency of a
+        directed graph). The result is cached.
+        """
+        if not self.directed:
+            return self
+        if self._transpose is None:
+            src, dst = self.edges()
+            self._transpose = CSRGraph.from_edges(
+                dst, src, n_nodes=self.number_of_nodes(),
+                weights=self.edge_weights(), directed=True,
+                labels=self.labels)
+        return self._transpose
+
+    # ------------------------------------------------------------------
+    # labels
+    # ------------------------------------------------------------------
+
+    def node_labels(self):
+        """
+        Returns the original node labels as a list, in id order.
+        """
+        if self.labels is None:
+            return list(range(self.number_of_nodes()))
+        if isinstance(self.labels, np.ndarray):
+            return self.labels.tolist()
+        return list(self.labels)
+
+    def index_of(self, label):
+        """
+        Returns the integer id of the node with the given original label.
+        """
+        if self.labels is None:
+            return int(label)
+        if self._label_index is None:
+            self._label_index = {l: i for i, l in
+                                 enumerate(self.node_labels())}
+        return self._label_index[label]
+
+    def to_label_dict(self, values):
+        """
+        Maps an array of per-node values into a dict keyed by node label,
+        like the dicts returned by the networkx functions.
+        """
+        return dict(zip(self.node_labels(), np.asarray(values).tolist()))
+
+    def __repr__(self):
+        return '<CSRGraph %s with %d nodes and %d edges>' % (
+            'directed' if self.directed else 'undirected',
+            self.number_of_nodes(), self.number_of_edges())
+
+
+def as_csr(network):
+    """
+    Returns network as a CSRGraph, converting networkx graphs if needed.
+    """
+    if isinstance(network, CSRGraph):
+        return network
+    return CSRGraph.from_networkx(network)
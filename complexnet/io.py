@@ -0,0 +1,300 @@
+"""
+Fast reading of whitespace separated edge list (.edg) files.
+
+The files used in the exercises have one edge per line, "u v" or "u v w",
+where w is the weight, or a dict literal of edge attributes as written by
+nx.write_edgelist ("{}" or "{'weight': w}"). The file is parsed in chunks
+of lines: every chunk is split into tokens at once and the node labels are
+turned into integer ids with np.unique, so no Python work is done per edge
+(only chunks with irregular lines or attribute dicts other than "{}" are
+parsed line by line).
+
+The parsed arrays are stored in a sidecar cache file next to the edge list
+(<path>.cache.npz). The cache remembers the size and modification time of
+the edge file and is used only while both still match, so the next run
+skips the parsing altogether.
+"""
+import ast
+import os
+
+import numpy as np
+
+from .graph import CSRGraph
+
+CACHE_SUFFIX = '.cache.npz'
+_CACHE_VERSION = 2
+
+
+def _cache_key(path, nodetype):
+    stat = os.stat(path)
+    return np.array([_CACHE_VERSION, stat.st_size, stat.st_mtime_ns,
+                     nodetype is int])
+
+
+def _load_cache(cache_path, key):
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            if not np.array_equal(data['key'], key):
+                return None
+            weights = data['weights'] if data['weighted'] else None
+            return data['src'], data['dst'], weights, data['labels']
+    except (IOError, OSError, KeyError, ValueError):
+        # missing, stale or unreadable cache; just parse the file again
+        return None
+
+
+def _save_cache(cache_path, key, src, dst, weights, labels):
+    # write to a temporary file first so that an interrupted run never
+    # leaves a broken cache behind
+    tmp_path = cache_path + '.tmp.npz'
+    try:
+        np.savez(tmp_path, key=key, src=src, dst=dst,
+                 weights=weights if weights is not None else np.zeros(0),
+                 weighted=weights is not None, labels=labels)
+        os.replace(tmp_path, cache_path)
+    except (IOError, OSError):
+        # e.g. a read-only data directory; caching is only an optimization
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# token put at the end of every line, to check that the lines of a chunk
+# all have the expected number of tokens without splitting them one by one
+_END = '\x00'
+
+
+def _parse_line(line):
+    """
+    Returns (u, v, weight) of one line (weight None if it has none), or
+    None for an empty line. The third column is a number or a dict literal
+    of attributes, as written by nx.write_edgelist.
+    """
+    tokens = line.split()
+    if not tokens:
+        return None
+    if len(tokens) < 2:
+        raise ValueError('malformed edge list line: %r' % line)
+    u, v, rest = tokens[0], tokens[1], tokens[2:]
+    if not rest:
+        return u, v, None
+    if rest[0].startswith('{'):
+        # as nx.read_edgelist does
+        try:
+            attributes = ast.literal_eval(' '.join(rest))
+        except (ValueError, SyntaxError):
+            attributes = None
+        if not isinstance(attributes, dict):
+            raise ValueError('malformed edge attributes: %r' % line)
+        if 'weight' not in attributes:
+            return u, v, None
+        return u, v, float(attributes['weight'])
+    if len(rest) > 1:
+        raise ValueError('malformed edge list line: %r' % line)
+    return u, v, float(rest[0])
+
+
+def _split_chunk(lines, n_columns):
+    """
+    Splits a list of lines into a 2D array of the endpoint tokens and their
+    weights, dropping comments and empty lines.
+
+    Returns
+    -------
+    table : np.array of str, shape (n_edges, 2)
+    weights : np.array of floats or None
+        None when no line of the chunk has a weight; otherwise lines
+        without one get 1.0
+    """
+    text = ''.join(lines)
+    if '#' in text:
+        lines = [line.split('#', 1)[0].rstrip('\n') + '\n' for line in lines]
+        text = ''.join(lines)
+    if not text.endswith('\n'):
+        text += '\n'
+    # fast path: every line has exactly n_columns tokens, the third one
+    # a number or '{}'. Any other line (blank, more or fewer columns,
+    # attribute dicts) misaligns the end-of-line tokens, and the chunk is
+    # parsed line by line instead.
+    tokens = text.replace('\n', ' %s\n' % _END).split()
+    if len(tokens) == (n_columns + 1) * len(lines):
+        table = np.array(tokens).reshape(-1, n_columns + 1)
+        if np.all(table[:, n_columns] == _END):
+            if n_columns == 2:
+                return table[:, :2], None
+            if np.all(table[:, 2] == '{}'):
+                return table[:, :2], None
+            try:
+                return table[:, :2], table[:, 2].astype(np.float64)
+            except ValueError:
+                pass
+    rows = [row for row in map(_parse_line, lines) if row is not None]
+    table = np.array([row[:2] for row in rows], dtype=str).reshape(-1, 2)
+    if all(row[2] is None for row in rows):
+        return table, None
+    weights = np.array([1.0 if row[2] is None else row[2] for row in rows])
+    return table, weights
+
+
+def _detect_columns(path):
+    """
+    Returns the number of tokens of the first data line of the file, which
+    decides the fast path of _split_chunk.
+    """
+    with open(path) as f:
+        for line in f:
+            tokens = line.split('#', 1)[0].split()
+            if not tokens:
+                continue
+            if len(tokens) < 2:
+                raise ValueError('malformed edge list line: %r' % line)
+            return 3 if len(tokens) == 3 else 2
+    return 2
+
+
+def iter_edge_chunks(path, index, nodetype=None, chunk_size=2**24):
+    """
+    Reads an edge list file chunk by chunk.
+
+    Parameters
+    ----------
+    path : str
+        path of the .edg file
+    index : dict
+        label -> id mapping; labels that are not in it yet are added with
+        the next free id, in order of first appearance in the file
+    nodetype : None or int
+        None keeps the node labels as strings, int converts them to integers
+    chunk_size : int
+        approximate number of bytes parsed at once
+
+    Yields
+    ------
+    src, dst : np.arrays of ints
+        node ids of the edge endpoints of the chunk
+    weights : np.array of floats or None
+        the weights, or None if no line of the chunk has one (see
+        read_edge_arrays)
+    """
+    n_columns = _detect_columns(path)
+    with open(path) as f:
+        while True:
+            lines = f.readlines(chunk_size)
+            if not lines:
+                break
+            table, weights = _split_chunk(lines, n_columns)
+            if table.shape[0] == 0:
+                continue
+            endpoints = table[:, :2].ravel()
+            if nodetype is int:
+                endpoints = endpoints.astype(np.int64)
+            # only the distinct labels of the chunk go through the dict,
+            # new ones in the order in which they appear in the file
+            unique, first, inverse = np.unique(
+                endpoints, return_index=True, return_inverse=True)
+            unique_ids = np.empty(unique.size, dtype=np.int64)
+            for j in np.argsort(first, kind='stable'):
+                label = unique[j].item()
+                unique_ids[j] = index.setdefault(label, len(index))
+            ids = unique_ids[inverse.ravel()].reshape(-1, 2)
+            yield ids[:, 0], ids[:, 1], weights
+
+
+def _labels_array(index, nodetype):
+    if nodetype is int:
+        return np.fromiter(index, dtype=np.int64, count=len(index))
+    return np.array(list(index), dtype=str)
+
+
+def _parse(path, nodetype, chunk_size):
+    index = {}
+    src_chunks = []
+    dst_chunks = []
+    weight_chunks = []
+    for src, dst, weights in iter_edge_chunks(path, index, nodetype,
+                                              chunk_size):
+        src_chunks.append(src)
+        dst_chunks.append(dst)
+        weight_chunks.append(weights)
+
+    src = np.concatenate(src_chunks) if src_chunks else np.zeros(0, np.int64)
+    dst = np.concatenate(dst_chunks) if dst_chunks else np.zeros(0, np.int64)
+    weights = None
+    if any(chunk is not None for chunk in weight_chunks):
+        weights = np.concatenate([np.ones(src.size) if chunk is None else chunk
+                                  for src, chunk in zip(src_chunks,
+                                                        weight_chunks)])
+    return src, dst, weights, _labels_array(index, nodetype)
+
+
+def read_edge_arrays(path, nodetype=None, chunk_size=2**24, cache=True):
+    """
+    Reads an edge list file into integer id arrays.
+
+    Parameters
+    ----------
+    path : str
+        path of the .edg file
+    nodetype : None or int
+        None keeps the node labels as strings (like nx.read_edgelist);
+        int converts them to integers
+    chunk_size : int
+        approximate number of bytes parsed at once
+    cache : bool
+        if True, use and update the <path>.cache.npz sidecar file
+
+    Returns
+    -------
+    src, dst : np.arrays of ints
+        node ids of the edge endpoints, in file order
+    weights : np.array of floats or None
+        the weights (the third column, or the 'weight' of an attribute
+        dict), or None if no line has one; when only some lines have a
+        weight, the others get 1.0
+    labels : np.array
+        labels[i] is the label of the node with id i; ids are given in order
+        of first appearance in the file, as in the networkx readers
+    """
+    key = _cache_key(path, nodetype)
+    cache_path = path + CACHE_SUFFIX
+    if cache:
+        cached = _load_cache(cache_path, key)
+        if cached is not None:
+            return cached
+    src, dst, weights, labels = _parse(path, nodetype, chunk_size)
+    if cache:
+        _save_cache(cache_path, key, src, dst, weights, labels)
+    return src, dst, weights, labels
+
+
+def read_edg(path, directed=False, nodetype=None, chunk_size=2**24,
+             cache=True):
+    """
+    Reads an edge list file into a CSRGraph.
+
+    This is the array counterpart of nx.read_weighted_edgelist(path) for
+    "u v w" files and of nx.read_edgelist(path) for files with attribute
+    dicts ("u v {}" or "u v {'weight': w}"); read_edg(path).to_networkx()
+    gives the same networkx graph, except that edges without a weight get
+    weight 1.0 when other edges have one.
+
+    Parameters
+    ----------
+    path : str
+        path of the .edg file
+    directed : bool
+    nodetype : None or int
+        see read_edge_arrays
+    chunk_size : int
+        approximate number of bytes parsed at once
+    cache : bool
+        if True, use and update the <path>.cache.npz sidecar file
+
+    Returns
+    -------
+    graph : CSRGraph
+    """
+    src, dst, weights, labels = read_edge_arrays(path, nodetype, chunk_size,
+                                                 cache)
+    return CSRGraph.from_edges(src, dst, n_nodes=labels.size,
+                               weights=weights, directed=directed,
+                               labels=labels)
@@ -0,0 +1,214 @@
+"""
+Degree-preserving randomization by edge swaps.
+
+A swap picks two links (a, b) and (c, d) and rewires them into (a, d) and
+(c, b), unless that would create a self-loop or a link that already exists,
+so every node keeps its degree. Repeating swaps samples the simple graphs
+with the degree sequence of the original network, the null model against
+which e.g. the degree assortativity of a network is judged.
+
+EdgeSwapper keeps the links in two arrays and their keys in a set, so the
+existence check is O(1), and it keeps the sum of the degree products over
+the links up to date after every accepted swap. The degrees do not change,
+so that sum is all the assortativity coefficient needs:
+
+    r = (S/m - mu**2) / (Q/2m - mu**2),   S = sum of k_u k_v over links,
+    mu = sum of (k_u + k_v) / 2m,         Q = sum of (k_u**2 + k_v**2)
+
+and a sample of r costs nothing, however large the network.
+
+    swapper = EdgeSwapper(read_edg(path), rng=42)
+    null = [r for r in swapper.iter_assortativity(1000)]
+"""
+import numpy as np
+
+from .graph import CSRGraph, as_csr
+
+# random numbers drawn at once by EdgeSwapper.swap
+_BATCH = 2**16
+
+
+def degree_assortativity(graph):
+    """
+    Returns the degree assortativity coefficient of an undirected graph,
+    the Pearson correlation of the degrees at the two ends of the links
+    (as nx.degree_assortativity_coefficient).
+
+    Parameters
+    ----------
+    graph : CSRGraph or networkx graph
+
+    Returns
+    -------
+    r : float
+    """
+    graph = as_csr(graph)
+    degrees = graph.degree().astype(np.float64)
+    src = np.repeat(np.arange(graph.number_of_nodes()), np.diff(graph.indptr))
+    x = degrees[src]
+    y = degrees[graph.indices]
+    return float(np.corrcoef(x, y)[0, 1])
+
+
+class EdgeSwapper(object):
+    """
+    Markov chain of degree-preserving edge swaps on a simple undirected
+    graph, with the assortativity coefficient updated swap by swap.
+
+    Parameters
+    ----------
+    graph : CSRGraph or networkx graph
+        undirected, without self-loops; it is not modified
+    rng : np.random.Generator, int or None
+
+    Attributes
+    ----------
+    n_attempts, n_accepted : int
+        swaps tried and done so far
+    """
+
+    def __init__(self, graph, rng=None):
+        graph = as_csr(graph)
+        if graph.is_directed():
+            raise ValueError('EdgeSwapper supports undirected graphs only')
+        if graph.self_loops().size:
+            raise ValueError('the graph should not have self-loops')
+        self.rng = np.random.default_rng(rng)
+        self.labels = graph.labels
+        n = graph.number_of_nodes()
+        self.n = n
+        src, dst = graph.edges()
+        if src.size < 2:
+            raise ValueError('at least two links are needed for swaps')
+        degrees = graph.degree()
+        # Python lists and ints: the swap loop works one link at a time
+        self._src = src.tolist()
+        self._dst = dst.tolist()
+        self._degrees = degrees.tolist()
+        self._keys = set((np.minimum(src, dst).astype(np.int64) * n
+                          + np.maximum(src, dst)).tolist())
+
+        m = src.size
+        ends = degrees[src].astype(np.int64), degrees[dst].astype(np.int64)
+        self._product_sum = int((ends[0] * ends[1]).sum())
+        self._mean = float((ends[0] + ends[1]).sum()) / (2 * m)
+        self._square_mean = float((ends[0]**2 + ends[1]**2).sum()) / (2 * m)
+        self.n_attempts = 0
+        self.n_accepted = 0
+
+    def number_of_edges(self):
+        return len(self._src)
+
+    def swap(self, n_attempts):
+        """
+        Tries n_attempts swaps of two uniformly chosen links.
+
+        Returns
+        -------
+        n_accepted : int
+            number of swaps done
+        """
+        src, dst, degrees, keys = self._src, self._dst, self._degrees, self._keys
+        n, m = self.n, len(src)
+        product_sum = self._product_sum
+        accepted = 0
+        left = int(n_attempts)
+        while left > 0:
+            batch = min(left, _BATCH)
+            left -= batch
+            first = self.rng.integers(0, m, size=batch).tolist()
+            second = self.rng.integers(0, m, size=batch).tolist()
+            flip = (self.rng.random(batch) < 0.5).tolist()
+            for e, f, flipped in zip(first, second, flip):
+                if e == f:
+                    continue
+                a, b = src[e], dst[e]
+                if flipped:
+                    d, c = src[f], dst[f]
+                else:
+                    c, d = src[f], dst[f]
+                # (a, b), (c, d) -> (a, d), (c, b)
+                if a == d or c == b:
+                    continue
+                new_first = a * n + d if a < d else d * n + a
+                if new_first in keys:
+                    continue
+                new_second = c * n + b if c < b else b * n + c
+                if new_second in keys:
+                    continue
+                keys.remove(a * n + b if a < b else b * n + a)
+                keys.remove(c * n + d if c < d else d * n + c)
+                keys.add(new_first)
+                keys.add(new_second)
+                dst[e] = d
+                src[f], dst[f] = c, b
+                product_sum += (degrees[a] * degrees[d] + degrees[c] * degrees[b]
+                                - degrees[a] * degrees[b]
+                                - degrees[c] * degrees[d])
+                accepted += 1
+        self._product_sum = product_sum
+        self.n_attempts += int(n_attempts)
+        self.n_accepted += accepted
+        return accepted
+
+    def assortativity(self):
+        """
+        Returns the degree assortativity coefficient of the current graph.
+        """
+        m = len(self._src)
+        variance = self._square_mean - self._mean**2
+        if variance == 0:
+            return np.nan
+        return (self._product_sum / float(m) - self._mean**2) / variance
+
+    def iter_assortativity(self, n_samples, thinning=None, burn_in=None):
+        """
+        Yields the assortativity coefficient of n_samples randomized graphs.
+
+        Parameters
+        ----------
+        n_samples : int
+        thinning : int or None
+            swap attempts between samples; by default the number of links
+        burn_in : int or None
+            swap attempts before the first sample; by default ten times the
+            number of links
+
+        Yields
+        ------
+        r : float
+        """
+        m = len(self._src)
+        self.swap(10 * m if burn_in is None else burn_in)
+        for _ in range(int(n_samples)):
+            yield self.assortativity()
+            self.swap(m if thinning is None else thinning)
+
+    def edges(self):
+        """
+        Returns the (src, dst) arrays of the current links.
+        """
+        return np.array(self._src), np.array(self._dst)
+
+    def graph(self):
+        """
+        Returns the current graph as a CSRGraph with the original labels.
+        """
+        src, dst = self.edges()
+        return CSRGraph.from_edges(src, dst, self.n, labels=self.labels)
+
+
+def assortativity_null(graph, n_samples, thinning=None, burn_in=None,
+                       rng=None):
+    """
+    Returns the assortativity coefficients of n_samples degree-preserving
+    randomizations of graph (see EdgeSwapper.iter_assortativity).
+
+    Returns
+    -------
+    samples : np.array of floats
+    """
+    swapper = EdgeSwapper(graph, rng)
+    return np.fromiter(swapper.iter_assortativity(n_samples, thinning,
+                                                  burn_in),
+                       dtype=np.float64, count=int(n_samples))
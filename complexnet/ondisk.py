@@ -0,0 +1,224 @@
+"""
+On-disk CSR graph format that is opened with memory mapping.
+
+A graph is stored as a directory (conventionally named <name>.csr) holding
+plain .npy files, so it can be inspected with nothing but NumPy:
+
+    meta.json    {"format": "complexnet-csr", "version": 1,
+                  "n_nodes": n, "n_entries": e, "directed": bool,
+                  "weighted": bool, "labeled": bool}
+    indptr.npy   int64, length n+1; the neighbors of node i are
+                 indices[indptr[i]:indptr[i+1]]
+    indices.npy  int32 (int64 if n >= 2**31), length e, sorted within
+                 each node
+    weights.npy  float64, length e, only if weighted
+    labels.npy   length n, original node labels (fixed width unicode or
+                 int64), only if labeled
+
+Undirected graphs store every edge in both directions, exactly as CSRGraph
+does in memory. open_csr maps the files read-only with np.memmap (through
+np.load(mmap_mode='r')), so opening is instant, pages are read from disk
+only when a kernel touches them, and any number of processes opening the
+same graph share one copy in the page cache. The block-wise kernels of
+CSRGraph and complexnet.algorithms (degree, BFS steps, PageRank) therefore
+run on graphs larger than the RAM.
+"""
+import json
+import os
+
+import numpy as np
+
+from .graph import CSRGraph, _index_dtype
+
+FORMAT_NAME = 'complexnet-csr'
+FORMAT_VERSION = 1
+
+
+def _write_meta(path, n_nodes, n_entries, directed, weighted, labeled):
+    meta = {'format': FORMAT_NAME, 'version': FORMAT_VERSION,
+            'n_nodes': int(n_nodes), 'n_entries': int(n_entries),
+            'directed': bool(directed), 'weighted': bool(weighted),
+            'labeled': bool(labeled)}
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=1)
+
+
+def _read_meta(path):
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta.get('format') != FORMAT_NAME:
+        raise ValueError('%s is not a %s directory' % (path, FORMAT_NAME))
+    if meta.get('version', 0) > FORMAT_VERSION:
+        raise ValueError('%s uses format version %d, only %d is supported'
+                         % (path, meta['version'], FORMAT_VERSION))
+    return meta
+
+
+def save_csr(graph, path):
+    """
+    Writes a CSRGraph into the on-disk format.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+    path : str
+        directory to write, created if needed
+    """
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    np.save(os.path.join(path, 'indptr.npy'),
+            np.asarray(graph.indptr, dtype=np.int64))
+    np.save(os.path.join(path, 'indices.npy'), graph.indices)
+    if graph.weights is not None:
+        np.save(os.path.join(path, 'weights.npy'), graph.weights)
+    if graph.labels is not None:
+        labels = np.asarray(graph.labels)
+        if labels.dtype == object:
+            labels = labels.astype(str)
+        np.save(os.path.join(path, 'labels.npy'), labels)
+    # meta.json is written last; a directory without it is incomplete
+    _write_meta(path, graph.number_of_nodes(), graph.indices.size,
+                graph.directed, graph.weights is not None,
+                graph.labels is not None)
+
+
+def open_csr(path, mode='r'):
+    """
+    Opens a graph stored with save_csr or build_csr without reading it.
+
+    Parameters
+    ----------
+    path : str
+        the graph directory
+    mode : str
+        'r' for read-only mapping, 'r+' to allow writing the arrays in place,
+        'c' for copy-on-write
+
+    Returns
+    -------
+    graph : CSRGraph
+        a graph whose arrays are np.memmap objects
+    """
+    meta = _read_meta(path)
+
+    def load(name):
+        return np.load(os.path.join(path, name), mmap_mode=mode)
+
+    def check(name, array, size):
+        if array.size != size:
+            raise ValueError('corrupt %s in %s: %d values instead of %d'
+                             % (name, path, array.size, size))
+        return array
+
+    n_nodes, n_entries = meta['n_nodes'], meta['n_entries']
+    indptr = check('indptr.npy', load('indptr.npy'), n_nodes + 1)
+    indices = check('indices.npy', load('indices.npy'), n_entries)
+    weights = labels = None
+    if meta['weighted']:
+        weights = check('weights.npy', load('weights.npy'), n_entries)
+    if meta['labeled']:
+        labels = check('labels.npy', load('labels.npy'), n_nodes)
+    return CSRGraph(indptr, indices, weights, meta['directed'], labels)
+
+
+def build_csr(path, edge_chunks, n_nodes, directed=False, weighted=False,
+              labels=None, max_entries=2**24):
+    """
+    Builds the on-disk format from a stream of edge chunks without ever
+    holding the whole graph in memory.
+
+    The edges are read twice: the first pass counts the degrees to get
+    indptr, the second pass scatters the neighbors straight into the
+    memory-mapped indices (and weights). Finally every block of nodes is
+    sorted in place. Unlike CSRGraph.from_edges, duplicate edges are kept.
+
+    Parameters
+    ----------
+    path : str
+        directory to write, created if needed
+    edge_chunks : callable
+        edge_chunks() returns an iterable of (src, dst) or (src, dst, w)
+        array tuples; it is called once per pass
+    n_nodes : int
+    directed : bool
+    weighted : bool
+        whether the chunks carry weights
+    labels : np.array or None
+        original node labels
+    max_entries : int
+        number of neighbor list entries sorted at once in the last step
+
+    Returns
+    -------
+    graph : CSRGraph
+        the new graph opened with open_csr
+    """
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    def directions(chunk):
+        src = np.asarray(chunk[0], dtype=np.int64)
+        dst = np.asarray(chunk[1], dtype=np.int64)
+        w = np.asarray(chunk[2], dtype=np.float64) if weighted else None
+        if not directed:
+            # both directions, self-loops only once
+            not_loop = src != dst
+            src, dst = (np.concatenate([src, dst[not_loop]]),
+                        np.concatenate([dst, src[not_loop]]))
+            if weighted:
+                w = np.concatenate([w, w[not_loop]])
+        return src, dst, w
+
+    # pass 1: degrees
+    counts = np.zeros(n_nodes, dtype=np.int64)
+    for chunk in edge_chunks():
+        src, _, _ = directions(chunk)
+        counts += np.bincount(src, minlength=n_nodes)
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    n_entries = int(indptr[-1])
+    del counts
+    np.save(os.path.join(path, 'indptr.npy'), indptr)
+
+    open_memmap = np.lib.format.open_memmap
+    indices = open_memmap(os.path.join(path, 'indices.npy'), mode='w+',
+                          dtype=_index_dtype(n_nodes), shape=(n_entries,))
+    weights = None
+    if weighted:
+        weights = open_memmap(os.path.join(path, 'weights.npy'), mode='w+',
+                              dtype=np.float64, shape=(n_entries,))
+
+    # pass 2: scatter; cursor[i] is the next free slot of node i
+    cursor = indptr[:-1].copy()
+    for chunk in edge_chunks():
+        src, dst, w = directions(chunk)
+        order = np.argsort(src, kind='stable')
+        src, dst = src[order], dst[order]
+        # rank of each entry among the entries of the same node in the chunk
+        starts = np.searchsorted(src, src, side='left')
+        slots = cursor[src] + np.arange(src.size) - starts
+        indices[slots] = dst
+        if weighted:
+            weights[slots] = w[order]
+        cursor += np.bincount(src, minlength=n_nodes)
+    del cursor
+
+    # sort the neighbor lists block by block
+    graph = CSRGraph(indptr, indices, weights, directed)
+    for first, last in graph.blocks(max_entries):
+        src, dst, entries = graph.block_edges(first, last)
+        order = np.lexsort((dst, src))
+        indices[entries] = dst[order]
+        if weighted:
+            weights[entries] = np.asarray(weights[entries])[order]
+    indices.flush()
+    del indices
+    if weighted:
+        weights.flush()
+        del weights
+
+    if labels is not None:
+        np.save(os.path.join(path, 'labels.npy'), np.asarray(labels))
+    _write_meta(path, n_nodes, n_entries, directed, weighted,
+                labels is not None)
+    return open_csr(path)
@@ -0,0 +1,548 @@
+"""
+Bond and site percolation curves from one pass per random order
+(Newman and Ziff).
+
+Instead of building a new network for every occupation probability, the
+links (bond percolation) or the nodes (site percolation) are added one at a
+time in a random order, and the components are merged with a union-find
+structure. After every step the size of the largest component G and the
+sum of the squared component sizes S2 are known: a merge of components of
+sizes a and b only changes S2 by 2ab. The susceptibility, the mean size of
+the component of a node outside the giant one,
+
+    chi = (S2 - G**2) / (n - G),   n = number of (occupied) nodes,
+
+is therefore O(1) per step, and one pass gives the whole curve. Averaging
+the curves of many orders gives the canonical averages of the microcanonical
+ensemble with a given number of occupied links or nodes.
+
+The first m links of a uniformly random order of all node pairs are a
+G(n, m) graph, so er_percolation gives the Erdos-Renyi giant component
+curve with one pass per realization:
+
+    curve = er_percolation(10**5, 125000, n_orders=10, rng=42)
+    curve['avg_degree'], curve['giant'], curve['susceptibility']
+
+Removing links is adding them backwards: the network after the first i
+removals of an order is the one made of its last m-i links, so
+edge_removal gives the robustness curves of a network against link
+removal with one reverse pass per order. Removing nodes is the same with
+site percolation: node_attack removes the nodes in random order, by
+decreasing degree, or always taking the node with the largest degree
+(strength) among those left, and adds them back in the reverse order.
+"""
+import numpy as np
+
+from .generators import random_pair_order
+from .graph import CSRGraph, as_csr
+
+
+def _bond_sweep(n, src, dst):
+    """
+    Adds the links (src[i], dst[i]) in order to n isolated nodes.
+
+    Returns
+    -------
+    giants, square_sums : np.arrays of length len(src) + 1
+        the largest component size and the sum of the squared component
+        sizes before the first link and after every link
+    """
+    parent = list(range(n))
+    size = [1] * n
+    giant = 1 if n else 0
+    square_sum = n
+    giants = [giant]
+    square_sums = [square_sum]
+    for u, v in zip(src.tolist(), dst.tolist()):
+        # find the roots, halving the paths on the way
+        while parent[u] != u:
+            parent[u] = parent[parent[u]]
+            u = parent[u]
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        if u != v:
+            # union by size
+            if size[u] < size[v]:
+                u, v = v, u
+            parent[v] = u
+            square_sum += 2 * size[u] * size[v]
+            size[u] += size[v]
+            if size[u] > giant:
+                giant = size[u]
+        giants.append(giant)
+        square_sums.append(square_sum)
+    return (np.array(giants, dtype=np.int64),
+            np.array(square_sums, dtype=np.float64))
+
+
+def _site_sweep(indptr, indices, order):
+    """
+    Occupies the nodes in order; a link is present when both of its ends
+    are occupied.
+
+    Returns
+    -------
+    giants, square_sums : np.arrays of length len(order) + 1
+    """
+    n = len(indptr) - 1
+    parent = list(range(n))
+    size = [1] * n
+    occupied = [False] * n
+    giant = 0
+    square_sum = 0
+    giants = [giant]
+    square_sums = [square_sum]
+    for v in order.tolist():
+        occupied[v] = True
+        square_sum += 1
+        if giant < 1:
+            giant = 1
+        root = v
+        for u in indices[indptr[v]:indptr[v + 1]]:
+            if not occupied[u]:
+                continue
+            while parent[u] != u:
+                parent[u] = parent[parent[u]]
+                u = parent[u]
+            if u == root:
+                continue
+            if size[u] > size[root]:
+                u, root = root, u
+            parent[u] = root
+            square_sum += 2 * size[u] * size[root]
+            size[root] += size[u]
+            if size[root] > giant:
+                giant = size[root]
+        giants.append(giant)
+        square_sums.append(square_sum)
+    return (np.array(giants, dtype=np.int64),
+            np.array(square_sums, dtype=np.float64))
+
+
+def susceptibility(giants, square_sums, n_nodes):
+    """
+    Returns (S2 - G**2) / (n - G), NaN where every node is in the largest
+    component.
+    """
+    rest = np.asarray(n_nodes, dtype=np.float64) - giants
+    with np.errstate(divide='ignore', invalid='ignore'):
+        chi = (square_sums - np.asarray(giants, dtype=np.float64)**2) / rest
+    chi[rest == 0] = np.nan
+    return chi
+
+
+def _average(curves, n_orders):
+    """
+    Returns the means and standard deviations over the orders of the
+    (giant, susceptibility) curves, accumulated one order at a time.
+    """
+    total = squares = chi_total = chi_squares = chi_count = None
+    for giants, chi in curves:
+        giants = giants.astype(np.float64)
+        defined = ~np.isnan(chi)
+        chi = np.where(defined, chi, 0.0)
+        if total is None:
+            total, squares = np.zeros_like(giants), np.zeros_like(giants)
+            chi_total, chi_squares = np.zeros_like(chi), np.zeros_like(chi)
+            chi_count = np.zeros(chi.shape, dtype=np.int64)
+        total += giants
+        squares += giants**2
+        chi_total += chi
+        chi_squares += chi**2
+        chi_count += defined
+    giant = total / n_orders
+    with np.errstate(divide='ignore', invalid='ignore'):
+        chi_mean = chi_total / chi_count
+        chi_std = np.sqrt(np.maximum(chi_squares / chi_count - chi_mean**2,
+                                     0))
+    return {'giant': giant,
+            'giant_std': np.sqrt(np.maximum(squares / n_orders - giant**2, 0)),
+            'susceptibility': chi_mean,
+            'susceptibility_std': chi_std,
+            'n_orders': n_orders}
+
+
+def _check_orders(n_orders):
+    n_orders = int(n_orders)
+    if n_orders < 1:
+        raise ValueError('at least one order is needed, not %d' % n_orders)
+    return n_orders
+
+
+def _undirected(graph):
+    """
+    Returns graph as a CSRGraph, directed ones with the links of both
+    directions, so that a node sees all of its neighbors.
+    """
+    graph = as_csr(graph)
+    if graph.is_directed():
+        src, dst = graph.edges()
+        graph = CSRGraph.from_edges(src, dst, graph.number_of_nodes(),
+                                    weights=graph.edge_weights())
+    return graph
+
+
+def bond_percolation(graph, n_orders=1, rng=None):
+    """
+    Bond percolation on a network: the largest component size and the
+    susceptibility as its links are added in random order, averaged over
+    n_orders orders.
+
+    Parameters
+    ----------
+    graph : CSRGraph or networkx graph
+        directed graphs give the weakly connected components
+    n_orders : int
+    rng : np.random.Generator, int or None
+
+    Returns
+    -------
+    curve : dict
+        'n_links' (0..m), the means 'giant' and 'susceptibility' after that
+        many links and their standard deviations 'giant_std' and
+        'susceptibility_std' over the orders (the susceptibility is NaN
+        when all nodes are in the largest component)
+    """
+    graph = as_csr(graph)
+    n_orders = _check_orders(n_orders)
+    rng = np.random.default_rng(rng)
+    n = graph.number_of_nodes()
+    src, dst = graph.edges()
+
+    def curves():
+        for _ in range(n_orders):
+            order = rng.permutation(src.size)
+            giants, square_sums = _bond_sweep(n, src[order], dst[order])
+            yield giants, susceptibility(giants, square_sums, n)
+
+    curve = _average(curves(), n_orders)
+    curve['n_links'] = np.arange(src.size + 1)
+    return curve
+
+
+def site_percolation(graph, n_orders=1, rng=None):
+    """
+    Site percolation on a network: the largest component size and the
+    susceptibility as its nodes are occupied in random order, averaged over
+    n_orders orders. Only the occupied nodes count in the susceptibility.
+
+    Parameters
+    ----------
+    graph : CSRGraph or networkx graph
+        directed graphs give the weakly connected components
+    n_orders : int
+    rng : np.random.Generator, int or None
+
+    Returns
+    -------
+    curve : dict
+        'n_nodes' (0..n) and 'giant', 'susceptibility', 'giant_std' and
+        'susceptibility_std' as in bond_percolation
+    """
+    graph = _undirected(graph)
+    n_orders = _check_orders(n_orders)
+    rng = np.random.default_rng(rng)
+    n = graph.number_of_nodes()
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    n_occupied = np.arange(n + 1)
+
+    def curves():
+        for _ in range(n_orders):
+            giants, square_sums = _site_sweep(indptr, indices,
+                                              rng.permutation(n))
+            yield giants, susceptibility(giants, square_sums, n_occupied)
+
+    curve = _average(curves(), n_orders)
+    curve['n_nodes'] = n_occupied
+    return curve
+
+
+def er_percolation(n, n_links, n_orders=1, rng=None):
+    """
+    The largest component size and the susceptibility of the Erdos-Renyi
+    graphs G(n, m) for m = 0..n_links, from one pass over a random order of
+    the node pairs per realization, averaged over n_orders realizations.
+
+    Parameters
+    ----------
+    n : int
+        number of nodes
+    n_links : int
+        the largest number of links
+    n_orders : int
+    rng : np.random.Generator, int or None
+
+    Returns
+    -------
+    curve : dict
+        'n_links' (0..n_links), 'avg_degree' (2m/n) and 'giant',
+        'susceptibility', 'giant_std' and 'susceptibility_std' as in
+        bond_percolation
+    """
+    n, n_links = int(n), int(n_links)
+    n_orders = _check_orders(n_orders)
+    rng = np.random.default_rng(rng)
+
+    def curves():
+        for _ in range(n_orders):
+            src, dst = random_pair_order(n, n_links, rng)
+            giants, square_sums = _bond_sweep(n, src, dst)
+            yield giants, susceptibility(giants, square_sums, n)
+
+    curve = _average(curves(), n_orders)
+    curve['n_links'] = np.arange(n_links + 1)
+    curve['avg_degree'] = 2.0 * curve['n_links'] / max(n, 1)
+    return curve
+
+
+def removal_sweep(n, src, dst, kept=None):
+    """
+    Removes the links (src[i], dst[i]) of a graph of n nodes one by one in
+    the given order, by adding them in the reverse order to the graph of
+    the links that stay: the graph after i removals is the one after the
+    last m-i links were added.
+
+    Parameters
+    ----------
+    n : int
+    src, dst : arrays of ints
+        the links in removal order
+    kept : (src, dst) pair of arrays or None
+        links of the graph that are not removed
+
+    Returns
+    -------
+    giants, square_sums : np.arrays of length len(src) + 1
+        the largest component size and the sum of the squared component
+        sizes after 0..m removals
+    """
+    src = np.asarray(src, dtype=np.int64)[::-1]
+    dst = np.asarray(dst, dtype=np.int64)[::-1]
+    n_kept = 0
+    if kept is not None:
+        n_kept = len(kept[0])
+        src = np.concatenate([np.asarray(kept[0], dtype=np.int64), src])
+        dst = np.concatenate([np.asarray(kept[1], dtype=np.int64), dst])
+    giants, square_sums = _bond_sweep(int(n), src, dst)
+    return giants[n_kept:][::-1], square_sums[n_kept:][::-1]
+
+
+def edge_removal(graph, orders=None, n_random=0, rng=None):
+    """
+    The largest component size and the susceptibility as the links of a
+    network are removed in given orders and in random orders, each order in
+    near-linear time (see removal_sweep).
+
+    Parameters
+    ----------
+    graph : CSRGraph or networkx graph
+    orders : dict or None
+        name -> array of link indices, the removal order of the links
+        numbered as in graph.edges() (and graph.edge_weights())
+    n_random : int
+        number of uniformly random orders, averaged over
+    rng : np.random.Generator, int or None
+
+    Returns
+    -------
+    curves : dict
+        'n_removed' (0..m); 'giant' and 'susceptibility', dicts of
+        name -> np.array after that many removals for the given orders;
+        and with random orders 'random', the means 'giant' and
+        'susceptibility' and the standard deviations 'giant_std' and
+        'susceptibility_std' over them
+    """
+    graph = as_csr(graph)
+    n = graph.number_of_nodes()
+    src, dst = graph.edges()
+    curves = {'n_removed': np.arange(src.size + 1), 'giant': {},
+              'susceptibility': {}}
+    for name, order in (orders or {}).items():
+        order = np.asarray(order, dtype=np.int64)
+        if order.shape != src.shape:
+            raise ValueError('order %r has %d links, the graph has %d'
+                             % (name, order.size, src.size))
+        giants, square_sums = removal_sweep(n, src[order], dst[order])
+        curves['giant'][name] = giants
+        curves['susceptibility'][name] = susceptibility(giants, square_sums,
+                                                        n)
+    n_random = int(n_random)
+    if n_random > 0:
+        rng = np.random.default_rng(rng)
+
+        def random_curves():
+            for _ in range(n_random):
+                order = rng.permutation(src.size)
+                giants, square_sums = removal_sweep(n, src[order], dst[order])
+                yield giants, susceptibility(giants, square_sums, n)
+
+        curves['random'] = _average(random_curves(), n_random)
+    return curves
+
+
+ATTACKS = ('random', 'static-degree', 'adaptive-degree', 'adaptive-strength')
+
+
+def _adaptive_degree_order(indptr, indices, degrees, ties):
+    """
+    Removes the node with the largest degree among the remaining nodes,
+    one at a time, with a bucket queue: buckets[d] holds the nodes that got
+    degree d, and a node's entries in the buckets of its earlier degrees
+    are skipped when they come up.
+    """
+    n = len(degrees)
+    buckets = [[] for _ in range(max(degrees, default=0) + 1)]
+    # the last node pushed comes out first, so ties go in order ties
+    for v in reversed(ties):
+        buckets[degrees[v]].append(v)
+    removed = [False] * n
+    order = []
+    top = len(buckets) - 1
+    while len(order) < n:
+        bucket = buckets[top]
+        if not bucket:
+            top -= 1
+            continue
+        v = bucket.pop()
+        if removed[v] or degrees[v] != top:
+            continue
+        removed[v] = True
+        order.append(v)
+        for u in indices[indptr[v]:indptr[v + 1]]:
+            if not removed[u] and u != v:
+                degree = degrees[u] - 1
+                degrees[u] = degree
+                buckets[degree].append(u)
+    return order
+
+
+def _adaptive_strength_order(indptr, indices, weights, strengths, ties):
+    """
+    Removes the node with the largest strength among the remaining nodes,
+    one at a time, with a heap of (-strength, tie rank, node) entries.
+    Strengths only decrease, so an entry is never below the node's
+    strength: when the top entry is out of date it goes back in with the
+    current strength, and when it is up to date its node is the largest.
+    """
+    import heapq
+
+    n = len(strengths)
+    rank = [0] * n
+    for position, v in enumerate(ties):
+        rank[v] = position
+    heap = [(-strengths[v], rank[v], v) for v in range(n)]
+    heapq.heapify(heap)
+    removed = [False] * n
+    order = []
+    while heap:
+        strength, _, v = heapq.heappop(heap)
+        if removed[v]:
+            continue
+        if -strength != strengths[v]:
+            heapq.heappush(heap, (-strengths[v], rank[v], v))
+            continue
+        removed[v] = True
+        order.append(v)
+        for i in range(indptr[v], indptr[v + 1]):
+            u = indices[i]
+            if not removed[u] and u != v:
+                strengths[u] -= weights[i]
+    return order
+
+
+def attack_order(graph, strategy='adaptive-degree', rng=None):
+    """
+    Returns the order in which an attack removes the nodes of a network.
+
+    Parameters
+    ----------
+    graph : CSRGraph or networkx graph
+        directed graphs are attacked as undirected ones
+    strategy : str
+        'random': a uniformly random order;
+        'static-degree': by decreasing degree in the original network;
+        'adaptive-degree': always the node with the largest degree among
+        the nodes left (links to removed nodes do not count);
+        'adaptive-strength': the same with the sum of the link weights
+    rng : np.random.Generator, int or None
+        the order itself for 'random', the order of the ties otherwise
+
+    Returns
+    -------
+    order : np.array of ints
+    """
+    if strategy not in ATTACKS:
+        raise ValueError('strategy should be one of %s, not %r'
+                         % (', '.join(ATTACKS), strategy))
+    graph = _undirected(graph)
+    rng = np.random.default_rng(rng)
+    n = graph.number_of_nodes()
+    ties = rng.permutation(n)
+    if strategy == 'random':
+        return ties
+
+    # degrees and strengths without self-loops, which do not connect
+    # anything
+    rows = np.repeat(np.arange(n), np.diff(graph.indptr))
+    other = rows != graph.indices
+    degrees = np.bincount(rows[other], minlength=n)
+    if strategy == 'static-degree':
+        return ties[np.argsort(-degrees[ties], kind='stable')]
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    if strategy == 'adaptive-degree' or graph.weights is None:
+        # without weights the strength is the degree
+        order = _adaptive_degree_order(indptr, indices, degrees.tolist(),
+                                       ties.tolist())
+    else:
+        weights = np.asarray(graph.weights, dtype=np.float64)
+        strengths = np.bincount(rows[other], weights=weights[other],
+                                minlength=n)
+        order = _adaptive_strength_order(indptr, indices, weights.tolist(),
+                                         strengths.tolist(), ties.tolist())
+    return np.array(order, dtype=np.int64)
+
+
+def node_attack(graph, strategy='adaptive-degree', n_orders=1, rng=None):
+    """
+    The largest component size and the susceptibility of a network as an
+    attack removes its nodes (see attack_order), computed by adding the
+    nodes back in the reverse order, averaged over n_orders orders (only
+    the ties differ between the orders of the degree and strength
+    attacks).
+
+    Parameters
+    ----------
+    graph : CSRGraph or networkx graph
+    strategy : str
+        one of ATTACKS
+    n_orders : int
+    rng : np.random.Generator, int or None
+
+    Returns
+    -------
+    curve : dict
+        'n_removed' (0..n) and 'giant', 'susceptibility', 'giant_std' and
+        'susceptibility_std' as in bond_percolation, after that many
+        removals; only the nodes left count in the susceptibility
+    """
+    graph = _undirected(graph)
+    n_orders = _check_orders(n_orders)
+    rng = np.random.default_rng(rng)
+    n = graph.number_of_nodes()
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    n_left = np.arange(n, -1, -1)
+
+    def curves():
+        for _ in range(n_orders):
+            order = attack_order(graph, strategy, rng)
+            giants, square_sums = _site_sweep(indptr, indices, order[::-1])
+            giants, square_sums = giants[::-1], square_sums[::-1]
+            yield giants, susceptibility(giants, square_sums, n_left)
+
+    curve = _average(curves(), n_orders)
+    curve['n_removed'] = np.arange(n + 1)
+    return curve
@@ -0,0 +1,208 @@
+"""
+Node relabeling for better memory locality.
+
+The ids given by the edge list readers follow the file order, so the
+neighbors of a node are scattered over the whole id range and every step of
+a traversal or power iteration touches a different part of memory.
+reorder() relabels the nodes so that nodes that are visited together get
+nearby ids:
+
+    'degree'  hubs first (descending degree)
+    'bfs'     breadth-first (Cuthill-McKee) order from the highest degree
+              node of every component
+    'rcm'     reverse Cuthill-McKee from a low degree node of every
+              component, which keeps the ids of neighbors close together
+              (small bandwidth)
+
+The permuted graph carries the original labels, so dicts produced with
+to_label_dict() are keyed exactly as before, and restore_order() maps
+per-node arrays back to the original ids.
+"""
+import numpy as np
+
+from .components import connected_components
+from .graph import CSRGraph
+
+METHODS = ('degree', 'bfs', 'rcm')
+
+
+def _components(graph):
+    """
+    Returns the (weak) component label of each node.
+    """
+    return connected_components(graph, 'weak')[0]
+
+
+def _cuthill_mckee(graph, roots):
+    """
+    Level-synchronous Cuthill-McKee ordering started from the given roots.
+
+    Within each level the new nodes are ordered by the position of their
+    first parent and then by increasing degree, as in the sequential
+    algorithm, but every level is handled with array operations.
+
+    Returns
+    -------
+    position : np.array of ints
+        position[i] is the rank of node i in the ordering
+    """
+    n = graph.number_of_nodes()
+    degree = graph.degree()
+    position = np.full(n, -1, dtype=np.int64)
+    frontier = np.asarray(roots, dtype=np.int64)
+    position[frontier] = np.arange(frontier.size)
+    next_position = frontier.size
+    while frontier.size:
+        counts = graph.indptr[frontier + 1] - graph.indptr[frontier]
+        neighbors = np.asarray(graph.neighbors_of(frontier), dtype=np.int64)
+        parent_rank = np.repeat(np.arange(frontier.size), counts)
+        new = position[neighbors] < 0
+        neighbors, parent_rank = neighbors[new], parent_rank[new]
+        # parent_rank is sorted, so the first occurrence is the first parent
+        nodes, first = np.unique(neighbors, return_index=True)
+        order = np.lexsort((nodes, degree[nodes], parent_rank[first]))
+        frontier = nodes[order]
+        position[frontier] = next_position + np.arange(frontier.size)
+        next_position += frontier.size
+    return position
+
+
+def ordering(graph, method='rcm'):
+    """
+    Computes a node ordering.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+    method : str
+        'degree', 'bfs' or 'rcm'
+
+    Returns
+    -------
+    perm : np.array of ints
+        perm[new_id] is the old id of the node that gets id new_id
+    """
+    if method not in METHODS:
+        raise ValueError('unknown ordering %r, use one of %s'
+                         % (method, ', '.join(METHODS)))
+    degree = graph.degree()
+    if method == 'degree':
+        return np.argsort(-degree, kind='stable')
+
+    structure = graph
+    if graph.directed:
+        # the orderings only care about who is next to whom
+        src, dst = graph.edges()
+        structure = CSRGraph.from_edges(src, dst, graph.number_of_nodes())
+    components = _components(structure)
+
+    # one root per component: the first node with the largest (bfs) or
+    # smallest (rcm) degree
+    key = -degree if method == 'bfs' else degree
+    by_key = np.lexsort((key, components))
+    is_first = np.ones(by_key.size, dtype=bool)
+    is_first[1:] = components[by_key[1:]] != components[by_key[:-1]]
+    roots = by_key[is_first]
+
+    position = _cuthill_mckee(structure, roots)
+    # keep every component in one contiguous id range
+    perm = np.lexsort((position, components))
+    if method == 'rcm':
+        perm = perm[::-1].copy()
+    return perm
+
+
+def permute(graph, perm):
+    """
+    Relabels the nodes of graph so that node perm[i] gets id i.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+    perm : np.array of ints
+
+    Returns
+    -------
+    new_graph : CSRGraph
+        the relabeled graph; its labels are the original labels (or the
+        original ids if the graph had none)
+    """
+    perm = np.asarray(perm, dtype=np.int64)
+    inverse = inverse_permutation(perm)
+    src, dst = graph.edges()
+    if graph.labels is None:
+        labels = perm
+    elif isinstance(graph.labels, np.ndarray):
+        labels = graph.labels[perm]
+    else:
+        old_labels = graph.node_labels()
+        labels = [old_labels[i] for i in perm]
+    return CSRGraph.from_edges(inverse[src], inverse[dst],
+                               n_nodes=graph.number_of_nodes(),
+                               weights=graph.edge_weights(),
+                               directed=graph.directed, labels=labels)
+
+
+def inverse_permutation(perm):
+    """
+    Returns inverse such that inverse[perm[i]] == i.
+    """
+    inverse = np.empty_like(perm)
+    inverse[perm] = np.arange(perm.size, dtype=perm.dtype)
+    return inverse
+
+
+def reorder(graph, method='rcm'):
+    """
+    Relabels the nodes of a graph for cache locality.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+    method : str
+        'degree', 'bfs' or 'rcm'
+
+    Returns
+    -------
+    new_graph : CSRGraph
+    perm : np.array of ints
+        perm[new_id] is the old id
+    inverse : np.array of ints
+        inverse[old_id] is the new id
+    """
+    perm = ordering(graph, method)
+    return permute(graph, perm), perm, inverse_permutation(perm)
+
+
+def restore_order(values, perm):
+    """
+    Maps a per-node array computed on the reordered graph back to the
+    original node ids.
+
+    Parameters
+    ----------
+    values : np.array
+        values[new_id]
+    perm : np.array of ints
+        the permutation returned by reorder
+
+    Returns
+    -------
+    original : np.array
+        original[old_id]
+    """
+    values = np.asarray(values)
+    original = np.empty_like(values)
+    original[perm] = values
+    return original
+
+
+def bandwidth(graph):
+    """
+    Returns the mean |i - j| over the edges (i, j), a simple measure of how
+    far apart in memory the neighbors of a node are.
+    """
+    src, dst = graph.edges()
+    if src.size == 0:
+        return 0.0
+    return float(np.abs(src - dst).mean())
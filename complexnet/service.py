@@ -0,0 +1,277 @@
+"""
+A long-lived local process that keeps graphs and their metrics in memory.
+
+The exercise scripts read the same few edge lists over and over and
+recompute the same metrics on every run. The graph service loads each file
+once, remembers every metric it has computed, and answers queries over a
+small JSON-over-HTTP API on localhost:
+
+    python -m complexnet.service --port 8765
+
+    POST /query  {"path": "ES4/OClinks_w_undir.edg", "metric": "degree"}
+    GET  /status
+
+A graph is reloaded automatically when its file changes on disk. Per-node
+metrics are answered as {"labels": [...], "values": [...]}.
+
+From a script, GraphClient does the HTTP part:
+
+    client = GraphClient()
+    degrees = client.query('./OClinks_w_undir.edg', 'degree')
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from .algorithms import pagerank
+from .components import Components
+from .io import read_edg
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+def _node_values(graph, values):
+    return {'labels': graph.node_labels(), 'values': np.asarray(values).tolist()}
+
+
+def _metric_info(entry, params):
+    graph = entry.graph
+    return {'n_nodes': graph.number_of_nodes(),
+            'n_edges': graph.number_of_edges(),
+            'directed': graph.directed,
+            'weighted': graph.weights is not None}
+
+
+def _metric_degree(entry, params):
+    return _node_values(entry.graph, entry.graph.degree())
+
+
+def _metric_strength(entry, params):
+    return _node_values(entry.graph, entry.graph.strength())
+
+
+def _metric_components(entry, params):
+    graph = entry.graph
+    components = Components(graph, params.get('connection', 'weak'))
+    result = _node_values(graph, components.labels)
+    result['sizes'] = components.sizes.tolist()
+    result['giant_size'] = components.giant_size
+    return result
+
+
+def _metric_pagerank(entry, params):
+    d = float(params.get('d', 0.85))
+    iterations = int(params.get('iterations', 10))
+    return _node_values(entry.graph, pagerank(entry.graph, d, iterations))
+
+
+def _metric_betweenness(entry, params):
+    import networkx as nx
+
+    values = nx.betweenness_centrality(entry.networkx())
+    labels = entry.graph.node_labels()
+    return {'labels': labels, 'values': [values[label] for label in labels]}
+
+
+def _metric_assortativity(entry, params):
+    import networkx as nx
+
+    return {'value': nx.degree_assortativity_coefficient(entry.networkx())}
+
+
+METRICS = {
+    'info': _metric_info,
+    'degree': _metric_degree,
+    'strength': _metric_strength,
+    'components': _metric_components,
+    'pagerank': _metric_pagerank,
+    'betweenness': _metric_betweenness,
+    'assortativity': _metric_assortativity,
+}
+
+
+class _GraphEntry(object):
+    """
+    A loaded graph, the file state it was loaded from and its metrics.
+    """
+
+    def __init__(self, path, directed):
+        stat = os.stat(path)
+        self.stamp = (stat.st_size, stat.st_mtime_ns)
+        self.graph = read_edg(path, directed=directed)
+        self.metrics = {}
+        self._networkx = None
+
+    def networkx(self):
+        if self._networkx is None:
+            self._networkx = self.graph.to_networkx()
+        return self._networkx
+
+
+class GraphStore(object):
+    """
+    The in-memory state of the service: graphs keyed by (path, directed),
+    and the computed metrics of each graph keyed by (metric, parameters).
+    """
+
+    def __init__(self):
+        self._graphs = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def _entry(self, path, directed):
+        key = (os.path.abspath(path), bool(directed))
+        stat = os.stat(key[0])
+        entry = self._graphs.get(key)
+        if entry is None or entry.stamp != (stat.st_size, stat.st_mtime_ns):
+            entry = _GraphEntry(key[0], directed)
+            self._graphs[key] = entry
+        return entry
+
+    def query(self, path, metric, directed=False, params=None):
+        """
+        Returns the JSON-ready value of a metric, computing it only if it is
+        not known yet.
+        """
+        if metric not in METRICS:
+            raise KeyError('unknown metric %r, use one of %s'
+                           % (metric, ', '.join(sorted(METRICS))))
+        params = params or {}
+        # one query at a time: the metrics are heavy and would only compete
+        # for the same cores anyway, and nothing is computed twice
+        with self._lock:
+            entry = self._entry(path, directed)
+            key = (metric, json.dumps(params, sort_keys=True))
+            if key not in entry.metrics:
+                entry.metrics[key] = METRICS[metric](entry, params)
+            return entry.metrics[key]
+
+    def status(self):
+        with self._lock:
+            return {'uptime': time.time() - self.started,
+                    'graphs': [{'path': path, 'directed': directed,
+                                'n_nodes': entry.graph.number_of_nodes(),
+                                'metrics': sorted(m for m, _ in entry.metrics)}
+                               for (path, directed), entry
+                               in sorted(self._graphs.items())]}
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def _reply(self, code, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/status':
+            self._reply(200, self.server.store.status())
+        else:
+            self._reply(404, {'error': 'unknown path %s' % self.path})
+
+    def do_POST(self):
+        if self.path != '/query':
+            self._reply(404, {'error': 'unknown path %s' % self.path})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            result = self.server.store.query(
+                request['path'], request['metric'],
+                request.get('directed', False), request.get('params'))
+        except (KeyError, ValueError, TypeError, IOError, OSError) as e:
+            self._reply(400, {'error': '%s: %s' % (type(e).__name__, e)})
+            return
+        self._reply(200, {'result': result})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, verbose=False):
+    """
+    Creates the HTTP server; call serve_forever() on it to start serving.
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.store = GraphStore()
+    server.verbose = verbose
+    return server
+
+
+class GraphClient(object):
+    """
+    Thin client for the graph service.
+
+    Parameters
+    ----------
+    host : str
+    port : int
+    timeout : float
+        seconds to wait for an answer; first queries of large graphs can
+        take long
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=3600):
+        self.url = 'http://%s:%d' % (host, port)
+        self.timeout = timeout
+
+    def query(self, path, metric, directed=False, **params):
+        """
+        Returns the metric of the graph in path. Relative paths are resolved
+        here, so they work no matter where the service was started.
+        """
+        body = json.dumps({'path': os.path.abspath(path), 'metric': metric,
+                           'directed': directed, 'params': params})
+        request = Request(self.url + '/query', data=body.encode('utf-8'),
+                          headers={'Content-Type': 'application/json'})
+        try:
+            response = urlopen(request, timeout=self.timeout)
+        except HTTPError as e:
+            raise ValueError(json.loads(e.read().decode('utf-8'))['error'])
+        return json.loads(response.read().decode('utf-8'))['result']
+
+    def node_values(self, path, metric, directed=False, **params):
+        """
+        Returns a per-node metric as a dict keyed by node label, like the
+        networkx functions do.
+        """
+        result = self.query(path, metric, directed, **params)
+        return dict(zip(result['labels'], result['values']))
+
+    def status(self):
+        response = urlopen(self.url + '/status', timeout=self.timeout)
+        return json.loads(response.read().decode('utf-8'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Keep graphs and their metrics in memory between runs.')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+    server = make_server(args.host, args.port, args.verbose)
+    print('graph service listening on http://%s:%d' % (args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
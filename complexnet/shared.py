@@ -0,0 +1,197 @@
+"""
+Sharing a graph between worker processes without copying it.
+
+Passing a networkx graph (or a CSRGraph) to a process pool pickles the whole
+graph for every worker. Instead, SharedGraph copies the CSR arrays once into
+multiprocessing.shared_memory blocks and gives out a small picklable handle.
+A worker calls handle.attach() (or attach(handle)) and gets a CSRGraph whose
+arrays are views of the shared blocks, so N workers cost one copy of the
+graph.
+
+    with SharedGraph(graph) as handle:
+        with multiprocessing.Pool(4) as pool:
+            results = pool.map(work, [(handle, seed) for seed in seeds])
+
+    def work(args):
+        handle, seed = args
+        graph = attach(handle)
+        ...
+
+The process that created the SharedGraph owns the memory: leaving the with
+block (or calling close()) frees it. Workers only map it; attach() caches
+the mapping per process, so a worker that runs many tasks maps it once.
+"""
+import pickle
+import uuid
+
+import numpy as np
+from multiprocessing import shared_memory
+
+from .graph import CSRGraph
+
+# per-process cache of attached graphs, keyed by the handle token
+_attached = {}
+
+
+def _open_block(name):
+    try:
+        # the owner is responsible for unlinking, so the workers should not
+        # register the block with the resource tracker (Python 3.13+)
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedGraphHandle(object):
+    """
+    Picklable description of a graph published with SharedGraph.
+
+    Attributes
+    ----------
+    token : str
+        unique id of the published graph
+    arrays : dict
+        array name -> (shared memory name, shape, dtype string)
+    directed : bool
+    pickled_labels : bytes or None
+        labels that cannot live in shared memory (e.g. a list of tuples)
+    """
+
+    def __init__(self, token, arrays, directed, pickled_labels=None):
+        self.token = token
+        self.arrays = arrays
+        self.directed = directed
+        self.pickled_labels = pickled_labels
+
+    def attach(self):
+        return attach(self)
+
+    def __repr__(self):
+        return '<SharedGraphHandle %s>' % self.token
+
+
+class SharedGraph(object):
+    """
+    Publishes the arrays of a CSRGraph into shared memory.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+        any CSRGraph with numeric arrays (a CompressedGraph publishes its
+        decompressed indices)
+
+    Attributes
+    ----------
+    handle : SharedGraphHandle
+        the handle to give to the workers
+    """
+
+    def __init__(self, graph):
+        self._blocks = []
+        arrays = {'indptr': graph.indptr, 'indices': graph.indices}
+        if graph.weights is not None:
+            arrays['weights'] = graph.weights
+        pickled_labels = None
+        if graph.labels is not None:
+            labels = np.asarray(graph.labels)
+            # tuples become rows and mixed types become strings in an array,
+            # so only labels that come back unchanged are shared as one
+            if (labels.dtype.hasobject or labels.ndim != 1
+                    or labels.tolist() != list(graph.labels)):
+                pickled_labels = pickle.dumps(graph.labels)
+            else:
+                arrays['labels'] = labels
+        for key, array in arrays.items():
+            if array is None:
+                raise TypeError('the graph has no %s array to share' % key)
+            # object arrays hold pointers that mean nothing in another process
+            if np.asarray(array).dtype.hasobject:
+                raise TypeError('cannot share the %s of the graph, an object '
+                                'array' % key)
+
+        token = uuid.uuid4().hex[:12]
+        described = {}
+        try:
+            for key, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(
+                    create=True, size=max(1, array.nbytes),
+                    name='cn_%s_%s' % (token, key))
+                self._blocks.append(block)
+                view = np.ndarray(array.shape, dtype=array.dtype,
+                                  buffer=block.buf)
+                view[...] = array
+                described[key] = (block.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+        self.handle = SharedGraphHandle(token, described, graph.directed,
+                                        pickled_labels)
+
+    def close(self):
+        """
+        Frees the shared memory. Graphs attached in this process become
+        invalid; workers should be done before this is called.
+        """
+        handle = getattr(self, 'handle', None)
+        if handle is not None:
+            _attached.pop(handle.token, None)
+        while self._blocks:
+            block = self._blocks.pop()
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self.handle
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        if self._blocks:
+            self.close()
+
+
+def attach(handle):
+    """
+    Returns the CSRGraph published under the handle, mapping the shared
+    memory without copying it.
+
+    Parameters
+    ----------
+    handle : SharedGraphHandle
+
+    Returns
+    -------
+    graph : CSRGraph
+    """
+    if handle.token in _attached:
+        return _attached[handle.token]
+    blocks = []
+    views = {}
+    for key, (name, shape, dtype) in handle.arrays.items():
+        block = _open_block(name)
+        blocks.append(block)
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        view.flags.writeable = False
+        views[key] = view
+    labels = views.get('labels')
+    if handle.pickled_labels is not None:
+        labels = pickle.loads(handle.pickled_labels)
+    graph = CSRGraph(views['indptr'], views['indices'], views.get('weights'),
+                     handle.directed, labels)
+    # the blocks must stay open as long as the graph uses their buffers
+    graph._shared_blocks = blocks
+    _attached[handle.token] = graph
+    return graph
+
+
+def detach(handle):
+    """
+    Forgets the graph attached in this process. The mapping is released once
+    no arrays of the graph are referenced any more.
+    """
+    _attached.pop(handle.token, None)
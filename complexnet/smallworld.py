@@ -0,0 +1,145 @@
+"""
+The whole Watts-Strogatz C(p)/C(0), L(p)/L(0) curve from one evolving
+graph.
+
+Every link of the ring lattice gets a single uniform threshold, and a link
+is rewired exactly when its threshold is below p. Going through the values
+of p in increasing order therefore only adds rewirings to the same graph:
+the network at p contains all the rewirings of the smaller values (coupled
+realizations), so the curve costs about as much as one realization at the
+largest p, and it is smooth because the same randomness is used for every
+point.
+
+The triangle counts are kept up to date rewiring by rewiring by a
+CachedGraph, so the average clustering at each p only recomputes the nodes
+whose neighborhoods changed. The average shortest path length of the
+largest component is estimated with breadth-first searches from a random
+sample of its nodes.
+"""
+import numpy as np
+
+from .algorithms import expand_frontier
+from .cached import CachedGraph
+from .components import giant_component
+from .generators import ring_edges
+from .graph import CSRGraph
+
+
+def sampled_path_length(graph, n_sources=100, rng=None):
+    """
+    Estimates the average shortest path length of the largest component,
+    averaging the distances from a random sample of its nodes to all the
+    others.
+
+    Parameters
+    ----------
+    graph : CSRGraph
+    n_sources : int or None
+        number of breadth-first searches; None (or at least the size of the
+        component) gives the exact value
+    rng : np.random.Generator, int or None
+
+    Returns
+    -------
+    length : float
+    """
+    rng = np.random.default_rng(rng)
+    component = giant_component(graph)
+    if component.size < 2:
+        return 0.0
+    if n_sources is None or n_sources >= component.size:
+        sources = component
+    else:
+        sources = rng.choice(component, n_sources, replace=False)
+    n = graph.number_of_nodes()
+    total = 0
+    for source in sources:
+        visited = np.zeros(n, dtype=bool)
+        visited[source] = True
+        boundary = np.array([source])
+        depth = 0
+        while boundary.size:
+            depth += 1
+            boundary = expand_frontier(graph, visited, boundary)
+            total += depth * boundary.size
+    return total / float(sources.size * (component.size - 1))
+
+
+def _rewire(cached, u, v, rng, n):
+    """
+    Moves the v end of the link (u, v) to a random node that is neither u
+    nor linked to u (so not v either, as in the Watts-Strogatz model).
+    Returns the new end, or v when u is already linked to every node.
+    """
+    neighbors = cached.neighbors(u)
+    if len(neighbors) >= n - 1:
+        # nowhere to go
+        return v
+    while True:
+        w = int(rng.integers(n))
+        if w != u and w not in neighbors:
+            cached.remove_edge(u, v)
+            cached.add_edge(u, w)
+            return w
+
+
+def coupled_ws_sweep(n, k, ps, rng=None, n_sources=100):
+    """
+    Computes the average clustering and the average shortest path length of
+    Watts-Strogatz graphs for a range of rewiring probabilities, from one
+    coupled realization.
+
+    Parameters
+    ----------
+    n : int
+        number of nodes
+    k : int
+        ring neighbors of each node (k // 2 on each side)
+    ps : list of floats
+        rewiring probabilities
+    rng : np.random.Generator, int or None
+    n_sources : int or None
+        breadth-first searches per path length estimate, None for exact
+
+    Returns
+    -------
+    data : dict
+        'p', 'c', 'l' and 'n_rewired' lists (in the order of ps), and 'c0'
+        and 'l0', the values of the ring lattice
+    """
+    import networkx as nx
+
+    # separate streams, so that the graphs do not depend on n_sources
+    graph_rng, source_rng = np.random.default_rng(rng).spawn(2)
+    n = int(n)
+    src, dst = ring_edges(n, k)
+    thresholds = graph_rng.random(src.size)
+    order = np.argsort(thresholds)
+    thresholds = thresholds[order]
+
+    network = nx.Graph()
+    network.add_nodes_from(range(n))
+    network.add_edges_from(zip(src.tolist(), dst.tolist()))
+    cached = CachedGraph(network)
+
+    def measure():
+        c = sum(cached.clusterings().values()) / float(n)
+        graph = CSRGraph.from_edges(src, dst, n)
+        return c, sampled_path_length(graph, n_sources, source_rng)
+
+    c0, l0 = measure()
+    results = {}
+    n_rewired = 0
+    for p in sorted(set(ps)):
+        # rewire the links whose thresholds are below p
+        while n_rewired < order.size and thresholds[n_rewired] < p:
+            e = order[n_rewired]
+            dst[e] = _rewire(cached, int(src[e]), int(dst[e]), graph_rng, n)
+            n_rewired += 1
+        results[p] = measure() + (n_rewired,)
+
+    return {'p': list(ps),
+            'c': [results[p][0] for p in ps],
+            'l': [results[p][1] for p in ps],
+            'n_rewired': [results[p][2] for p in ps],
+            'c0': c0, 'l0': l0}
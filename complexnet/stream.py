@@ -0,0 +1,159 @@
+"""
+Graph-free statistics of edge list files.
+
+scan_edge_file reads an .edg file once, chunk by chunk, and only keeps one
+degree and one strength counter per node, so its memory use does not depend
+on the number of edges. The result answers the ES1 questions (number of
+nodes and edges, density, degree distribution, 1-CDF) without building a
+graph.
+
+As there is no graph to look edges up in, every line of the file is counted
+as an edge; the exercise files list each edge once.
+"""
+import numpy as np
+
+from .io import iter_edge_chunks, _labels_array
+
+
+def _grow(array, size):
+    if array.size >= size:
+        return array
+    bigger = np.zeros(max(size, 2 * array.size), dtype=array.dtype)
+    bigger[:array.size] = array
+    return bigger
+
+
+class EdgeStats(object):
+    """
+    Node and degree statistics of an edge list file, see scan_edge_file.
+
+    Attributes
+    ----------
+    labels : np.array
+        node labels in order of first appearance in the file
+    degrees : np.array of ints
+        degrees[i] is the degree of node labels[i]; self-loops count twice
+    strengths : np.array of floats
+        sums of the edge weights (equal to the degrees if unweighted)
+    n_edges : int
+    n_self_loops : int
+    weighted : bool
+    """
+
+    def __init__(self, labels, degrees, strengths, n_edges, n_self_loops,
+                 weighted):
+        self.labels = labels
+        self.degrees = degrees
+        self.strengths = strengths
+        self.n_edges = n_edges
+        self.n_self_loops = n_self_loops
+        self.weighted = weighted
+
+    def number_of_nodes(self):
+        return self.degrees.size
+
+    def number_of_edges(self):
+        return self.n_edges
+
+    def __len__(self):
+        return self.number_of_nodes()
+
+    def degree(self):
+        """
+        Returns the degrees in label order, like CSRGraph.degree().
+        """
+        return self.degrees
+
+    def density(self):
+        """
+        Returns the edge density 2m / n(n-1).
+        """
+        n = self.number_of_nodes()
+        if n < 2:
+            return 0.0
+        return 2.0 * self.n_edges / (n * (n - 1))
+
+    def max_degree(self):
+        return int(self.degrees.max()) if self.degrees.size else 0
+
+    def degree_histogram(self):
+        """
+        Returns counts where counts[k] is the number of nodes of degree k.
+        """
+        return np.bincount(self.degrees)
+
+    def strength_histogram(self, bins=10):
+        """
+        Returns (counts, bin_edges) of the node strengths, see np.histogram.
+        """
+        return np.histogram(self.strengths, bins=bins)
+
+    def cdf(self):
+        """
+        Returns the degree CDF in the same form as cdf(degrees) in ES1:
+        the unique degree values and, for each, the fraction of nodes with
+        a smaller degree. 1 - cdf gives the CCDF.
+
+        Returns
+        -------
+        x_points : np.array of ints
+        cdf : np.array of floats
+        """
+        counts = self.degree_histogram()
+        x_points = np.nonzero(counts)[0]
+        below = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        return x_points, below[x_points] / float(self.degrees.size)
+
+    def ccdf(self):
+        """
+        Returns the unique degree values and the fraction of nodes with a
+        degree at least that large.
+        """
+        x_points, cdf = self.cdf()
+        return x_points, 1 - cdf
+
+
+def scan_edge_file(path, nodetype=None, chunk_size=2**24):
+    """
+    Computes node and degree statistics of an edge list file in one pass.
+
+    Parameters
+    ----------
+    path : str
+        path of the .edg file
+    nodetype : None or int
+        None keeps the node labels as strings, int converts them to integers
+    chunk_size : int
+        approximate number of bytes read at once
+
+    Returns
+    -------
+    stats : EdgeStats
+    """
+    index = {}
+    degrees = np.zeros(0, dtype=np.int64)
+    strengths = np.zeros(0, dtype=np.float64)
+    n_edges = 0
+    n_self_loops = 0
+    weighted = False
+    for src, dst, weights in iter_edge_chunks(path, index, nodetype,
+                                              chunk_size):
+        n = len(index)
+        degrees = _grow(degrees, n)
+        strengths = _grow(strengths, n)
+        endpoints = np.concatenate([src, dst])
+        # a self-loop adds 2 to the degree, as in networkx
+        degrees[:n] += np.bincount(endpoints, minlength=n)
+        if weights is None:
+            weights = np.ones(src.size)
+        else:
+            weighted = True
+        strengths[:n] += np.bincount(endpoints,
+                                     weights=np.concatenate([weights, weights]),
+                                     minlength=n)
+        n_edges += src.size
+        n_self_loops += int(np.count_nonzero(src == dst))
+
+    n = len(index)
+    return EdgeStats(_labels_array(index, nodetype), degrees[:n],
+                     strengths[:n], n_edges, n_self_loops, weighted)
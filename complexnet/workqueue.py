@@ -0,0 +1,421 @@
+"""
+Running tasks on worker processes on other machines through a TCP work
+queue.
+
+A Broker listens on a TCP port; workers on any host connect to it with
+
+    COMPLEXNET_AUTHKEY=secret python -m complexnet worker HOST:PORT
+
+and ask it for tasks. The broker runs in the process that wants the results:
+
+    with Broker(('0.0.0.0', 5000), authkey=b'secret') as broker:
+        for result in broker.imap_unordered(function, tasks):
+            ...
+
+or, for the ensembles of complexnet.ensemble,
+
+    sweep(ER_realization, arg_list, 100, seed=42, broker=broker)
+
+A task is function(task) for one item of tasks; both are pickled, so the
+function must be importable by the workers: a module-level function of a
+module that every host has (the repository has to be checked out on every
+host). Functions of the exercise scripts loaded by complexnet.cli are sent
+by path and loaded on the worker the same way.
+
+Every worker keeps a short queue of tasks it is given in advance (prefetch),
+so it never waits for the broker between tasks. When the shared queue runs
+dry, a worker that has nothing left steals the tasks that another worker
+has queued but not started; the victim is told to drop them when it next
+reports. A worker starts its next task only after reporting the previous
+one, so no task runs twice. A task that raises is run again up to retries
+times; when a worker disconnects (its host went down), its unfinished tasks
+go back to the shared queue.
+
+For testing on one machine, Broker(local_workers=k) starts k worker
+processes on this host that connect through TCP like remote ones.
+"""
+import collections
+import io
+import os
+import pickle
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import types
+from multiprocessing.connection import Client, Listener, wait
+
+AUTHKEY_VARIABLE = 'COMPLEXNET_AUTHKEY'
+
+# seconds an idle worker waits before asking again
+_POLL = 0.1
+
+
+def parse_address(text):
+    """
+    Parses 'host:port' (or just 'port', on all interfaces) into a
+    (host, port) pair.
+    """
+    host, _, port = text.rpartition(':')
+    return host or '0.0.0.0', int(port)
+
+
+def default_authkey():
+    """
+    Returns the authentication key from the COMPLEXNET_AUTHKEY environment
+    variable, or None.
+    """
+    key = os.environ.get(AUTHKEY_VARIABLE)
+    return key.encode() if key else None
+
+
+def _exercise_function(path, name):
+    from .cli import load_exercise
+
+    return getattr(load_exercise(path), name)
+
+
+class _Pickler(pickle.Pickler):
+    # exercise scripts are loaded under made-up module names, send their
+    # functions by file path instead
+    def reducer_override(self, obj):
+        if isinstance(obj, types.FunctionType):
+            module = sys.modules.get(obj.__module__)
+            path = getattr(module, '__exercise__', None)
+            if path is not None:
+                return _exercise_function, (path, obj.__qualname__)
+        return NotImplemented
+
+
+def _dumps(obj):
+    buffer = io.BytesIO()
+    _Pickler(buffer, pickle.HIGHEST_PROTOCOL).dump(obj)
+    return buffer.getvalue()
+
+
+class RemoteError(Exception):
+    """
+    A task failed on every try; the message holds the worker traceback.
+    """
+
+
+class _Worker(object):
+
+    def __init__(self, connection, name):
+        self.connection = connection
+        self.name = name
+        # task ids given to the worker, in the order it runs them; the
+        # first one is running
+        self.queue = collections.deque()
+        # ids taken away to be told at the next report
+        self.stolen = []
+        self.n_done = 0
+
+
+class Broker(object):
+    """
+    Hands out tasks to the workers that connect to it and collects the
+    results.
+
+    Parameters
+    ----------
+    address : (str, int)
+        where to listen; port 0 picks a free port (see .address)
+    authkey : bytes or None
+        shared secret of the broker and the workers; by default the
+        COMPLEXNET_AUTHKEY environment variable, or a random key when only
+        local workers are used
+    prefetch : int
+        tasks queued on every worker
+    retries : int
+        extra tries of a task that raised or whose worker disconnected
+    local_workers : int
+        worker processes to start on this host
+
+    Attributes
+    ----------
+    address : (str, int)
+    n_stolen : int
+        tasks moved from one worker to another
+    """
+
+    def __init__(self, address=('127.0.0.1', 0), authkey=None, prefetch=2,
+                 retries=2, local_workers=0):
+        if authkey is None:
+            authkey = default_authkey() or os.urandom(16).hex().encode()
+        self.authkey = authkey
+        self.prefetch = max(1, int(prefetch))
+        self.retries = int(retries)
+        self._listener = Listener(address, authkey=self.authkey)
+        self.address = self._listener.address
+        self._connecting = queue.Queue()
+        self._workers = {}
+        self._closed = False
+        self._job = 0
+        self.n_stolen = 0
+        thread = threading.Thread(target=self._accept)
+        thread.daemon = True
+        thread.start()
+        self._processes = [self._start_local_worker()
+                           for _ in range(int(local_workers))]
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                connection = self._listener.accept()
+            except Exception:
+                # closed, or a client with the wrong key
+                continue
+            self._connecting.put(connection)
+
+    def _start_local_worker(self):
+        repository = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                  os.pardir))
+        environment = dict(os.environ)
+        environment[AUTHKEY_VARIABLE] = self.authkey.decode()
+        environment['PYTHONPATH'] = os.pathsep.join(
+            [repository] + [p for p in [os.environ.get('PYTHONPATH')] if p])
+        host, port = self.address
+        if host == '0.0.0.0':
+            host = '127.0.0.1'
+        return subprocess.Popen([sys.executable, '-m', 'complexnet', 'worker',
+                                 '%s:%d' % (host, port)], env=environment)
+
+    def workers(self):
+        """
+        Returns {worker name: number of tasks done} of the connected workers.
+        """
+        return {worker.name: worker.n_done
+                for worker in self._workers.values() if worker is not None}
+
+    def _register(self):
+        while True:
+            try:
+                connection = self._connecting.get_nowait()
+            except queue.Empty:
+                return
+            self._workers[connection] = None
+
+    def _steal(self, thief):
+        # take the unstarted half of the longest worker queue
+        victim = max((worker for worker in self._workers.values()
+                      if worker is not None and worker is not thief),
+                     key=lambda worker: len(worker.queue), default=None)
+        if victim is None or len(victim.queue) < 2:
+            return
+        n_taken = len(victim.queue) // 2
+        for _ in range(n_taken):
+            task_id = victim.queue.pop()
+            victim.stolen.append(task_id)
+            thief.queue.append(task_id)
+        self.n_stolen += n_taken
+
+    def _requeue(self, pending, attempts, task_id, failures, message):
+        attempts[task_id] += 1
+        if attempts[task_id] > self.retries:
+            failures[task_id] = message
+        else:
+            pending.appendleft(task_id)
+
+    def imap_unordered(self, function, tasks):
+        """
+        Runs function(task) for every task on the workers and yields the
+        results as they come in.
+
+        Raises
+        ------
+        RemoteError
+            when a task failed more than retries times
+        """
+        # task ids are (job, index), so that reports of the tasks of an
+        # earlier, interrupted call are told apart
+        self._job += 1
+        tasks = list(tasks)
+        payloads = {(self._job, index): _dumps((function, task))
+                    for index, task in enumerate(tasks)}
+        pending = collections.deque(sorted(payloads))
+        attempts = collections.Counter()
+        finished = set()
+        failures = {}
+        for worker in self._workers.values():
+            if worker is not None:
+                worker.stolen = list(worker.queue)
+                worker.queue.clear()
+
+        while len(finished) + len(failures) < len(tasks):
+            self._register()
+            if not self._workers:
+                time.sleep(_POLL)
+                continue
+            ready = wait(list(self._workers), timeout=_POLL)
+            results = []
+            for connection in ready:
+                worker = self._workers[connection]
+                try:
+                    name, reports = connection.recv()
+                except (EOFError, OSError):
+                    # the worker is gone: its queue goes back, and the
+                    # running task counts as a try
+                    del self._workers[connection]
+                    if worker is not None:
+                        unstarted = list(worker.queue)[1:]
+                        pending.extendleft(reversed(unstarted))
+                        if worker.queue:
+                            self._requeue(pending, attempts, worker.queue[0],
+                                          failures, 'worker %s disconnected'
+                                          % worker.name)
+                    continue
+                if worker is None:
+                    worker = self._workers[connection] = _Worker(connection,
+                                                                 name)
+                for task_id, ok, value in reports:
+                    if task_id in worker.queue:
+                        worker.queue.remove(task_id)
+                    if (task_id not in payloads or task_id in finished
+                            or task_id in failures):
+                        continue
+                    worker.n_done += 1
+                    if ok:
+                        finished.add(task_id)
+                        results.append(value)
+                    else:
+                        self._requeue(pending, attempts, task_id, failures,
+                                      value)
+                self._reply(worker, pending, payloads)
+            for value in results:
+                yield value
+
+        if failures:
+            task_id = min(failures)
+            raise RemoteError('task %d failed %d times:\n%s'
+                              % (task_id[1], attempts[task_id],
+                                 failures[task_id]))
+
+    def _reply(self, worker, pending, payloads):
+        new = []
+        while len(worker.queue) < self.prefetch and pending:
+            task_id = pending.popleft()
+            worker.queue.append(task_id)
+            new.append(task_id)
+        if not worker.queue:
+            self._steal(worker)
+            new = list(worker.queue)
+        dropped, worker.stolen = worker.stolen, []
+        if not worker.queue and not dropped:
+            message = ('wait', _POLL)
+        else:
+            message = ('tasks', [(task_id, payloads[task_id])
+                                 for task_id in new], dropped)
+        try:
+            worker.connection.send_bytes(_dumps(message))
+        except OSError:
+            pass
+
+    def map(self, function, tasks):
+        """
+        Runs function(task) for every task on the workers and returns the
+        results in task order.
+        """
+        indexed = list(enumerate(tasks))
+        results = [None] * len(indexed)
+        for index, value in self.imap_unordered(_indexed,
+                                                [(function, index, task)
+                                                 for index, task in indexed]):
+            results[index] = value
+        return results
+
+    def close(self):
+        """
+        Tells the workers to stop and stops listening.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._register()
+        stop = _dumps(('stop',))
+        for connection in list(self._workers):
+            try:
+                connection.send_bytes(stop)
+                connection.close()
+            except OSError:
+                pass
+        self._workers.clear()
+        self._listener.close()
+        for process in self._processes:
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _indexed(task):
+    function, index, item = task
+    return index, function(item)
+
+
+def run_worker(address, authkey=None, name=None):
+    """
+    Connects to a broker and runs the tasks it hands out until it says
+    stop or goes away.
+
+    Parameters
+    ----------
+    address : (str, int)
+    authkey : bytes or None
+        by default the COMPLEXNET_AUTHKEY environment variable
+    name : str or None
+        shown by Broker.workers(); by default host:pid
+
+    Returns
+    -------
+    n_done : int
+        number of tasks run
+    """
+    if authkey is None:
+        authkey = default_authkey()
+    if name is None:
+        name = '%s:%d' % (socket.gethostname(), os.getpid())
+    connection = Client(tuple(address), authkey=authkey)
+    local = collections.deque()
+    reports = []
+    n_done = 0
+    try:
+        while True:
+            connection.send((name, reports))
+            reports = []
+            message = pickle.loads(connection.recv_bytes())
+            if message[0] == 'stop':
+                break
+            if message[0] == 'wait':
+                time.sleep(message[1])
+                continue
+            # drop the stolen tasks first: one can come back in new
+            _, new, dropped = message
+            if dropped:
+                dropped = set(dropped)
+                local = collections.deque(entry for entry in local
+                                          if entry[0] not in dropped)
+            local.extend(new)
+            if not local:
+                continue
+            task_id, payload = local.popleft()
+            try:
+                function, task = pickle.loads(payload)
+                reports.append((task_id, True, function(task)))
+            except Exception:
+                reports.append((task_id, False, traceback.format_exc()))
+            n_done += 1
+    except (EOFError, OSError):
+        pass
+    finally:
+        connection.close()
+    return n_done
@@ -0,0 +1,56 @@
+"""
+Batched breadth-first searches against networkx distances.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import networkx as nx
+import numpy as np
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import CSRGraph, gnp_random_graph, multi_source_bfs
+
+
+def _expected(network, source, max_depth):
+    # boundary sizes and links back to the boundary or closer, by depth
+    distances = nx.single_source_shortest_path_length(network, source,
+                                                      cutoff=max_depth)
+    boundary = np.zeros(max_depth + 1, dtype=np.int64)
+    edges = np.zeros(max_depth + 1, dtype=np.int64)
+    for node, depth in distances.items():
+        boundary[depth] += 1
+        edges[depth] += sum(1 for w in network.neighbors(node)
+                            if w in distances and distances[w] <= depth)
+    return boundary, edges
+
+
+@pytest.mark.parametrize('directed', [False, True])
+@pytest.mark.parametrize('batch_size', [None, 1, 7])
+def test_boundaries_match_networkx(directed, batch_size):
+    graph = gnp_random_graph(300, 0.012, rng=5, directed=directed)
+    network = graph.to_networkx()
+    # a repeated source is a separate search
+    sources = np.r_[np.random.default_rng(6).choice(300, 20, replace=False),
+                    3, 3]
+    max_depth = 6
+    boundary_sizes, edge_counts, loop_counts = multi_source_bfs(
+        graph, sources, max_depth, batch_size=batch_size)
+    assert boundary_sizes.shape == (sources.size, max_depth + 1)
+    for row, source in enumerate(sources.tolist()):
+        boundary, edges = _expected(network, source, max_depth)
+        assert np.array_equal(boundary_sizes[row], boundary)
+        assert np.array_equal(edge_counts[row], edges)
+    assert np.array_equal(loop_counts[:, 1:],
+                          edge_counts[:, 1:] - boundary_sizes[:, 1:])
+    assert np.array_equal(loop_counts[:, 0], edge_counts[:, 0])
+
+
+def test_tree_has_no_loops():
+    graph = CSRGraph.from_networkx(nx.balanced_tree(2, 6))
+    boundary_sizes, _, loop_counts = multi_source_bfs(graph, [0], 8)
+    assert boundary_sizes[0].tolist() == [1, 2, 4, 8, 16, 32, 64, 0, 0]
+    assert not loop_counts.any()
@@ -0,0 +1,63 @@
+"""
+The incremental updates of CachedGraph against recomputing with networkx.
+
+    python -m pytest tests
+"""
+import os
+import random
+import sys
+
+import networkx as nx
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import CachedGraph
+
+
+def _assert_matches(cached, nodes):
+    net = cached.net
+    triangles = nx.triangles(net, nodes)
+    clustering = nx.clustering(net, nodes)
+    for node in nodes:
+        assert cached.triangles(node) == triangles[node]
+        assert cached.clustering(node) == pytest.approx(clustering[node])
+        assert cached.degree(node) == net.degree(node)
+        assert cached.strength(node) == pytest.approx(
+            net.degree(node, weight='weight'))
+    components = list(nx.connected_components(net))
+    assert cached.giant_size() == max(len(c) for c in components)
+    assert sorted(map(sorted, cached.components())) == sorted(
+        map(sorted, components))
+    for component in components:
+        assert len(set(cached.component_of(node)
+                       for node in component)) == 1
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_random_mutations(seed):
+    rng = random.Random(seed)
+    net = nx.gnm_random_graph(40, 50, seed=seed)
+    for u, v in net.edges():
+        net[u][v]['weight'] = rng.randint(1, 3)
+    cached = CachedGraph(net)
+    nodes = list(net)
+    _assert_matches(cached, nodes)
+    for step in range(300):
+        if net.number_of_edges() and rng.random() < 0.5:
+            u, v = rng.choice(list(net.edges()))
+            cached.remove_edge(u, v)
+        else:
+            # now and then a self-loop, a new node or an existing link
+            u = rng.choice(nodes + [len(nodes)])
+            v = u if rng.random() < 0.05 else rng.choice(nodes)
+            cached.add_edge(u, v, weight=rng.randint(1, 3))
+            if u not in nodes:
+                nodes.append(u)
+        # only some of the entries are cached at any time
+        _assert_matches(cached, rng.sample(nodes, 5))
+        if step % 50 == 0:
+            _assert_matches(cached, nodes)
+    _assert_matches(cached, nodes)
+    # the components were never searched from scratch again
+    assert cached.n_computed['components'] == 1
@@ -0,0 +1,34 @@
+"""
+The headless command line entry point.
+
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet.cli import TASKS, main, make_parser
+
+
+@pytest.mark.parametrize('name', sorted(TASKS))
+def test_every_task_takes_the_plot_flags(name):
+    args = make_parser().parse_args(['run', name, '--no-plots',
+                                     '--fig', 'figure.pdf'])
+    assert args.task == name
+    assert args.no_plots
+
+
+def test_no_plots_on_a_task_without_figure(tmp_path):
+    out = str(tmp_path / 'ws.json')
+    assert main(['run', 'es2.ws-coupled', '--n', '200', '--p', '0.01', '0.1',
+                 '--sources', '20', '--seed', '1', '--no-plots',
+                 '--out', out]) == 0
+    with open(out) as f:
+        document = json.load(f)
+    assert document['task'] == 'es2.ws-coupled'
+    assert 'no_plots' not in document['parameters']
+    assert len(document['data']['relative_c']) == 2
@@ -0,0 +1,92 @@
+"""
+Weak and strong components against networkx.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import networkx as nx
+import numpy as np
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import (CSRGraph, Components, connected_components,
+                        giant_component, gnp_random_graph)
+
+
+def _network(graph):
+    network = nx.DiGraph() if graph.directed else nx.Graph()
+    network.add_nodes_from(range(len(graph)))
+    network.add_edges_from(zip(*[ends.tolist() for ends in graph.edges()]))
+    return network
+
+
+def _assert_partition(components, expected):
+    labels = components.labels
+    found = {frozenset(np.nonzero(labels == c)[0].tolist())
+             for c in range(components.n_components)}
+    expected = {frozenset(nodes) for nodes in expected}
+    assert found == expected
+    # numbered in the order of their smallest node
+    smallest = [int(np.nonzero(labels == c)[0][0])
+                for c in range(components.n_components)]
+    assert smallest == sorted(smallest)
+    sizes = sorted(len(nodes) for nodes in expected)
+    assert sorted(components.sizes.tolist()) == sizes
+    assert components.giant_size == sizes[-1]
+    assert components.labels[components.giant].size == sizes[-1]
+    assert np.unique(components.labels[components.giant]).size == 1
+    assert components.size_distribution() == {
+        size: sizes.count(size) for size in set(sizes)}
+
+
+@pytest.mark.parametrize('p', [0.001, 0.004, 0.01])
+def test_undirected_components(p):
+    for seed in range(3):
+        graph = gnp_random_graph(500, p, rng=seed)
+        network = _network(graph)
+        components = Components(graph)
+        assert components.n_components == nx.number_connected_components(
+            network)
+        _assert_partition(components, nx.connected_components(network))
+        assert giant_component(graph).tolist() == sorted(
+            max(nx.connected_components(network), key=len))
+
+
+@pytest.mark.parametrize('p', [0.001, 0.003, 0.01])
+def test_directed_components(p):
+    for seed in range(3):
+        graph = gnp_random_graph(400, p, rng=seed, directed=True)
+        network = _network(graph)
+        weak = Components(graph, 'weak')
+        assert weak.n_components == nx.number_weakly_connected_components(
+            network)
+        _assert_partition(weak, nx.weakly_connected_components(network))
+        strong = Components(graph, 'strong')
+        assert strong.n_components == nx.number_strongly_connected_components(
+            network)
+        _assert_partition(strong, nx.strongly_connected_components(network))
+
+
+def test_long_chain_and_cycle():
+    # deep searches and many hooking rounds
+    n = 5000
+    src = np.arange(n - 1)
+    chain = CSRGraph.from_edges(src[::-1], src[::-1] + 1, n)
+    assert Components(chain).n_components == 1
+    cycle = CSRGraph.from_edges(np.arange(n), (np.arange(n) + 1) % n, n,
+                                directed=True)
+    assert Components(cycle, 'strong').n_components == 1
+    path = CSRGraph.from_edges(src, src + 1, n, directed=True)
+    assert Components(path, 'strong').n_components == n
+    assert Components(path, 'weak').n_components == 1
+
+
+def test_empty_graph_and_bad_connection():
+    empty = Components(CSRGraph.from_edges([], [], 0))
+    assert empty.n_components == 0
+    assert empty.giant_size == 0
+    with pytest.raises(ValueError):
+        connected_components(nx.path_graph(3), 'semi')
@@ -0,0 +1,82 @@
+"""
+Round trips of the gap + varint compressed graphs.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import (CompressedGraph, attack_order, compress,
+                        degree_assortativity, gnp_random_graph,
+                        site_percolation)
+from complexnet.compressed import decode_varints, encode_varints
+
+
+def _graph(directed=False):
+    graph = gnp_random_graph(300, 0.03, rng=1, directed=directed)
+    # an isolated run of nodes and a hub, so that lists of every length
+    # (empty ones included) cross the anchors
+    src, dst = graph.edges()
+    keep = (src < 100) | (src >= 140)
+    src, dst = src[keep], dst[keep]
+    keep = (dst < 100) | (dst >= 140)
+    src = np.concatenate([src[keep], np.full(150, 5)])
+    dst = np.concatenate([dst[keep], np.arange(150, 300)])
+    return type(graph).from_edges(src, dst, 300, directed=directed)
+
+
+def test_varints_round_trip():
+    values = np.array([0, 1, 127, 128, 300, 2**32, 2**63 - 1], dtype=np.uint64)
+    data, n_bytes = encode_varints(values)
+    assert n_bytes.tolist() == [1, 1, 1, 2, 2, 5, 9]
+    assert np.array_equal(decode_varints(data), values)
+
+
+@pytest.mark.parametrize('directed', [False, True])
+@pytest.mark.parametrize('stride', [1, 7, 32, 1000])
+def test_decompress_round_trip(directed, stride):
+    graph = _graph(directed)
+    compressed = compress(graph, stride)
+    assert isinstance(compressed, CompressedGraph)
+    plain = compressed.decompress()
+    assert np.array_equal(plain.indptr, graph.indptr)
+    assert np.array_equal(plain.indices, graph.indices)
+    assert plain.directed == directed
+
+
+@pytest.mark.parametrize('stride', [1, 7, 32])
+def test_neighbors_across_anchors(stride):
+    graph = _graph()
+    compressed = CompressedGraph.from_csr(graph, stride, max_entries=50)
+    rng = np.random.default_rng(0)
+    for first, last in [(0, 300), (0, 1), (6, 8), (stride - 1, stride + 1),
+                        (95, 145), (299, 300)]:
+        expected = graph.block_edges(first, last)
+        src, dst, entries = compressed.block_edges(first, last)
+        assert np.array_equal(src, expected[0])
+        assert np.array_equal(dst, expected[1])
+        assert entries == expected[2]
+    for nodes in [[], [5], [stride - 1, stride, 2 * stride],
+                  rng.integers(0, 300, 40), np.arange(300)[::-1]]:
+        assert np.array_equal(compressed.neighbors_of(nodes),
+                              graph.neighbors_of(nodes))
+    for node in range(300):
+        assert np.array_equal(compressed.neighbors(node),
+                              graph.neighbors(node))
+
+
+def test_graph_level_entry_points():
+    graph = gnp_random_graph(300, 0.03, rng=2)
+    compressed = compress(graph)
+    assert np.array_equal(compressed.indices, graph.indices)
+    expected = site_percolation(graph, rng=3)
+    curve = site_percolation(compressed, rng=3)
+    assert np.array_equal(curve['giant'], expected['giant'])
+    assert np.array_equal(attack_order(compressed, rng=4),
+                          attack_order(graph, rng=4))
+    assert degree_assortativity(compressed) == degree_assortativity(graph)
@@ -0,0 +1,72 @@
+"""
+Reproducibility and statistics of the parallel ensembles.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import scipy.stats
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import gnp_random_graph, run_ensemble, sweep
+
+
+def _realize(rng, n, p):
+    graph = gnp_random_graph(n, p, rng=rng)
+    degrees = graph.degree()
+    return {'k': float(degrees.mean()), 'k_max': int(degrees.max()),
+            # undefined for some realizations
+            'odd': rng.random() if degrees.max() % 2 else np.nan}
+
+
+def _assert_same(first, second):
+    assert first.metrics() == second.metrics()
+    for name in first.metrics():
+        assert np.array_equal(first.values[name], second.values[name],
+                              equal_nan=True)
+
+
+def test_results_do_not_depend_on_workers():
+    serial = run_ensemble(_realize, 20, args=(200, 0.02), seed=42, workers=1)
+    parallel = run_ensemble(_realize, 20, args=(200, 0.02), seed=42,
+                            workers=2)
+    _assert_same(serial, parallel)
+    assert len(serial) == 20
+    assert not np.array_equal(
+        serial.values['k'],
+        run_ensemble(_realize, 20, args=(200, 0.02), seed=43,
+                     workers=1).values['k'])
+
+
+def test_sweep_points_match_single_runs():
+    arg_list = [(100, 0.01), (100, 0.05), (300, 0.01)]
+    serial = sweep(_realize, arg_list, 6, seed=7, workers=1)
+    parallel = sweep(_realize, arg_list, 6, seed=7, workers=2)
+    points = np.random.SeedSequence(7).spawn(len(arg_list))
+    for args, point, first, second in zip(arg_list, points, serial, parallel):
+        _assert_same(first, second)
+        _assert_same(first, run_ensemble(_realize, 6, args=args, seed=point,
+                                         workers=1))
+        assert first.args == args
+
+
+def test_summary_means_and_confidence_intervals():
+    result = run_ensemble(_realize, 30, args=(100, 0.03), seed=1, workers=1)
+    children = np.random.SeedSequence(1).spawn(30)
+    expected = [_realize(np.random.default_rng(child), 100, 0.03)
+                for child in children]
+    summary = result.summary(confidence=0.9)
+    for name in ('k', 'k_max', 'odd'):
+        values = np.array([m[name] for m in expected], dtype=float)
+        values = values[~np.isnan(values)]
+        n = values.size
+        std = values.std(ddof=1)
+        assert summary[name]['n'] == n
+        assert np.isclose(summary[name]['mean'], values.mean())
+        assert np.isclose(summary[name]['std'], std)
+        assert np.isclose(summary[name]['ci'],
+                          scipy.stats.t.ppf(0.95, n - 1) * std / np.sqrt(n))
+    assert summary['odd']['n'] < 30
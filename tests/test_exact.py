@@ -0,0 +1,40 @@
+"""
+Exact G(n, p) ensembles against their closed forms.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import ExactEnsemble, isomorphism_classes
+
+
+def test_number_of_isomorphism_classes():
+    counts = [len(isomorphism_classes(n)) for n in range(1, 8)]
+    assert counts == [1, 2, 4, 11, 34, 156, 1044]
+    for n in range(1, 8):
+        n_labeled = sum(count for _, count in isomorphism_classes(n))
+        assert n_labeled == 2**(n * (n - 1) // 2)
+    with pytest.raises(ValueError):
+        isomorphism_classes(9)
+
+
+def test_three_nodes_closed_forms():
+    ensemble = ExactEnsemble(3)
+    p = np.linspace(0, 1, 11)
+    assert np.allclose(ensemble.expectation('c', p), p**3)
+    assert np.allclose(ensemble.expectation('k', p), 2 * p)
+    assert np.allclose(ensemble.expectation('d', p), 3 * p - 2 * p**3)
+    assert np.allclose(ensemble.polynomial('d').coef, [0, 3, 0, -2])
+    assert ensemble.expectation('k', 0.5) == pytest.approx(1.0)
+
+
+def test_average_degree_is_linear():
+    for n in range(2, 7):
+        assert np.allclose(ExactEnsemble(n).polynomial('k').coef,
+                           [0, n - 1])
@@ -0,0 +1,225 @@
+"""
+The array graph generators: edge counts, simple graphs and pair numbering.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import networkx as nx
+import numpy as np
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import (CSRGraph, barabasi_albert_graph, configuration_model,
+                        directed_configuration_model, gnm_random_graph,
+                        gnp_random_graph, watts_strogatz_graph)
+from complexnet.cli import load_exercise
+from complexnet.generators import (_decode_pairs, _number_of_pairs,
+                                   barabasi_albert_edges, growth_degrees,
+                                   random_pair_order, rewire_edges,
+                                   ring_edges)
+
+
+def _assert_simple(graph):
+    # no self-loops and no link listed twice
+    src, dst = graph.edges()
+    assert not (src == dst).any()
+    keys = src * len(graph) + dst
+    assert np.unique(keys).size == keys.size
+    if not graph.directed:
+        assert (src < dst).all()
+
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_decode_pairs_numbers_pairs_in_order(directed):
+    n = 9
+    row, col = _decode_pairs(np.arange(_number_of_pairs(n, directed)), n,
+                             directed)
+    if directed:
+        expected = [(i, j) for i in range(n) for j in range(n) if i != j]
+    else:
+        expected = [(i, j) for i in range(n) for j in range(i)]
+    assert list(zip(row.tolist(), col.tolist())) == expected
+
+
+@pytest.mark.parametrize('directed', [False, True])
+@pytest.mark.parametrize('fraction', [0, 0.03, 0.6, 1])
+def test_gnm_edge_count(directed, fraction):
+    # sparse graphs draw the links, dense ones the pairs left out
+    n = 50
+    m = int(fraction * _number_of_pairs(n, directed))
+    graph = gnm_random_graph(n, m, rng=3, directed=directed)
+    assert len(graph) == n
+    assert graph.directed == directed
+    assert graph.number_of_edges() == m
+    _assert_simple(graph)
+
+
+def test_gnm_too_many_links():
+    with pytest.raises(ValueError):
+        gnm_random_graph(10, 46)
+    with pytest.raises(ValueError):
+        random_pair_order(10, 46)
+
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_gnp_edge_count(directed):
+    n = 300
+    n_pairs = _number_of_pairs(n, directed)
+    empty = gnp_random_graph(n, 0, rng=1, directed=directed)
+    assert empty.number_of_edges() == 0
+    complete = gnp_random_graph(n, 1, rng=1, directed=directed)
+    assert complete.number_of_edges() == n_pairs
+    _assert_simple(complete)
+    for seed in range(5):
+        graph = gnp_random_graph(n, 0.05, rng=seed, directed=directed)
+        _assert_simple(graph)
+        # within five standard deviations of the binomial mean
+        mean = 0.05 * n_pairs
+        assert abs(graph.number_of_edges() - mean) < 5 * np.sqrt(mean)
+
+
+def test_gnp_is_reproducible():
+    first = gnp_random_graph(200, 0.1, rng=7, directed=True)
+    second = gnp_random_graph(200, 0.1, rng=7, directed=True)
+    assert np.array_equal(first.indptr, second.indptr)
+    assert np.array_equal(first.indices, second.indices)
+
+
+def test_random_pair_order_gives_distinct_pairs():
+    n = 40
+    for m in [10, 600, 780]:
+        src, dst = random_pair_order(n, m, rng=2)
+        assert src.size == m
+        assert (src > dst).all()
+        assert np.unique(src.astype(np.int64) * n + dst).size == m
+
+
+@pytest.mark.parametrize('p', [0, 0.2, 1])
+@pytest.mark.parametrize('n, k', [(100, 4), (30, 10), (7, 6)])
+def test_watts_strogatz_keeps_the_edge_count(n, k, p):
+    graph = watts_strogatz_graph(n, k, p, rng=5)
+    assert graph.number_of_edges() == n * (k // 2)
+    _assert_simple(graph)
+    if p == 0:
+        assert (graph.degree() == k).all()
+
+
+def test_rewire_edges():
+    src, dst = ring_edges(50, 6)
+    new_src, new_dst, rewired = rewire_edges(src, dst, 50, 1, rng=2)
+    assert np.array_equal(new_src, src)
+    assert rewired.all()
+    keys = np.minimum(new_src, new_dst) * 50 + np.maximum(new_src, new_dst)
+    assert not (new_src == new_dst).any()
+    assert np.unique(keys).size == src.size
+    # on a complete graph no edge can move
+    src, dst = ring_edges(7, 6)
+    new_src, new_dst, rewired = rewire_edges(src, dst, 7, 1, rng=2)
+    assert not rewired.any()
+    assert np.array_equal(new_dst, dst)
+
+
+@pytest.mark.parametrize('m', [1, 3])
+def test_barabasi_albert_degrees(m):
+    # past the first 1024 new nodes the links are drawn in bulk
+    n = 3000
+    graph = barabasi_albert_graph(n, m, rng=4)
+    _assert_simple(graph)
+    n_seed = m + 1
+    seed_degree_sum = n_seed * (n_seed - 1)
+    degrees = graph.degree()
+    assert degrees.sum() == 2 * m * (n - n_seed) + seed_degree_sum
+    assert degrees[n_seed:].min() >= m
+    # every new node links to m distinct earlier nodes
+    src, dst, _ = barabasi_albert_edges(n, m, rng=4)
+    new = src >= n_seed
+    assert (dst[new] < src[new]).all()
+    assert np.array_equal(np.bincount(src[new]),
+                          np.r_[np.zeros(n_seed, int), np.full(n - n_seed, m)])
+
+
+def test_barabasi_albert_seed_graph():
+    seed = nx.path_graph(5)
+    graph = barabasi_albert_graph(2000, 2, rng=6, seed_graph=seed)
+    _assert_simple(graph)
+    assert graph.degree().sum() == 2 * 2 * (2000 - 5) + 2 * 4
+    with pytest.raises(ValueError):
+        barabasi_albert_graph(100, 3, seed_graph=nx.empty_graph(5))
+    with pytest.raises(ValueError):
+        barabasi_albert_graph(3, 2, seed_graph=seed)
+
+
+def test_growth_degrees_match_the_grown_graphs():
+    src, dst, n_seed = barabasi_albert_edges(3000, 2, rng=8)
+    sizes = [3, 40, 1027, 1500, 3000]
+    for size, degrees in growth_degrees(src, dst, n_seed, 2, sizes[::-1]):
+        links = src < size
+        graph = CSRGraph.from_edges(src[links], dst[links], size)
+        assert np.array_equal(degrees, graph.degree())
+    with pytest.raises(ValueError):
+        list(growth_degrees(src, dst, n_seed, 2, [3001]))
+
+
+def test_ba_degree_series_checkpoints():
+    ba_model = load_exercise(os.path.join('ES3', 'implementing_ba_model.py'))
+    checkpoints = [100, 1000, 300]
+    series = ba_model.ba_degree_series(checkpoints, 2, rng=9)
+    assert [point['N'] for point in series] == sorted(checkpoints)
+    for point in series:
+        # the first new nodes are grown one at a time, so a network grown
+        # to the checkpoint size with the same seed is the same network
+        degrees = ba_model.ba_graph(point['N'], 2, rng=9).degree()
+        bins, bincenters, pk = ba_model.degree_distribution(degrees)
+        assert np.array_equal(point['bins'], bins)
+        assert np.array_equal(point['pk'], pk)
+        assert np.array_equal(point['bincenters'], bincenters,
+                              equal_nan=True)
+        assert point['max_degree'] == degrees.max()
+        assert point['n_edges'] == 3 + 2 * (point['N'] - 3)
+
+
+def _power_law_degrees(n, rng):
+    degrees = np.minimum(rng.zipf(2.2, size=n), n // 2)
+    degrees[0] += degrees.sum() % 2
+    return degrees
+
+
+def test_configuration_model_degrees():
+    degrees = _power_law_degrees(500, np.random.default_rng(10))
+    graph = configuration_model(degrees, rng=1, self_loops=True,
+                                multi_edges=True)
+    assert np.array_equal(graph.degree(), degrees)
+    assert graph.number_of_edges() == degrees.sum() // 2
+    # erasing loops and multi-edges can only lower the degrees
+    simple = configuration_model(degrees, rng=1)
+    _assert_simple(simple)
+    assert (simple.degree() <= degrees).all()
+    network = nx.Graph(graph.to_networkx())
+    network.remove_edges_from(nx.selfloop_edges(network))
+    assert nx.utils.graphs_equal(simple.to_networkx(), network)
+    with pytest.raises(ValueError):
+        configuration_model([1, 2])
+    with pytest.raises(ValueError):
+        configuration_model([2, -1, 1])
+
+
+def test_directed_configuration_model_degrees():
+    rng = np.random.default_rng(11)
+    out_degrees = _power_law_degrees(400, rng)
+    in_degrees = rng.permutation(out_degrees)
+    graph = directed_configuration_model(in_degrees, out_degrees, rng=2,
+                                         self_loops=True, multi_edges=True)
+    assert graph.directed
+    assert np.array_equal(graph.out_degree(), out_degrees)
+    assert np.array_equal(graph.in_degree(), in_degrees)
+    simple = directed_configuration_model(in_degrees, out_degrees, rng=2)
+    _assert_simple(simple)
+    assert (simple.out_degree() <= out_degrees).all()
+    assert (simple.in_degree() <= in_degrees).all()
+    with pytest.raises(ValueError):
+        directed_configuration_model([1, 1], [2, 1])
+    with pytest.raises(ValueError):
+        directed_configuration_model([1, 1], [2])
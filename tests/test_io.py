@@ -0,0 +1,70 @@
+"""
+Regression checks of the array graph readers against networkx.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import networkx as nx
+import numpy as np
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import CSRGraph, read_edg
+
+
+def _edge_weights(network):
+    return {frozenset((u, v)): data.get('weight')
+            for u, v, data in network.edges(data=True)}
+
+
+def _assert_same_as(path, reader):
+    graph = read_edg(str(path), cache=False).to_networkx()
+    expected = reader(str(path))
+    assert sorted(graph.nodes()) == sorted(expected.nodes())
+    assert _edge_weights(graph) == _edge_weights(expected)
+
+
+def test_reversed_duplicate_keeps_last_weight_in_both_directions():
+    graph = CSRGraph.from_edges([0, 1], [1, 0], weights=[1, 5])
+    assert graph.number_of_edges() == 1
+    assert np.array_equal(graph.strength(), [5, 5])
+
+
+def test_read_edg_reversed_duplicate(tmp_path):
+    path = tmp_path / 'reversed.edg'
+    path.write_text('1 2 1.0\n2 1 5.0\n3 4 2.0\n')
+    _assert_same_as(path, nx.read_weighted_edgelist)
+    assert np.array_equal(read_edg(str(path), cache=False).strength(),
+                          [5, 5, 2, 2])
+
+
+def test_blank_line_and_extra_columns_do_not_make_an_edge(tmp_path):
+    path = tmp_path / 'misaligned.edg'
+    path.write_text('a b\n\nc d e f\n')
+    try:
+        read_edg(str(path), cache=False)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('malformed line accepted')
+
+
+def test_attribute_dict_weights(tmp_path):
+    path = tmp_path / 'dicts.edg'
+    path.write_text("a b {'weight': 3.0}\nc d {'weight': 4.0}\n")
+    _assert_same_as(path, nx.read_edgelist)
+
+
+def test_empty_attribute_dicts_are_unweighted(tmp_path):
+    path = tmp_path / 'empty.edg'
+    path.write_text('a b {}\nb c {}\n')
+    _assert_same_as(path, nx.read_edgelist)
+    assert read_edg(str(path), cache=False).weights is None
+
+
+def test_comments_and_blank_lines(tmp_path):
+    path = tmp_path / 'comments.edg'
+    path.write_text('# header\na b 2.0  # note\n\nb c 3.0')
+    _assert_same_as(path, nx.read_weighted_edgelist)
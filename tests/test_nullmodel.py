@@ -0,0 +1,66 @@
+"""
+Degree-preserving edge swaps and the assortativity they keep up to date.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import networkx as nx
+import numpy as np
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import (CSRGraph, EdgeSwapper, assortativity_null,
+                        barabasi_albert_graph, degree_assortativity)
+
+
+def test_degree_assortativity():
+    for network in [nx.karate_club_graph(),
+                    nx.barabasi_albert_graph(300, 3, seed=1)]:
+        assert degree_assortativity(network) == pytest.approx(
+            nx.degree_assortativity_coefficient(network))
+
+
+def test_swaps_keep_degrees_and_assortativity_up_to_date():
+    graph = barabasi_albert_graph(400, 2, rng=1)
+    swapper = EdgeSwapper(graph, rng=2)
+    assert swapper.assortativity() == pytest.approx(
+        degree_assortativity(graph))
+    for _ in range(5):
+        swapper.swap(500)
+        current = swapper.graph()
+        network = current.to_networkx()
+        assert np.array_equal(current.degree(), graph.degree())
+        assert network.number_of_edges() == graph.number_of_edges()
+        assert nx.number_of_selfloops(network) == 0
+        assert swapper.assortativity() == pytest.approx(
+            nx.degree_assortativity_coefficient(network))
+    assert 0 < swapper.n_accepted <= swapper.n_attempts == 2500
+
+
+def test_labels_are_kept():
+    network = nx.relabel_nodes(nx.karate_club_graph(), lambda i: 'n%d' % i)
+    swapper = EdgeSwapper(network, rng=3)
+    swapper.swap(1000)
+    swapped = swapper.graph().to_networkx()
+    assert dict(swapped.degree()) == dict(network.degree())
+
+
+def test_assortativity_null():
+    samples = assortativity_null(nx.karate_club_graph(), 20, rng=4)
+    assert samples.shape == (20,)
+    assert np.isfinite(samples).all()
+    # the same chain from the same seed
+    again = assortativity_null(nx.karate_club_graph(), 20, rng=4)
+    assert np.array_equal(samples, again)
+
+
+def test_rejected_graphs():
+    with pytest.raises(ValueError):
+        EdgeSwapper(nx.DiGraph([(0, 1), (1, 2)]))
+    with pytest.raises(ValueError):
+        EdgeSwapper(CSRGraph.from_edges([0, 1], [0, 2], 3))
+    with pytest.raises(ValueError):
+        EdgeSwapper(nx.path_graph(2))
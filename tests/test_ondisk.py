@@ -0,0 +1,81 @@
+"""
+Round trips through the memory-mapped on-disk CSR format.
+
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import (CSRGraph, build_csr, gnp_random_graph, open_csr,
+                        save_csr)
+
+
+def _assert_same(graph, expected):
+    assert np.array_equal(graph.indptr, expected.indptr)
+    assert np.array_equal(graph.indices, expected.indices)
+    assert graph.directed == expected.directed
+    if expected.weights is None:
+        assert graph.weights is None
+    else:
+        assert np.array_equal(graph.weights, expected.weights)
+    assert graph.node_labels() == expected.node_labels()
+
+
+def _weighted(directed):
+    graph = gnp_random_graph(120, 0.05, rng=1, directed=directed)
+    src, dst = graph.edges()
+    weights = np.random.default_rng(2).random(src.size)
+    labels = ['n%d' % i for i in range(120)]
+    return CSRGraph.from_edges(src, dst, 120, weights=weights,
+                               directed=directed, labels=labels)
+
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_save_and_open(tmp_path, directed):
+    graph = _weighted(directed)
+    path = str(tmp_path / 'graph.csr')
+    save_csr(graph, path)
+    opened = open_csr(path)
+    assert isinstance(opened.indices, np.memmap)
+    _assert_same(opened, graph)
+    assert np.array_equal(opened.degree(), graph.degree())
+
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_build_from_chunks(tmp_path, directed):
+    graph = _weighted(directed)
+    src, dst = graph.edges()
+    weights = graph.edge_weights()
+    order = np.random.default_rng(3).permutation(src.size)
+    src, dst, weights = src[order], dst[order], weights[order]
+
+    def chunks():
+        for start in range(0, src.size, 50):
+            end = start + 50
+            yield src[start:end], dst[start:end], weights[start:end]
+
+    built = build_csr(str(tmp_path / 'built.csr'), chunks, 120,
+                      directed=directed, weighted=True,
+                      labels=np.array(graph.node_labels()), max_entries=64)
+    _assert_same(built, graph)
+
+
+def test_corrupt_files_raise(tmp_path):
+    path = str(tmp_path / 'graph.csr')
+    save_csr(gnp_random_graph(50, 0.1, rng=4), path)
+    np.save(os.path.join(path, 'indices.npy'), np.zeros(3, dtype=np.int32))
+    with pytest.raises(ValueError, match='indices.npy'):
+        open_csr(path)
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    meta['version'] = 99
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    with pytest.raises(ValueError, match='version'):
+        open_csr(path)
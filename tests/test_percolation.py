@@ -0,0 +1,188 @@
+"""
+The union-find percolation engines against removing or adding links and
+nodes one at a time in networkx and counting the components again.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import networkx as nx
+import numpy as np
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import (CSRGraph, attack_order, bond_percolation,
+                        edge_removal, er_percolation, gnp_random_graph,
+                        node_attack, site_percolation)
+from complexnet.percolation import ATTACKS
+from complexnet.generators import random_pair_order
+
+
+def _graph():
+    # about 150 nodes below the threshold, so there are many components
+    return gnp_random_graph(150, 0.012, rng=5)
+
+
+def _stats(network, n_nodes):
+    """
+    Largest component size and susceptibility of a networkx graph, where
+    n_nodes nodes count in the susceptibility.
+    """
+    sizes = [len(c) for c in nx.connected_components(network)]
+    giant = max(sizes, default=0)
+    square_sum = sum(size * size for size in sizes)
+    if giant == n_nodes:
+        return giant, np.nan
+    return giant, (square_sum - giant**2) / float(n_nodes - giant)
+
+
+def _assert_curve(curve, expected):
+    giants, chis = zip(*expected)
+    assert np.array_equal(curve['giant'], giants)
+    assert np.allclose(curve['susceptibility'], chis, equal_nan=True)
+
+
+def _bond_expected(n, src, dst):
+    network = nx.empty_graph(n)
+    expected = [_stats(network, n)]
+    for u, v in zip(src.tolist(), dst.tolist()):
+        network.add_edge(u, v)
+        expected.append(_stats(network, n))
+    return expected
+
+
+def test_bond_percolation_adds_links_in_random_order():
+    graph = _graph()
+    src, dst = graph.edges()
+    curve = bond_percolation(graph, rng=1)
+    order = np.random.default_rng(1).permutation(src.size)
+    _assert_curve(curve, _bond_expected(150, src[order], dst[order]))
+    assert np.array_equal(curve['n_links'], np.arange(src.size + 1))
+    assert np.all(curve['giant_std'] == 0)
+    # all the links give the largest component of the graph
+    network = graph.to_networkx()
+    assert curve['giant'][-1] == max(
+        len(c) for c in nx.connected_components(network))
+
+
+def test_bond_percolation_averages_orders():
+    graph = _graph()
+    src, dst = graph.edges()
+    curve = bond_percolation(graph, n_orders=3, rng=2)
+    rng = np.random.default_rng(2)
+    giants = []
+    for _ in range(3):
+        order = rng.permutation(src.size)
+        giants.append([giant for giant, _ in
+                       _bond_expected(150, src[order], dst[order])])
+    assert np.allclose(curve['giant'], np.mean(giants, axis=0))
+    assert np.allclose(curve['giant_std'], np.std(giants, axis=0))
+
+
+def test_site_percolation_occupies_nodes_in_random_order():
+    graph = _graph()
+    network = graph.to_networkx()
+    curve = site_percolation(graph, rng=3)
+    occupied = nx.Graph()
+    expected = [(0, np.nan)]
+    for v in np.random.default_rng(3).permutation(150).tolist():
+        occupied.add_node(v)
+        occupied.add_edges_from((v, u) for u in network[v] if u in occupied)
+        expected.append(_stats(occupied, occupied.number_of_nodes()))
+    _assert_curve(curve, expected)
+    assert curve['giant'][-1] == max(
+        len(c) for c in nx.connected_components(network))
+
+
+def test_er_percolation_is_gnm_link_by_link():
+    n, n_links = 150, 120
+    curve = er_percolation(n, n_links, rng=4)
+    src, dst = random_pair_order(n, n_links, np.random.default_rng(4))
+    _assert_curve(curve, _bond_expected(n, src, dst))
+    network = nx.empty_graph(n)
+    network.add_edges_from(zip(src.tolist(), dst.tolist()))
+    assert network.number_of_edges() == n_links
+    assert curve['giant'][-1] == max(
+        len(c) for c in nx.connected_components(network))
+    assert np.allclose(curve['avg_degree'], 2.0 * np.arange(n_links + 1) / n)
+
+
+def _removal_expected(graph, order):
+    network = graph.to_networkx()
+    src, dst = graph.edges()
+    n = graph.number_of_nodes()
+    expected = [_stats(network, n)]
+    for e in order.tolist():
+        network.remove_edge(int(src[e]), int(dst[e]))
+        expected.append(_stats(network, n))
+    return expected
+
+
+def test_edge_removal_removes_links_in_order():
+    graph = gnp_random_graph(150, 0.02, rng=6)
+    src, _ = graph.edges()
+    by_node = np.argsort(-src, kind='stable')
+    curves = edge_removal(graph, orders={'by-node': by_node}, n_random=2,
+                          rng=7)
+    giants, chis = zip(*_removal_expected(graph, by_node))
+    assert np.array_equal(curves['giant']['by-node'], giants)
+    assert np.allclose(curves['susceptibility']['by-node'], chis,
+                       equal_nan=True)
+    rng = np.random.default_rng(7)
+    random_giants = [[giant for giant, _ in
+                      _removal_expected(graph, rng.permutation(src.size))]
+                     for _ in range(2)]
+    assert np.allclose(curves['random']['giant'],
+                       np.mean(random_giants, axis=0))
+    assert curves['random']['giant'][-1] == 1
+    assert np.array_equal(curves['n_removed'], np.arange(src.size + 1))
+
+
+def _weighted_graph():
+    graph = gnp_random_graph(150, 0.03, rng=8)
+    src, dst = graph.edges()
+    # a self-loop, which does not count in the degrees of the attacks
+    src, dst = np.append(src, 3), np.append(dst, 3)
+    weights = np.random.default_rng(9).integers(1, 5, src.size)
+    return CSRGraph.from_edges(src, dst, 150, weights=weights)
+
+
+def _degree(network, v, weight=None):
+    return sum(network[v][u].get('weight', 1) if weight else 1
+               for u in network[v] if u != v)
+
+
+@pytest.mark.parametrize('strategy', ATTACKS)
+def test_node_attack_removes_nodes_in_attack_order(strategy):
+    graph = _weighted_graph()
+    network = graph.to_networkx()
+    order = attack_order(graph, strategy, rng=10)
+    assert sorted(order.tolist()) == list(range(150))
+    expected = [_stats(network, 150)]
+    for v in order.tolist():
+        network.remove_node(v)
+        expected.append(_stats(network, network.number_of_nodes()))
+    curve = node_attack(graph, strategy, rng=10)
+    _assert_curve(curve, expected)
+    assert curve['giant'][-1] == 0
+
+
+def test_static_degree_attack_follows_original_degrees():
+    graph = _weighted_graph()
+    network = graph.to_networkx()
+    degrees = [_degree(network, v) for v in attack_order(
+        graph, 'static-degree', rng=11).tolist()]
+    assert degrees == sorted(degrees, reverse=True)
+
+
+@pytest.mark.parametrize('strategy, weight', [('adaptive-degree', None),
+                                              ('adaptive-strength', 'weight')])
+def test_adaptive_attacks_take_the_current_largest(strategy, weight):
+    graph = _weighted_graph()
+    network = graph.to_networkx()
+    for v in attack_order(graph, strategy, rng=12).tolist():
+        largest = max(_degree(network, u, weight) for u in network)
+        assert _degree(network, v, weight) == largest
+        network.remove_node(v)
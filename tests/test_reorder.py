@@ -0,0 +1,68 @@
+"""
+Node reorderings: round trips and the locality they are for.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import networkx as nx
+import numpy as np
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import CSRGraph, connected_components, reorder, restore_order
+from complexnet.reorder import METHODS, bandwidth, permute
+
+
+def _scrambled_lattices(directed=False):
+    # two lattices and an isolated node, with randomly shuffled ids
+    network = nx.disjoint_union(nx.grid_2d_graph(12, 10),
+                                nx.grid_2d_graph(5, 5))
+    network.add_node(len(network))
+    if directed:
+        network = network.to_directed()
+        network.remove_edges_from([(u, v) for u, v in list(network.edges())
+                                   if u < v and (u + v) % 3 == 0])
+    graph = CSRGraph.from_networkx(network)
+    shuffle = np.random.default_rng(1).permutation(len(graph))
+    return permute(graph, shuffle), network
+
+
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('directed', [False, True])
+def test_round_trip(method, directed):
+    graph, network = _scrambled_lattices(directed)
+    new_graph, perm, inverse = reorder(graph, method)
+    assert sorted(perm.tolist()) == list(range(len(graph)))
+    assert np.array_equal(inverse[perm], np.arange(len(graph)))
+    # the same network under the original labels
+    assert nx.utils.graphs_equal(new_graph.to_networkx(), network)
+    assert np.array_equal(restore_order(new_graph.degree(), perm),
+                          graph.degree())
+    assert np.array_equal(restore_order(new_graph.in_degree(), perm),
+                          graph.in_degree())
+
+
+def test_rcm_shrinks_bandwidth_and_keeps_components_together():
+    graph, _ = _scrambled_lattices()
+    new_graph, _, _ = reorder(graph, 'rcm')
+    assert bandwidth(new_graph) <= bandwidth(graph)
+    assert bandwidth(new_graph) < 20
+    labels, _ = connected_components(new_graph)
+    # every component is one contiguous id range
+    assert np.count_nonzero(np.diff(labels)) == labels.max()
+
+
+def test_degree_order_puts_hubs_first():
+    graph, _ = _scrambled_lattices()
+    new_graph, _, _ = reorder(graph, 'degree')
+    degrees = new_graph.degree()
+    assert np.all(np.diff(degrees) <= 0)
+
+
+def test_unknown_method():
+    graph, _ = _scrambled_lattices()
+    with pytest.raises(ValueError):
+        reorder(graph, 'random')
@@ -0,0 +1,83 @@
+"""
+Requests and responses of the graph service over HTTP on localhost.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import threading
+import time
+
+import networkx as nx
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet.service import GraphClient, make_server
+
+
+@pytest.fixture
+def client():
+    server = make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield GraphClient(port=server.server_address[1], timeout=30), server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _write(path, text):
+    path.write_text(text)
+    # a new mtime even on file systems with a coarse clock
+    stamp = time.time() + len(text)
+    os.utime(str(path), (stamp, stamp))
+
+
+def test_queries_are_answered_and_remembered(client, tmp_path):
+    client, server = client
+    path = tmp_path / 'net.edg'
+    _write(path, '1 2 1.0\n2 3 2.0\n3 1 1.5\n4 5 1.0\n')
+    network = nx.read_weighted_edgelist(str(path))
+
+    assert client.node_values(str(path), 'degree') == dict(network.degree())
+    strengths = client.node_values(str(path), 'strength')
+    assert strengths == pytest.approx(dict(network.degree(weight='weight')))
+    pagerank = client.node_values(str(path), 'pagerank', iterations=100)
+    assert pagerank == pytest.approx(nx.pagerank(network, weight=None),
+                                     abs=1e-4)
+    components = client.query(str(path), 'components')
+    assert components['giant_size'] == 3
+    assert sorted(components['sizes']) == [2, 3]
+    info = client.query(str(path), 'info')
+    assert info == {'n_nodes': 5, 'n_edges': 4, 'directed': False,
+                    'weighted': True}
+
+    first = server.store.query(str(path), 'degree')
+    assert server.store.query(str(path), 'degree') is first
+    status = client.status()
+    assert len(status['graphs']) == 1
+    assert status['graphs'][0]['metrics'] == sorted(
+        ['components', 'degree', 'info', 'pagerank', 'strength'])
+
+
+def test_changed_file_is_reloaded(client, tmp_path):
+    client, _ = client
+    path = tmp_path / 'net.edg'
+    _write(path, '1 2\n')
+    assert client.node_values(str(path), 'degree') == {'1': 1, '2': 1}
+    _write(path, '1 2\n1 3\n')
+    assert client.node_values(str(path), 'degree') == {'1': 2, '2': 1,
+                                                       '3': 1}
+
+
+def test_bad_requests(client, tmp_path):
+    client, _ = client
+    path = tmp_path / 'net.edg'
+    _write(path, '1 2\n')
+    with pytest.raises(ValueError, match='unknown metric'):
+        client.query(str(path), 'diameter')
+    with pytest.raises(ValueError, match='FileNotFoundError'):
+        client.query(str(tmp_path / 'missing.edg'), 'degree')
@@ -0,0 +1,70 @@
+"""
+Graphs published in shared memory and attached by pool workers.
+
+    python -m pytest tests
+"""
+import multiprocessing
+import os
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import CSRGraph, SharedGraph, attach, compress, gnp_random_graph
+
+
+def _degree_sum(args):
+    handle, node = args
+    graph = attach(handle)
+    return os.getpid(), int(graph.degree()[graph.neighbors(node)].sum())
+
+
+def test_pool_workers_attach_and_close_frees_memory():
+    graph = gnp_random_graph(500, 0.02, rng=1)
+    degrees = graph.degree()
+    expected = [int(degrees[graph.neighbors(node)].sum())
+                for node in range(50)]
+    shared = SharedGraph(graph)
+    names = [name for name, _, _ in shared.handle.arrays.values()]
+    with shared as handle:
+        with multiprocessing.Pool(2) as pool:
+            results = pool.map(_degree_sum,
+                               [(handle, node) for node in range(50)])
+    assert [total for _, total in results] == expected
+    assert os.getpid() not in set(pid for pid, _ in results)
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_labels_and_weights_survive():
+    graph = CSRGraph.from_edges([0, 1], [1, 2], weights=[0.5, 2.0],
+                                labels=[('a', 1), ('b', 2), ('c', 3)])
+    with SharedGraph(graph) as handle:
+        shared = attach(handle)
+        assert shared.node_labels() == graph.node_labels()
+        assert np.array_equal(shared.weights, graph.weights)
+        assert np.array_equal(shared.indices, graph.indices)
+    graph = CSRGraph.from_edges([0], [1], labels=[7, 'a'])
+    with SharedGraph(graph) as handle:
+        assert attach(handle).node_labels() == [7, 'a']
+
+
+def test_compressed_graph_shares_decompressed_indices():
+    graph = gnp_random_graph(200, 0.05, rng=2)
+    with SharedGraph(compress(graph)) as handle:
+        shared = attach(handle)
+        assert shared.indices.dtype == graph.indices.dtype
+        assert np.array_equal(shared.indices, graph.indices)
+
+
+def test_object_and_missing_arrays_are_rejected():
+    graph = gnp_random_graph(20, 0.2, rng=3)
+    with pytest.raises(TypeError):
+        SharedGraph(CSRGraph(graph.indptr, None))
+    with pytest.raises(TypeError):
+        SharedGraph(CSRGraph(graph.indptr,
+                             graph.indices.astype(object)))
@@ -0,0 +1,78 @@
+"""
+The coupled Watts-Strogatz sweep against networkx on the rebuilt graphs.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import networkx as nx
+import numpy as np
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import coupled_ws_sweep
+from complexnet.generators import ring_edges
+
+
+def _rebuilt_graphs(n, k, ps, seed):
+    """
+    Rewires a networkx ring link by link in the order of the same random
+    thresholds, and yields the graph of every p.
+    """
+    graph_rng, _ = np.random.default_rng(seed).spawn(2)
+    src, dst = ring_edges(n, k)
+    thresholds = graph_rng.random(src.size)
+    order = np.argsort(thresholds)
+    network = nx.Graph()
+    network.add_nodes_from(range(n))
+    network.add_edges_from(zip(src.tolist(), dst.tolist()))
+    n_rewired = 0
+    for p in sorted(ps):
+        while n_rewired < order.size and thresholds[order[n_rewired]] < p:
+            e = order[n_rewired]
+            u, v = int(src[e]), int(dst[e])
+            if network.degree(u) < n - 1:
+                while True:
+                    w = int(graph_rng.integers(n))
+                    if w != u and not network.has_edge(u, w):
+                        break
+                network.remove_edge(u, v)
+                network.add_edge(u, w)
+                dst[e] = w
+            n_rewired += 1
+        yield p, network.copy(), n_rewired
+
+
+def test_clustering_and_path_length_track_networkx():
+    n, k, ps = 80, 6, [0.01, 0.05, 0.2, 1.0]
+    curve = coupled_ws_sweep(n, k, ps, rng=3, n_sources=None)
+    ring = nx.Graph(list(zip(*[a.tolist() for a in ring_edges(n, k)])))
+    assert curve['c0'] == pytest.approx(nx.average_clustering(ring))
+    assert curve['l0'] == pytest.approx(nx.average_shortest_path_length(ring))
+    for (p, network, n_rewired), c, l, rewired in zip(
+            _rebuilt_graphs(n, k, ps, 3), curve['c'], curve['l'],
+            curve['n_rewired']):
+        assert network.number_of_edges() == n * (k // 2)
+        assert rewired == n_rewired
+        assert c / curve['c0'] == pytest.approx(
+            nx.average_clustering(network) / nx.average_clustering(ring))
+        giant = network.subgraph(max(nx.connected_components(network),
+                                     key=len))
+        assert l == pytest.approx(nx.average_shortest_path_length(giant))
+
+
+def test_links_of_saturated_nodes_stay():
+    # every node of a 5-node ring with 4 neighbors is linked to all others
+    curve = coupled_ws_sweep(5, 4, [0.5, 1.0], rng=1, n_sources=None)
+    assert curve['c'] == [1.0, 1.0]
+    assert curve['l'] == [1.0, 1.0]
+
+
+def test_graphs_do_not_depend_on_sampled_sources():
+    ps = [0.01, 0.1, 0.5]
+    sampled = coupled_ws_sweep(200, 4, ps, rng=5, n_sources=10)
+    exact = coupled_ws_sweep(200, 4, ps, rng=5, n_sources=None)
+    assert sampled['c'] == exact['c']
+    assert sampled['n_rewired'] == exact['n_rewired']
@@ -0,0 +1,60 @@
+"""
+The one-pass edge file statistics against the graph read from the file.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet import gnp_random_graph, read_edg, scan_edge_file
+
+REPOSITORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+
+def _assert_matches_graph(path, chunk_size):
+    stats = scan_edge_file(path, chunk_size=chunk_size)
+    graph = read_edg(path, cache=False)
+    degrees = graph.to_label_dict(graph.degree())
+    strengths = graph.to_label_dict(graph.strength())
+    assert sorted(stats.labels.tolist()) == sorted(degrees)
+    for label, degree, strength in zip(stats.labels.tolist(),
+                                       stats.degrees.tolist(),
+                                       stats.strengths.tolist()):
+        assert degree == degrees[label]
+        assert strength == pytest.approx(strengths[label])
+    assert stats.number_of_edges() == graph.number_of_edges()
+    assert stats.n_self_loops == graph.self_loops().size
+    n = graph.number_of_nodes()
+    assert stats.density() == pytest.approx(
+        2.0 * graph.number_of_edges() / (n * (n - 1)))
+    return stats, graph
+
+
+def test_random_weighted_file_across_chunks(tmp_path):
+    graph = gnp_random_graph(200, 0.03, rng=1)
+    src, dst = graph.edges()
+    weights = np.random.default_rng(2).integers(1, 10, src.size)
+    path = tmp_path / 'random.edg'
+    lines = ['%d %d %d' % edge for edge in zip(src.tolist(), dst.tolist(),
+                                               weights.tolist())]
+    # a self-loop counts twice in the degree
+    lines.append('7 7 3')
+    path.write_text('\n'.join(lines) + '\n')
+    stats, _ = _assert_matches_graph(str(path), chunk_size=256)
+    assert stats.weighted
+    assert stats.n_self_loops == 1
+
+
+def test_karate_club_cdf():
+    path = os.path.join(REPOSITORY, 'ES1', 'karate_club_network_edge_file.edg')
+    stats, graph = _assert_matches_graph(path, chunk_size=100)
+    degrees = graph.degree()
+    x_points, cdf = stats.cdf()
+    assert np.array_equal(x_points, np.unique(degrees))
+    assert np.allclose(cdf, [np.mean(degrees < k) for k in x_points])
+    assert np.array_equal(stats.degree_histogram(), np.bincount(degrees))
@@ -0,0 +1,79 @@
+"""
+The TCP work queue with local worker processes.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import time
+
+import pytest
+
+# shared array-graph code from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from complexnet.workqueue import Broker, RemoteError
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+
+
+# the tasks are sent by reference, so the workers import this module too
+
+def _square(x):
+    # later tasks finish first, so that the results come in out of order
+    time.sleep(0.002 * (20 - x % 20))
+    return x * x
+
+
+def _fail(x):
+    raise ValueError('bad task %d' % x)
+
+
+def _fail_once(task):
+    marker, x = task
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        raise ValueError('first try')
+    return -x
+
+
+def _exit_once(task):
+    marker, x = task
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        # the worker dies without reporting
+        os._exit(1)
+    return x
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    monkeypatch.setenv('PYTHONPATH', TESTS)
+    with Broker(local_workers=2) as broker:
+        yield broker
+
+
+def test_map_keeps_task_order(broker):
+    assert broker.map(_square, range(40)) == [x * x for x in range(40)]
+    assert sorted(broker.imap_unordered(_square, range(10))) == [
+        x * x for x in range(10)]
+    assert sum(broker.workers().values()) == 50
+
+
+def test_failed_task_is_retried(broker, tmp_path):
+    marker = str(tmp_path / 'failed')
+    assert broker.map(_fail_once, [(marker, x) for x in range(5)]) == [
+        0, -1, -2, -3, -4]
+
+
+def test_remote_error_then_recovery(broker):
+    with pytest.raises(RemoteError, match='bad task 3'):
+        broker.map(_fail, [3])
+    # the broker and the workers are still usable afterwards
+    assert broker.map(_square, range(6)) == [x * x for x in range(6)]
+
+
+def test_tasks_of_dead_worker_are_requeued(broker, tmp_path):
+    marker = str(tmp_path / 'exited')
+    assert broker.map(_exit_once, [(marker, x) for x in range(12)]) == list(
+        range(12))
+    assert len(broker.workers()) == 1